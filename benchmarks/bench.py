@@ -0,0 +1,379 @@
+"""Offline benchmark suite for the model, the chart builders and the page.
+
+    python benchmarks/bench.py                  # run and compare with the saved baseline
+    python benchmarks/bench.py --save           # run and store the results as the new baseline
+    python benchmarks/bench.py --only model,figures --repeat 9
+
+Every benchmark reports the median of ``--repeat`` timed runs in milliseconds
+(after one warm-up run). A run fails with exit status 1 when any benchmark is
+slower than ``--threshold`` x its baseline and by more than ``--min-delta-ms``.
+Each run is also appended to ``results/history.jsonl`` so per-click latency
+can be tracked over time. Baselines are machine specific and are not committed.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import platform
+import statistics
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import numpy as np
+import plotly
+import streamlit
+from streamlit.testing.v1 import AppTest
+
+from charts import (
+    cost_pie_figure,
+    figure_cache_clear,
+    price_sensitivity_figure,
+    profit_surface_figure,
+    profit_utilization_figure,
+    profit_waterfall_figure,
+)
+from spa_model import (
+    DEFAULT_CONFIG,
+    SURFACE_RESOLUTION,
+    cached_metrics,
+    METRIC_NAMES,
+    calculate_metrics_array,
+    calculate_metrics_batch,
+    calculate_metrics_scalar,
+    metrics_cache_clear,
+    scalar_metrics,
+)
+from spa_model.service import MetricsService
+
+RESULTS_DIR = Path(__file__).resolve().parent / 'results'
+DASHBOARD = ROOT / 'dashboard.py'
+SUITES = ('model', 'figures', 'page', 'service')
+BATCH_ROWS = 1_000_000
+SCALAR_CALLS = 1_000
+APP_TIMEOUT = 120
+SERVICE_CLIENTS = 50
+SERVICE_REQUESTS = 10_000
+
+# A representative scenario: the dashboard defaults
+CUSTOMERS, PRICE, PRODUCT_PCT = 468, 5000, 5.0
+
+
+def median_ms(fn, repeat):
+    fn()  # warm-up
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def check_scalar_parity():
+    """Fail unless ``calculate_metrics_scalar`` matches the batch engine exactly.
+
+    Covers a grid of ordinary scenarios plus the fallbacks: no customers or
+    zero revenue, a price below the unit cost (no break-even), loss-making
+    scenarios that never pay back, and zero or negative CAPEX and capacity.
+    """
+    params = DEFAULT_CONFIG.model_params()
+    scenarios = [
+        (customers, price, product_pct, {})
+        for customers in (0, 1, 156, 468, 1560, 5000)
+        for price in (0, 100, 300, 5000, 9000)
+        for product_pct in (0.0, 5.0, 100.0)
+    ]
+    scenarios += [
+        (CUSTOMERS, PRICE, PRODUCT_PCT, overrides)
+        for overrides in ({'interior_capex': 0}, {'interior_capex': -1}, {'total_fixed': 0},
+                          {'total_variable': 1e9}, {'max_capacity': 0}, {'working_days': 0}, {'beds': 0})
+    ]
+    rng = np.random.default_rng(0)
+    scenarios += [(*rng.uniform((0, 0, 0), (3000, 10000, 30)), {}) for _ in range(1000)]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for customers, price, product_pct, overrides in scenarios:
+            inputs = {**params, **overrides}
+            expected = scalar_metrics(calculate_metrics_batch(customers, price, product_pct, **inputs))
+            actual = calculate_metrics_scalar(customers, price, product_pct, **inputs)
+            for name in METRIC_NAMES:
+                same = expected[name] == actual[name] or (expected[name] != expected[name] and actual[name] != actual[name])
+                if not same or type(expected[name]) is not type(actual[name]):
+                    raise SystemExit(f"calculate_metrics_scalar differs from the batch engine on {name} for "
+                                     f"{customers=}, {price=}, {product_pct=}, {overrides}: {actual[name]!r} != {expected[name]!r}")
+
+
+def bench_model(repeat):
+    check_scalar_parity()
+    params = DEFAULT_CONFIG.model_params()
+    rng = np.random.default_rng(0)
+    customers = rng.integers(50, DEFAULT_CONFIG.max_capacity, BATCH_ROWS).astype(np.float64)
+    prices = rng.integers(40, 141, BATCH_ROWS) * 50.0
+
+    def scalar_calls():
+        for _ in range(SCALAR_CALLS):
+            calculate_metrics_scalar(CUSTOMERS, PRICE, PRODUCT_PCT, **params)
+
+    def scalar_batch_calls():
+        for _ in range(SCALAR_CALLS):
+            calculate_metrics_batch(CUSTOMERS, PRICE, PRODUCT_PCT, **params)
+
+    def cache_misses():
+        metrics_cache_clear()
+        for customers in range(SCALAR_CALLS):
+            cached_metrics(DEFAULT_CONFIG, customers, PRICE, PRODUCT_PCT)
+
+    def cached_calls():
+        for _ in range(SCALAR_CALLS):
+            cached_metrics(DEFAULT_CONFIG, CUSTOMERS, PRICE, PRODUCT_PCT)
+
+    results = {
+        f'model.scalar_uncached_x{SCALAR_CALLS}': median_ms(scalar_calls, repeat),
+        f'model.scalar_batch_engine_x{SCALAR_CALLS}': median_ms(scalar_batch_calls, repeat),
+        f'model.scalar_cache_miss_x{SCALAR_CALLS}': median_ms(cache_misses, repeat),
+        f'model.scalar_cached_x{SCALAR_CALLS}': median_ms(cached_calls, repeat),
+        f'model.batch_{BATCH_ROWS}': median_ms(lambda: calculate_metrics_batch(customers, prices, PRODUCT_PCT, **params), repeat),
+        f'model.array_{BATCH_ROWS}': median_ms(lambda: calculate_metrics_array(customers, prices, PRODUCT_PCT), repeat),
+    }
+    info = {
+        'scalar_rows_per_s': SCALAR_CALLS / results[f'model.scalar_uncached_x{SCALAR_CALLS}'] * 1000,
+        'batch_rows_per_s': BATCH_ROWS / results[f'model.batch_{BATCH_ROWS}'] * 1000,
+        'array_bytes_per_row': calculate_metrics_array(CUSTOMERS, PRICE, PRODUCT_PCT).itemsize,
+    }
+    return results, info
+
+
+def bench_figures(repeat):
+    metrics = cached_metrics(DEFAULT_CONFIG, CUSTOMERS, PRICE, PRODUCT_PCT)
+    utilization = CUSTOMERS / DEFAULT_CONFIG.max_capacity * 100
+    builders = {}
+    for layout, mobile in (('desktop', False), ('mobile', True)):
+        builders.update({
+            f'pie_{layout}': lambda mobile=mobile: cost_pie_figure(metrics, mobile),
+            f'waterfall_{layout}': lambda mobile=mobile: profit_waterfall_figure(metrics, mobile),
+            f'profit_utilization_{layout}': lambda mobile=mobile: profit_utilization_figure(
+                DEFAULT_CONFIG, PRICE, PRODUCT_PCT, utilization, metrics['net_profit'], mobile),
+            f'price_sensitivity_{layout}': lambda mobile=mobile: price_sensitivity_figure(DEFAULT_CONFIG, PRODUCT_PCT, mobile),
+            f'profit_surface_{layout}': lambda mobile=mobile, layout=layout: profit_surface_figure(
+                DEFAULT_CONFIG, PRICE, utilization, PRODUCT_PCT, "Net Profit (₹)", SURFACE_RESOLUTION[layout], mobile),
+        })
+
+    def cold(build):
+        figure_cache_clear()
+        return build()
+
+    def rerun():
+        for build in builders.values():
+            build()
+
+    results, info = {}, {}
+    for name, build in builders.items():
+        results[f'figures.{name}'] = median_ms(lambda build=build: cold(build), repeat)
+        info[f'{name}_json_bytes'] = len(plotly.io.to_json(build(), validate=False))
+    # Every chart again with unchanged inputs, as on a rerun that does not touch them
+    results['figures.memoized_rerun'] = median_ms(rerun, repeat)
+    return results, info
+
+
+def _app():
+    return AppTest.from_file(str(DASHBOARD), default_timeout=APP_TIMEOUT).run()
+
+
+def _check(at):
+    if at.exception:
+        raise RuntimeError(f"dashboard raised: {[e.value for e in at.exception]}")
+    return at
+
+
+def bench_page(repeat):
+    """End-to-end reruns through AppTest, one benchmark per interaction path.
+
+    Clicks alternate between two targets so every timed run changes state.
+    """
+    def clicks(*keys):
+        at = _app()
+        targets = itertools.cycle(keys)
+        return lambda: _check(at.button(key=next(targets)).click().run())
+
+    def toggle(key):
+        at = _app()
+        states = itertools.cycle((True, False))
+        return lambda: _check(at.checkbox(key=key).set_value(next(states)).run())
+
+    def custom_customers():
+        at = _app()
+        values = itertools.cycle((700, 900))
+
+        def run():
+            at.button(key='cust_custom').click().run()
+            at.number_input(key='custom_input').set_value(next(values)).run()
+            _check(at.button(key='apply_custom').click().run())
+        return run
+
+    def sidebar_override():
+        at = _app()
+        at.sidebar.checkbox[0].check().run()
+        rents = itertools.cycle((250000, 300000))
+        return lambda: _check(at.sidebar.number_input[0].set_value(next(rents)).run())
+
+    def cold_start():
+        metrics_cache_clear()
+        _check(_app())
+
+    paths = {
+        'initial_load': lambda: cold_start,
+        'click_price': lambda: clicks('cost_5500', 'cost_3000'),
+        'click_customers': lambda: clicks('cust_780', 'cust_156'),
+        'click_product_pct': lambda: clicks('prod_2.0', 'prod_6.0'),
+        'mobile_charts_toggle': lambda: toggle('mobile_charts_comparison'),
+        'single_column_toggle': lambda: toggle('mobile_view_Custom'),
+        'custom_customers': custom_customers,
+        'sidebar_cost_override': sidebar_override,
+    }
+    return {f'page.{name}': median_ms(make(), repeat) for name, make in paths.items()}, {}
+
+
+def _start_service():
+    """Run a ``MetricsService`` on a free local port in a background thread; returns the port."""
+    started = threading.Event()
+    port = []
+
+    async def run():
+        server = await MetricsService().start('127.0.0.1', 0)
+        port.append(server.sockets[0].getsockname()[1])
+        started.set()
+        await server.serve_forever()
+
+    threading.Thread(target=asyncio.run, args=(run(),), name="bench-service", daemon=True).start()
+    started.wait()
+    return port[0]
+
+
+async def _load(port, bodies):
+    """Send ``bodies`` to ``/metrics`` over ``SERVICE_CLIENTS`` keep-alive connections."""
+    async def client(bodies):
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        for body in bodies:
+            writer.write(f"POST /metrics HTTP/1.1\r\nHost: bench\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+            headers = await reader.readuntil(b'\r\n\r\n')
+            if not headers.startswith(b'HTTP/1.1 200'):
+                raise RuntimeError(f"service answered {headers.splitlines()[0]!r}")
+            length = int(headers.lower().split(b'content-length:')[1].split(b'\r\n')[0])
+            await reader.readexactly(length)
+        writer.close()
+
+    await asyncio.gather(*(client(bodies[i::SERVICE_CLIENTS]) for i in range(SERVICE_CLIENTS)))
+
+
+def bench_service(repeat):
+    """``SERVICE_REQUESTS`` single-scenario ``/metrics`` requests against a local server.
+
+    ``cached`` cycles through the preset scenarios (all cache hits after the
+    warm-up); ``uncached`` asks for a new scenario every time, so each
+    request goes through the batcher. The load generator shares the machine.
+    """
+    port = _start_service()
+    presets = [
+        json.dumps({'customers': customers, 'price': price}).encode()
+        for customers in (156, 312, 468, 624, 780) for price in (3000, 3500, 4000, 4500, 5000, 5500)
+    ]
+    cached = list(itertools.islice(itertools.cycle(presets), SERVICE_REQUESTS))
+    fresh = itertools.count()
+
+    def uncached():
+        start = next(fresh) * SERVICE_REQUESTS
+        return [json.dumps({'customers': 468, 'price': 5000 + (start + i) / 1e6}).encode() for i in range(SERVICE_REQUESTS)]
+
+    results = {
+        f'service.metrics_cached_x{SERVICE_REQUESTS}': median_ms(lambda: asyncio.run(_load(port, cached)), repeat),
+        f'service.metrics_uncached_x{SERVICE_REQUESTS}': median_ms(lambda: asyncio.run(_load(port, uncached())), repeat),
+    }
+    info = {
+        f'{name.split(".")[1].rsplit("_x", 1)[0]}_requests_per_s': SERVICE_REQUESTS / ms * 1000
+        for name, ms in results.items()
+    }
+    return results, info
+
+
+def environment():
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'platform': platform.platform(),
+        'numpy': np.__version__,
+        'plotly': plotly.__version__,
+        'streamlit': streamlit.__version__,
+    }
+
+
+def compare(results, baseline, threshold, min_delta_ms):
+    """Print each benchmark against its baseline; return the regressed names."""
+    regressions = []
+    width = max(map(len, results))
+    for name, ms in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:<{width}}  {ms:10.2f} ms  (no baseline)")
+            continue
+        ratio = ms / base if base else float('inf')
+        regressed = ratio > threshold and ms - base > min_delta_ms
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{name:<{width}}  {ms:10.2f} ms  baseline {base:10.2f} ms  x{ratio:5.2f}{flag}")
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--only', default=','.join(SUITES), help=f"comma-separated suites ({', '.join(SUITES)})")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--baseline', type=Path, default=RESULTS_DIR / 'baseline.json')
+    parser.add_argument('--save', action='store_true', help="store this run as the baseline")
+    parser.add_argument('--threshold', type=float, default=1.3, help="fail when slower than this x baseline")
+    parser.add_argument('--min-delta-ms', type=float, default=1.0, help="ignore regressions smaller than this")
+    args = parser.parse_args(argv)
+
+    suites = [name.strip() for name in args.only.split(',') if name.strip()]
+    unknown = set(suites) - set(SUITES)
+    if unknown:
+        parser.error(f"unknown suites: {', '.join(sorted(unknown))}")
+
+    logging.disable(logging.WARNING)  # AppTest reruns log deprecation notices on every chart
+    runners = {'model': bench_model, 'figures': bench_figures, 'page': bench_page, 'service': bench_service}
+    results, info = {}, {}
+    for suite in suites:
+        suite_results, suite_info = runners[suite](args.repeat)
+        results.update(suite_results)
+        info.update(suite_info)
+
+    run = {'environment': environment(), 'repeat': args.repeat, 'results': results, 'info': info}
+    RESULTS_DIR.mkdir(exist_ok=True)
+    with open(RESULTS_DIR / 'history.jsonl', 'a') as history:
+        history.write(json.dumps(run) + '\n')
+
+    baseline = json.loads(args.baseline.read_text())['results'] if args.baseline.exists() else {}
+    regressions = compare(results, baseline, args.threshold, args.min_delta_ms)
+    for name, value in info.items():
+        print(f"  {name}: {value:,.0f}")
+
+    if args.save:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(run, indent=2) + '\n')
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) regressed past x{args.threshold}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
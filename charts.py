@@ -0,0 +1,282 @@
+"""Plotly figure builders for the dashboard.
+
+Figures are built from plain model results and never touch Streamlit, so the
+benchmark suite can construct them outside a running app. ``mobile=True``
+gives the compact single-column variant of each chart.
+
+Each chart's layout and trace styling are declared once in ``CHART_LAYOUTS``
+and ``CHART_TRACES``: keys shared by both variants, then the mobile and the
+desktop overrides. They are resolved once per (chart, variant, template) into
+a base spec, and a build only adds the data. The base spec embeds a copy of
+the Plotly template trimmed to the chart's trace types, which is most of a
+small chart's JSON.
+
+Builders are memoized on their data inputs, so a rerun that shows the same
+scenario again reuses the figure. Memoized figures are shared: treat them as
+read-only, and copy with ``go.Figure(fig)`` before changing one.
+"""
+from functools import lru_cache
+
+import numpy as np
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from spa_model import cached_price_sensitivity, cached_profit_surface, cached_utilization_curve
+
+# Chart grids are fetched through the shared spa_model caches, so their
+# parameters are tuples
+PROFIT_UTILIZATION_RATES = tuple(np.arange(0.05, 0.55, 0.05))
+PRICE_SENSITIVITY_LINES = {
+    'mobile': ((0.20, 0.30, 0.40), tuple(range(3000, 6100, 500))),  # fewer lines for mobile clarity
+    'desktop': ((0.10, 0.20, 0.30, 0.40, 0.50), tuple(range(2000, 6100, 500))),
+}
+FIGURE_CACHE_SIZE = 64
+# Trace types that read the template's default colour scales
+SCALED_TRACE_TYPES = frozenset({'heatmap'})
+
+LEGEND_BELOW = dict(orientation="h", yanchor="bottom", xanchor="center", x=0.5)
+ZERO_LINE = dict(type="line", xref="x domain", x0=0, x1=1, yref="y", y0=0, y1=0, line=dict(color="red", dash="dash"))
+BREAK_EVEN_LABEL = dict(text="Break-even", showarrow=False, xref="x domain", x=1, xanchor="right", yref="y", y=0, yanchor="bottom")
+NET_PROFIT_AXIS = dict(title=dict(text="Net Profit (₹)"))
+PRICE_AXIS = dict(title=dict(text="Treatment Price (₹)"))
+UTILIZATION_AXIS = dict(title=dict(text="Utilization %"))
+COMPACT_LINE_LAYOUT = dict(
+    title=dict(x=0.5, font=dict(size=14)),
+    height=300,
+    legend=dict(LEGEND_BELOW, y=-0.3),
+    margin=dict(t=50, b=80, l=50, r=50),
+    font=dict(size=10),
+)
+COMPACT_DONUT_MARGIN = dict(t=50, b=50, l=20, r=20)
+
+# (shared, mobile, desktop) layout of each chart
+CHART_LAYOUTS = {
+    'cost_pie': (
+        dict(title=dict(text="Cost & Profit Distribution"), showlegend=True),
+        dict(title=dict(x=0.5, font=dict(size=16)), height=350, legend=dict(LEGEND_BELOW, y=-0.2), margin=COMPACT_DONUT_MARGIN),
+        dict(height=400),
+    ),
+    'profit_waterfall': (
+        dict(showlegend=False),
+        dict(
+            title=dict(text="Profit Waterfall (₹ in thousands)", x=0.5, font=dict(size=16)),
+            height=350,
+            margin=COMPACT_DONUT_MARGIN,
+            xaxis=dict(tickfont=dict(size=10)),
+            yaxis=dict(tickfont=dict(size=10)),
+        ),
+        dict(title=dict(text="Profit Waterfall"), height=400),
+    ),
+    'profit_utilization': (
+        dict(xaxis=UTILIZATION_AXIS, yaxis=NET_PROFIT_AXIS, showlegend=True, shapes=[ZERO_LINE], annotations=[BREAK_EVEN_LABEL]),
+        COMPACT_LINE_LAYOUT,
+        dict(height=400),
+    ),
+    'price_sensitivity': (
+        dict(title=dict(text="Price Sensitivity Analysis"), xaxis=PRICE_AXIS, yaxis=NET_PROFIT_AXIS, showlegend=True, shapes=[ZERO_LINE]),
+        COMPACT_LINE_LAYOUT,
+        dict(height=400),
+    ),
+    'profit_surface': (
+        dict(title=dict(x=0.5), xaxis=PRICE_AXIS, yaxis=UTILIZATION_AXIS, showlegend=True),
+        dict(title=dict(font=dict(size=14)), height=350, legend=dict(LEGEND_BELOW, y=-0.35), margin=dict(t=50, b=80, l=50, r=20)),
+        dict(title=dict(font=dict(size=16)), height=500, legend=dict(LEGEND_BELOW, y=-0.2)),
+    ),
+}
+
+# (shared, mobile, desktop) style of each chart's traces, by role
+CHART_TRACES = {
+    'cost_pie': {
+        'pie': (dict(type='pie', hole=.3), dict(textinfo='label+percent', textfont=dict(size=12)), {}),
+    },
+    'profit_waterfall': {
+        'waterfall': (
+            dict(
+                type='waterfall',
+                name="Profit Calculation",
+                orientation="v",
+                measure=["absolute", "relative", "relative", "total"],
+                x=["Revenue", "Fixed Costs", "Variable Costs", "Net Profit"],
+                textposition="outside",
+                connector={"line": {"color": "rgb(63, 63, 63)"}},
+            ),
+            dict(textfont=dict(size=10)),
+            {},
+        ),
+    },
+    'profit_utilization': {
+        'curve': (
+            dict(type='scatter', mode='lines+markers', name='Net Profit', line=dict(color='#1f77b4', width=3)),
+            dict(marker=dict(size=6)),
+            dict(marker=dict(size=8)),
+        ),
+        'current': (
+            dict(type='scatter', mode='markers', name='Current Position'),
+            dict(marker=dict(size=12, color='red', symbol='star')),
+            dict(marker=dict(size=15, color='red', symbol='star')),
+        ),
+    },
+    'price_sensitivity': {
+        'line': (dict(type='scatter', mode='lines+markers', line=dict(width=2)), dict(marker=dict(size=4)), {}),
+    },
+    'profit_surface': {
+        'heatmap': (
+            dict(type='heatmap', colorscale='RdYlGn', zmid=0, zsmooth='best', hovertemplate="₹%{x:,.0f} @ %{y:.1f}%<br>%{z:,.1f}<extra></extra>"),
+            {},
+            {},
+        ),
+        'break_even': (dict(type='scatter', mode='lines', name='Break-even', line=dict(color='black', width=2, dash='dash')), {}, {}),
+        'current': (
+            dict(type='scatter', mode='markers', name='Current Position'),
+            dict(marker=dict(size=12, color='red', symbol='star')),
+            dict(marker=dict(size=15, color='red', symbol='star')),
+        ),
+    },
+}
+
+
+def _merged(base, updates):
+    """``base`` with ``updates`` applied, merging dict values one level deep"""
+    merged = dict(base)
+    for key, value in updates.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            value = {**merged[key], **value}
+        merged[key] = value
+    return merged
+
+
+@lru_cache(maxsize=None)
+def _template(name, trace_types):
+    """Template ``name`` reduced to what ``trace_types`` can use; the rest never applies.
+
+    Dropping the colour scales also skips their validation, the slowest part
+    of building a small figure.
+    """
+    template = pio.templates[name].to_plotly_json()
+    data = template.get('data', {})
+    layout = template.get('layout', {})
+    if SCALED_TRACE_TYPES.isdisjoint(trace_types):
+        layout = {key: value for key, value in layout.items() if key not in ('coloraxis', 'colorscale')}
+    return {
+        'data': {trace_type: data[trace_type] for trace_type in trace_types if trace_type in data},
+        'layout': layout,
+    }
+
+
+@lru_cache(maxsize=None)
+def _base_spec(chart, mobile, template):
+    """``(layout, {role: trace style})`` of one chart variant"""
+    variant = 1 if mobile else 2
+    styles = {role: _merged(style[0], style[variant]) for role, style in CHART_TRACES[chart].items()}
+    trace_types = tuple(sorted({style['type'] for style in styles.values()}))
+    layout = CHART_LAYOUTS[chart]
+    layout = _merged(_merged(layout[0], layout[variant]), {'template': _template(template, trace_types)})
+    return layout, styles
+
+
+def _figure(chart, mobile, template, traces, **layout):
+    """Figure of ``chart`` from its base spec; ``traces`` are ``(role, data)`` pairs"""
+    base_layout, styles = _base_spec(chart, mobile, template or pio.templates.default)
+    return go.Figure({
+        'data': [{**styles[role], **data} for role, data in traces],
+        'layout': _merged(base_layout, layout) if layout else base_layout,
+    })
+
+
+def figure_cache_clear():
+    """Drop the memoized figures (the base specs are kept)"""
+    for builder in (_cost_pie_figure, _profit_waterfall_figure, profit_utilization_figure,
+                    price_sensitivity_figure, profit_surface_figure):
+        builder.cache_clear()
+
+
+def cost_pie_figure(metrics, mobile=False, template=None):
+    """Fixed costs, variable costs and profit (or loss) as a donut chart"""
+    return _cost_pie_figure(metrics['fixed_costs'], metrics['variable_costs'], metrics['net_profit'], mobile, template)
+
+
+@lru_cache(maxsize=FIGURE_CACHE_SIZE)
+def _cost_pie_figure(fixed_costs, variable_costs, net_profit, mobile, template):
+    profitable = net_profit > 0
+    return _figure('cost_pie', mobile, template, [('pie', dict(
+        labels=['Fixed Costs', 'Variable Costs', 'Profit' if profitable else 'Loss'],
+        values=[fixed_costs, variable_costs, abs(net_profit)],
+        marker=dict(colors=['#FF6B6B', '#4ECDC4', '#95E77E' if profitable else '#FFB6C1']),
+    ))])
+
+
+def profit_waterfall_figure(metrics, mobile=False, template=None):
+    """Revenue less fixed and variable costs down to net profit"""
+    return _profit_waterfall_figure(
+        metrics['revenue'], metrics['fixed_costs'], metrics['variable_costs'], metrics['net_profit'], mobile, template
+    )
+
+
+@lru_cache(maxsize=FIGURE_CACHE_SIZE)
+def _profit_waterfall_figure(revenue, fixed_costs, variable_costs, net_profit, mobile, template):
+    if mobile:
+        text = [f"₹{revenue/1000:.0f}K",
+                f"-₹{fixed_costs/1000:.0f}K",
+                f"-₹{variable_costs/1000:.0f}K",
+                f"₹{net_profit/1000:.0f}K"]
+    else:
+        text = [f"₹{revenue:,.0f}",
+                f"-₹{fixed_costs:,.0f}",
+                f"-₹{variable_costs:,.0f}",
+                f"₹{net_profit:,.0f}"]
+    return _figure('profit_waterfall', mobile, template, [
+        ('waterfall', dict(y=[revenue, -fixed_costs, -variable_costs, net_profit], text=text)),
+    ])
+
+
+@lru_cache(maxsize=FIGURE_CACHE_SIZE)
+def profit_utilization_figure(config, price, product_pct, current_utilization, current_profit, mobile=False, template=None):
+    """Net profit across utilization rates at one price, with the current position"""
+    grid = cached_utilization_curve(config, price, product_pct, PROFIT_UTILIZATION_RATES)
+    return _figure('profit_utilization', mobile, template, [
+        ('curve', dict(x=[u*100 for u in PROFIT_UTILIZATION_RATES], y=grid['net_profit'])),
+        ('current', dict(x=[current_utilization], y=[current_profit])),
+    ], title=dict(text=f"Profit vs Utilization @ ₹{price}"))
+
+
+@lru_cache(maxsize=FIGURE_CACHE_SIZE)
+def price_sensitivity_figure(config, product_pct, mobile=False, template=None):
+    """Net profit across prices, one line per utilization rate"""
+    util_lines, price_range = PRICE_SENSITIVITY_LINES['mobile' if mobile else 'desktop']
+    price_grid = cached_price_sensitivity(config, util_lines, price_range, product_pct)
+    suffix = '%' if mobile else '% Utilization'
+    return _figure('price_sensitivity', mobile, template, [
+        ('line', dict(x=list(price_range), y=profits_at_prices, name=f'{int(util*100)}{suffix}'))
+        for util, profits_at_prices in zip(util_lines, price_grid['net_profit'])
+    ])
+
+
+def warm_chart_data(config, price, product_pct, surface_resolutions=()):
+    """Precompute the grids behind every chart variant for one scenario"""
+    cached_utilization_curve(config, price, product_pct, PROFIT_UTILIZATION_RATES)
+    for util_lines, price_range in PRICE_SENSITIVITY_LINES.values():
+        cached_price_sensitivity(config, util_lines, price_range, product_pct)
+    for resolution in surface_resolutions:
+        cached_profit_surface(config, product_pct, resolution)
+
+
+@lru_cache(maxsize=FIGURE_CACHE_SIZE)
+def profit_surface_figure(config, price, utilization, product_pct, metric_label, resolution, mobile=False, template=None):
+    """Heatmap of profit or margin over price x utilization with the break-even line"""
+    prices, util_pct, grid = cached_profit_surface(config, product_pct, resolution)
+    metric = 'net_profit' if metric_label.startswith("Net Profit") else 'margin'
+
+    # Break-even utilization depends only on price, so the zero-profit contour is a 1-D curve
+    break_even_util = grid['break_even_customers'][0] / config.max_capacity * 100
+    break_even_util[(break_even_util <= 0) | (break_even_util > util_pct[-1])] = np.nan
+
+    return _figure('profit_surface', mobile, template, [
+        ('heatmap', dict(
+            x=prices,
+            y=util_pct,
+            z=grid[metric].astype(np.float32),  # float32 halves the serialized payload
+            colorbar=dict(title=dict(text=metric_label)),
+        )),
+        ('break_even', dict(x=prices, y=break_even_util)),
+        ('current', dict(x=[price], y=[utilization])),
+    ], title=dict(text=f"{metric_label} by Price and Utilization"))
@@ -1,10 +1,75 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+
 import streamlit as st
 import pandas as pd
 import numpy as np
+import plotly
 import plotly.graph_objects as go
 import plotly.express as px
+import pyarrow as pa
+import pyarrow.parquet as pq
 from plotly.subplots import make_subplots
 
+from spa_model import (
+    BEDS,
+    DEFAULT_CONFIG,
+    DEFAULT_MENU,
+    DEFAULT_MIX,
+    INTERIOR_CAPEX,
+    MAX_CAPACITY,
+    METRIC_NAMES,
+    SURFACE_RESOLUTION,
+    TREATMENTS_PER_BED_PER_DAY,
+    WORKING_DAYS,
+    CapacityInputs,
+    ConstantElasticity,
+    KPIGraph,
+    LinearDemand,
+    Portfolio,
+    ProjectionAssumptions,
+    RiskInputs,
+    ScenarioStore,
+    Service,
+    cached_capacity,
+    cached_explorer_payload,
+    cached_metrics,
+    cached_mix_search,
+    cached_price_optimum,
+    cached_risk,
+    cached_tornado,
+    cached_two_way,
+    compare_scenarios,
+    effective_config,
+    example_portfolio,
+    financial_breakdown,
+    fit_demand,
+    kpi_deltas,
+    kpi_cards,
+    metrics_cache_info,
+    mix_metrics,
+    payback_map,
+    project_cash_flows,
+    recommendations,
+    sensitivity_drivers,
+)
+from spa_model.ledger import LedgerStore, compare_to_model, example_ledger
+from explorer_component import frontend_ready, scenario_explorer
+from static_report import build_report, report_fingerprint
+from charts import (
+    cost_pie_figure,
+    price_sensitivity_figure,
+    profit_surface_figure,
+    profit_utilization_figure,
+    profit_waterfall_figure,
+    warm_chart_data,
+)
+
 # Page configuration
 st.set_page_config(
     page_title="12-Bed Spa Profitability Dashboard",
@@ -13,6 +78,121 @@ st.set_page_config(
     initial_sidebar_state="collapsed"  # Start collapsed for button-based interface
 )
 
+# Rerun diagnostics (opt-in from the sidebar): records which page sections
+# executed in the current run (a full script rerun or a fragment-only rerun),
+# how long each took, how many scenarios were evaluated and how many bytes
+# each chart sent, plus an optional cProfile capture of one rerun
+PAGE_SECTIONS = (
+    "page_setup", "sidebar", "quick_controls", "quick_summary", "active_tab",
+    "comparative_analysis", "explorer", "breakdown", "sensitivity", "risk_simulation", "capacity_simulation",
+    "cash_flow_projection", "treatment_mix", "scenario_store", "actuals", "price_optimizer",
+    "recommendations", "parameters_overview", "portfolio",
+)
+PROFILE_TOP_FUNCTIONS = 30
+
+def start_run_log(scope):
+    now = time.perf_counter()
+    st.session_state.run_log = {
+        'scope': scope, 'sections': [], 'timings': [], 'started': now, 'last_mark': now,
+        'metrics_calls': 0, 'cache_misses_start': metrics_cache_info().misses, 'figures': [],
+        'kpi_invalidated': [], 'kpi_recomputed': [],
+    }
+    start_profiler_if_armed()
+
+def log_section(name, detail=None):
+    run_log = st.session_state.run_log
+    now = time.perf_counter()
+    run_log['sections'].append(name)
+    run_log['timings'].append((f"{name} [{detail}]" if detail else name, (now - run_log['last_mark']) * 1000))
+    run_log['last_mark'] = now
+
+def show_chart(fig, key):
+    """st.plotly_chart, recording the figure's payload size when diagnostics are on"""
+    if st.session_state.get('measure_reruns'):
+        st.session_state.run_log['figures'].append((key, len(plotly.io.to_json(fig, validate=False))))
+    st.plotly_chart(fig, use_container_width=True, key=key)
+
+def arm_profiler():
+    # The button's own rerun is skipped; the interaction after it is profiled
+    st.session_state._profile_state = "arming"
+
+def start_profiler_if_armed():
+    state = st.session_state.get('_profile_state')
+    if state == "arming":
+        st.session_state._profile_state = "armed"
+    elif state == "armed":
+        st.session_state._profile_state = None
+        profiler = cProfile.Profile()
+        profiler.enable()
+        st.session_state.run_log['profiler'] = profiler
+
+def stop_profiler():
+    run_log = st.session_state.run_log
+    profiler = run_log.pop('profiler', None)
+    if profiler is None:
+        return
+    profiler.disable()
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(PROFILE_TOP_FUNCTIONS)
+    st.session_state.last_profile = {'scope': run_log['scope'], 'report': out.getvalue()}
+
+def run_report(label):
+    """JSON-serializable summary of the current run"""
+    run_log = st.session_state.run_log
+    return {
+        'label': label,
+        'scope': run_log['scope'],
+        'total_ms': round((time.perf_counter() - run_log['started']) * 1000, 2),
+        'sections': [{'name': name, 'ms': round(ms, 2)} for name, ms in run_log['timings']],
+        'calculate_metrics_calls': run_log['metrics_calls'],
+        'metrics_cache_misses': metrics_cache_info().misses - run_log['cache_misses_start'],
+        'figures': [{'key': key, 'bytes': size} for key, size in run_log['figures']],
+        'figure_bytes_total': sum(size for _, size in run_log['figures']),
+        'kpi_nodes_invalidated': run_log['kpi_invalidated'],
+        'kpi_nodes_recomputed': run_log['kpi_recomputed'],
+    }
+
+def show_run_report(label):
+    stop_profiler()
+    if not st.session_state.get('measure_reruns'):
+        return
+    run_log = st.session_state.run_log
+    report = run_report(label)
+    st.caption(
+        f"📏 {label} ({run_log['scope']} rerun): executed {len(run_log['sections'])}/{len(PAGE_SECTIONS)} "
+        f"sections in {report['total_ms']:.0f} ms: {', '.join(run_log['sections'])}"
+    )
+
+    with st.expander(f"🩺 Diagnostics: {label.lower()}", expanded=False):
+        col1, col2, col3 = st.columns(3)
+        col1.metric("calculate_metrics calls", report['calculate_metrics_calls'], f"{report['metrics_cache_misses']} cache misses", delta_color="off")
+        col2.metric("Figures sent", len(report['figures']))
+        col3.metric("Figure payload", f"{report['figure_bytes_total'] / 1024:,.1f} KB")
+
+        st.caption(
+            f"KPI graph: {len(report['kpi_nodes_invalidated'])} nodes invalidated by this change, "
+            f"{len(report['kpi_nodes_recomputed'])} recomputed: {', '.join(report['kpi_nodes_recomputed']) or 'none'}"
+        )
+        st.dataframe(pd.DataFrame(report['sections'], columns=['name', 'ms']), use_container_width=True, hide_index=True)
+        if report['figures']:
+            st.dataframe(pd.DataFrame(report['figures']), use_container_width=True, hide_index=True)
+
+        st.download_button(
+            "⬇️ Export JSON", json.dumps(report, indent=2), file_name=f"rerun_{run_log['scope']}.json",
+            mime="application/json", key=f"export_run_report_{run_log['scope']}"
+        )
+        if 'last_profile' in st.session_state:
+            st.markdown(f"**cProfile of the last profiled {st.session_state.last_profile['scope']} rerun**")
+            st.code(st.session_state.last_profile['report'], language=None)
+
+def start_fragment_log():
+    """Fragment-only reruns get a fresh log; during a full rerun fragments log into the page's"""
+    if not st.session_state.get('_full_run_active'):
+        start_run_log("fragment")
+
+start_run_log("app")
+st.session_state._full_run_active = True
+
 # Custom CSS for better styling and mobile responsiveness
 st.markdown("""
     <style>
@@ -131,37 +311,62 @@ st.markdown("""
 st.title("🏢 12-Bed Spa Profitability Dashboard - Mumbai")
 st.markdown("### Interactive Analysis Tool for Spa Business Planning")
 
+log_section("page_setup")
 
-# Constants
-MAX_CAPACITY = 1560  # 12 beds × 5 treatments × 26 days
-WORKING_DAYS = 26
 
-# One-time capital expenditure
-INTERIOR_CAPEX = 10000000  # ₹1 crore for interior setup
+# Static report bundle for read-only viewers. It always shows the canonical
+# DEFAULT_CONFIG, never a session's overrides, and is rebuilt once per server
+# process whenever the fingerprint in its manifest no longer matches
+REPORT_DIR = os.environ.get("SPA_REPORT_DIR", "report")
 
-# Fixed costs (updated values)
-FIXED_COSTS = {
-    'Rent (displacement)': 200000,
-    'Salary (14 staff)': 475000,
-    'Electricity': 45000,
-    'Marketing': 125000,
-    'IISC': 10000,
-    'Accommodation': 100000,
-    'Snacks (26 days)': 10000
-}
+@st.cache_resource(show_spinner=False)
+def publish_static_report(out_dir, fingerprint):
+    """Build the bundle unless it is up to date; ``fingerprint`` keys the cache per config and report version"""
+    return build_report(out_dir, DEFAULT_CONFIG)
 
-TOTAL_FIXED = sum(FIXED_COSTS.values())
+publish_static_report(REPORT_DIR, report_fingerprint(DEFAULT_CONFIG))
 
-# Variable costs per customer
-VARIABLE_PER_CUSTOMER = {
-    'Laundry': 35,
-    'Bathrobe': 50,
-    'Disposal': 10,
-    'Disposal U': 20,
-    'Incentive': 200
-}
+# Site constants and default costs live in the headless model (spa_model.config);
+# the sidebar replaces COST_CONFIG (never mutates it) when costs are overridden
+COST_CONFIG = DEFAULT_CONFIG
+FIXED_COSTS = COST_CONFIG.fixed_dict()
+TOTAL_FIXED = COST_CONFIG.total_fixed
+VARIABLE_PER_CUSTOMER = COST_CONFIG.variable_dict()
+TOTAL_VARIABLE_PER_CUSTOMER = COST_CONFIG.total_variable
 
-TOTAL_VARIABLE_PER_CUSTOMER = sum(VARIABLE_PER_CUSTOMER.values())
+def calculate_metrics(customers, price, product_pct=5.0):
+    """Calculate all financial metrics with enhanced KPIs (memoized per cost config)"""
+    st.session_state.run_log['metrics_calls'] += 1
+    return cached_metrics(COST_CONFIG, customers, price, product_pct)
+
+# Quick Controls presets
+COST_OPTIONS = [3000, 3500, 4000, 4500, 5000, 5500]
+CUSTOMER_OPTIONS = [156, 312, 468, 624, 780]
+PRODUCT_OPTIONS = [2.0, 3.0, 4.0, 5.0, 6.0]
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def start_preset_warmup(config):
+    """Compute the metrics and chart grids of every preset combination in the background.
+
+    Runs once per server process and cost configuration; results land in the
+    shared spa_model caches, so any session's first click is served from memory.
+    A changed configuration is a new cache key and gets its own warm-up.
+    """
+    status = {'total': len(COST_OPTIONS) * len(CUSTOMER_OPTIONS) * len(PRODUCT_OPTIONS), 'done': 0, 'seconds': None}
+
+    def warm():
+        started = time.perf_counter()
+        for product_pct in PRODUCT_OPTIONS:
+            warm_chart_data(config, COST_OPTIONS[0], product_pct, SURFACE_RESOLUTION.values())
+            for price in COST_OPTIONS:
+                warm_chart_data(config, price, product_pct)
+                for customers in CUSTOMER_OPTIONS:
+                    cached_metrics(config, customers, price, product_pct)
+                    status['done'] += 1
+        status['seconds'] = time.perf_counter() - started
+
+    threading.Thread(target=warm, name="preset-warmup", daemon=True).start()
+    return status
 
 # Initialize session state for persistent selections
 if 'treatment_cost' not in st.session_state:
@@ -171,175 +376,1059 @@ if 'num_customers' not in st.session_state:
 if 'product_cost_pct' not in st.session_state:
     st.session_state.product_cost_pct = 5.0
 
+# Optional: Advanced Settings in Sidebar (collapsed by default). Sidebar widgets
+# trigger a full rerun, so the cost configuration is settled before any fragment runs.
+with st.sidebar:
+    st.header("🔧 Advanced Settings")
+    modify_fixed = st.checkbox("Modify Fixed Costs")
+
+    if modify_fixed:
+        rent = st.number_input("Rent (displacement)", value=FIXED_COSTS['Rent (displacement)'], step=10000)
+        salary = st.number_input("Salary", value=FIXED_COSTS['Salary (14 staff)'], step=5000)
+        electricity = st.number_input("Electricity", value=FIXED_COSTS['Electricity'], step=1000)
+        marketing = st.number_input("Marketing", value=FIXED_COSTS['Marketing'], step=5000)
+
+        COST_CONFIG = COST_CONFIG.with_fixed_costs(**{
+            'Rent (displacement)': rent,
+            'Salary (14 staff)': salary,
+            'Electricity': electricity,
+            'Marketing': marketing,
+        })
+        FIXED_COSTS = COST_CONFIG.fixed_dict()
+        TOTAL_FIXED = COST_CONFIG.total_fixed
+
+    # Staffed capacity applied from the capacity simulation: every KPI,
+    # break-even and chart then measures against the slots that can be sold
+    CAPACITY_NOTE = ""  # labels the nominal figure wherever the simulated one is shown
+    if st.session_state.get('applied_capacity'):
+        COST_CONFIG = COST_CONFIG.with_capacity(st.session_state.applied_capacity)
+        CAPACITY_NOTE = f" (nominal {MAX_CAPACITY:,})"
+        st.caption(f"🛏️ Using simulated capacity: {COST_CONFIG.max_capacity:,} treatments/month{CAPACITY_NOTE}")
+        st.button("Use nominal capacity", key="reset_capacity", on_click=st.session_state.pop, args=("applied_capacity", None))
+
+    st.checkbox("📏 Measure rerun scope", key="measure_reruns", help="Report which sections each click re-executes, with timings and chart payloads")
+    if st.session_state.measure_reruns:
+        profiling = st.session_state.get('_profile_state') is not None
+        st.button("🔬 Profile next interaction", on_click=arm_profiler, disabled=profiling, help="Capture a cProfile of the next rerun")
+
+    warmup = start_preset_warmup(COST_CONFIG)
+    if warmup['seconds'] is None:
+        st.caption(f"⏳ Warming preset cache: {warmup['done']}/{warmup['total']} scenarios")
+    else:
+        st.caption(f"⚡ Preset cache ready: {warmup['total']} scenarios in {warmup['seconds'] * 1000:.0f} ms")
+
+    cache_stats = metrics_cache_info()
+    st.caption(f"Metrics cache: {cache_stats.hits} hits / {cache_stats.misses} misses ({cache_stats.currsize} scenarios)")
+
+    st.caption(f"📄 Static report of the default costs: `{REPORT_DIR}/index.html`")
+
+log_section("sidebar")
+
 # Interactive Button Controls
-st.markdown("## ⚙️ Quick Controls")
+def select_option(state_key, value):
+    """Button callback: store the selection before the fragment reruns"""
+    st.session_state[state_key] = value
+
+def apply_custom_customers():
+    st.session_state.num_customers = st.session_state.custom_input
+    st.session_state.show_custom_input = False
+
+def render_quick_controls():
+    """Price, customer and product-cost buttons; clicks rerun only the scenario fragment"""
+    st.markdown("## ⚙️ Quick Controls")
+
+    # Treatment Cost Buttons
+    st.markdown("### 💰 Treatment Cost (₹)")
+    cost_col1, cost_col2, cost_col3, cost_col4, cost_col5, cost_col6 = st.columns(6)
+
+    cost_options = COST_OPTIONS
+    cost_labels = ["₹3,000", "₹3,500", "₹4,000", "₹4,500", "₹5,000", "₹5,500"]
+
+    for i, (col, cost, label) in enumerate(zip([cost_col1, cost_col2, cost_col3, cost_col4, cost_col5, cost_col6], cost_options, cost_labels)):
+        with col:
+            button_type = "primary" if st.session_state.treatment_cost == cost else "secondary"
+            st.button(label, key=f"cost_{cost}", type=button_type, on_click=select_option, args=("treatment_cost", cost))
+
+    # Customer Count Buttons
+    st.markdown("### 👥 Number of Customers per Month")
+    cust_col1, cust_col2, cust_col3, cust_col4, cust_col5, cust_col6 = st.columns(6)
+
+    customer_options = CUSTOMER_OPTIONS
+    customer_labels = ["156 (10%)", "312 (20%)", "468 (30%)", "624 (40%)", "780 (50%)"]
+
+    for i, (col, customers, label) in enumerate(zip([cust_col1, cust_col2, cust_col3, cust_col4, cust_col5], customer_options, customer_labels)):
+        with col:
+            button_type = "primary" if st.session_state.num_customers == customers else "secondary"
+            st.button(label, key=f"cust_{customers}", type=button_type, on_click=select_option, args=("num_customers", customers))
+
+    with cust_col6:
+        st.button("Custom", key="cust_custom", on_click=select_option, args=("show_custom_input", True))
+
+    # Custom customer input
+    if st.session_state.get('show_custom_input'):
+        st.number_input("Enter custom number of customers:", min_value=50, max_value=1560, value=st.session_state.num_customers, step=10, key="custom_input")
+        st.button("Apply Custom Value", key="apply_custom", on_click=apply_custom_customers)
+
+    # Product Cost Percentage Buttons
+    st.markdown("### 📦 Product Cost (% of Revenue)")
+    prod_col1, prod_col2, prod_col3, prod_col4, prod_col5 = st.columns(5)
+
+    product_options = PRODUCT_OPTIONS
+    product_labels = ["2%", "3%", "4%", "5%", "6%"]
+
+    for i, (col, pct, label) in enumerate(zip([prod_col1, prod_col2, prod_col3, prod_col4, prod_col5], product_options, product_labels)):
+        with col:
+            button_type = "primary" if st.session_state.product_cost_pct == pct else "secondary"
+            st.button(label, key=f"prod_{pct}", type=button_type, on_click=select_option, args=("product_cost_pct", pct))
+
+    log_section("quick_controls")
+
+# Per-session KPI dependency graph for the current scenario: a click drops only
+# the KPIs downstream of the input it changed, and each consumer asks for just
+# the KPIs it shows
+def scenario_kpis(num_customers, treatment_cost, product_cost_pct):
+    inputs = dict(customers=num_customers, price=treatment_cost, product_pct=product_cost_pct, **COST_CONFIG.model_params())
+    graph = st.session_state.get('kpi_graph')
+    if graph is None:
+        graph = st.session_state.kpi_graph = KPIGraph(**inputs)
+    else:
+        st.session_state.run_log['kpi_invalidated'] = sorted(graph.update(**inputs))
+    return graph
 
-# Treatment Cost Buttons
-st.markdown("### 💰 Treatment Cost (₹)")
-cost_col1, cost_col2, cost_col3, cost_col4, cost_col5, cost_col6 = st.columns(6)
+def scenario_kpi_values(graph, *names):
+    """Scalar KPIs from the graph, logging which nodes had to be recomputed"""
+    values = graph.scalars(*names)
+    st.session_state.run_log['kpi_recomputed'].extend(graph.last_recomputed)
+    return values
 
-cost_options = [3000, 3500, 4000, 4500, 5000, 5500]
-cost_labels = ["₹3,000", "₹3,500", "₹4,000", "₹4,500", "₹5,000", "₹5,500"]
+# Quick summary for mobile users
+def render_quick_summary(kpis):
+    if st.checkbox("📱 Show Quick Summary", value=False):
+        current_metrics = scenario_kpi_values(kpis, 'net_profit', 'utilization', 'break_even_customers')
 
-for i, (col, cost, label) in enumerate(zip([cost_col1, cost_col2, cost_col3, cost_col4, cost_col5, cost_col6], cost_options, cost_labels)):
-    with col:
-        button_type = "primary" if st.session_state.treatment_cost == cost else "secondary"
-        if st.button(label, key=f"cost_{cost}", type=button_type):
-            st.session_state.treatment_cost = cost
-            st.rerun()
+        col1, col2 = st.columns(2)
+        with col1:
+            status = "✅ Profitable" if current_metrics['net_profit'] > 0 else "❌ Loss"
+            st.info(f"**Status**: {status}")
+            st.info(f"**Utilization**: {current_metrics['utilization']:.1f}%")
 
-treatment_cost = st.session_state.treatment_cost
+        with col2:
+            st.info(f"**Monthly Profit**: ₹{current_metrics['net_profit']:,.0f}")
+            st.info(f"**Break-even**: {current_metrics['break_even_customers']:.0f} customers")
 
-# Customer Count Buttons
-st.markdown("### 👥 Number of Customers per Month")
-cust_col1, cust_col2, cust_col3, cust_col4, cust_col5, cust_col6 = st.columns(6)
+        st.markdown("---")
 
-customer_options = [156, 312, 468, 624, 780]
-customer_labels = ["156 (10%)", "312 (20%)", "468 (30%)", "624 (40%)", "780 (50%)"]
+    log_section("quick_summary")
 
-for i, (col, customers, label) in enumerate(zip([cust_col1, cust_col2, cust_col3, cust_col4, cust_col5], customer_options, customer_labels)):
-    with col:
-        button_type = "primary" if st.session_state.num_customers == customers else "secondary"
-        if st.button(label, key=f"cust_{customers}", type=button_type):
-            st.session_state.num_customers = customers
-            st.rerun()
+# Function to display metrics
+def display_metrics(customers, price, product_pct, tab_name="Custom", metrics=None):
+    if metrics is None:
+        metrics = calculate_metrics(customers, price, product_pct)
+
+    # KPI cards: primary KPIs, enhanced metrics, break-even and CAPEX payback
+    for heading, cards in kpi_cards(customers, price, product_pct, COST_CONFIG, metrics):
+        if heading:
+            st.markdown(f"### {heading}")
+        for col, card in zip(st.columns(len(cards)), cards):
+            with col:
+                st.metric(card['label'], card['value'], card['delta'], delta_color=card['delta_color'])
 
-with cust_col6:
-    if st.button("Custom", key="cust_custom"):
-        st.session_state.show_custom_input = True
-        st.rerun()
+    # Row 4: Visual Analysis
+    st.markdown("### 📈 Visual Analysis")
 
-# Custom customer input
-if hasattr(st.session_state, 'show_custom_input') and st.session_state.show_custom_input:
-    custom_customers = st.number_input("Enter custom number of customers:", min_value=50, max_value=1560, value=st.session_state.num_customers, step=10, key="custom_input")
-    if st.button("Apply Custom Value", key="apply_custom"):
-        st.session_state.num_customers = custom_customers
-        st.session_state.show_custom_input = False
-        st.rerun()
+    # Use responsive layout for mobile
+    # Remember the choice per tab, since the widget is not rendered while its tab is hidden
+    view_pref = f"single_column_{tab_name}"
+    use_single_column = st.checkbox("📱 Single Column View (Mobile Friendly)", value=st.session_state.get(view_pref, False), key=f"mobile_view_{tab_name}")
+    st.session_state[view_pref] = use_single_column
 
-num_customers = st.session_state.num_customers
+    fig_pie = cost_pie_figure(metrics, mobile=use_single_column)
+    fig_waterfall = profit_waterfall_figure(metrics, mobile=use_single_column)
 
-# Calculate current utilization
-current_utilization = (num_customers / MAX_CAPACITY) * 100
+    if use_single_column:
+        # Single column layout for mobile
+        show_chart(fig_pie, key=f"pie_chart_{tab_name}")
+        show_chart(fig_waterfall, key=f"waterfall_chart_{tab_name}")
+    else:
+        # Two column layout for desktop
+        col1, col2 = st.columns(2)
+        with col1:
+            show_chart(fig_pie, key=f"pie_chart_{tab_name}")
+        with col2:
+            show_chart(fig_waterfall, key=f"waterfall_chart_{tab_name}")
+    
+    return metrics
 
-# Product Cost Percentage Buttons
-st.markdown("### 📦 Product Cost (% of Revenue)")
-prod_col1, prod_col2, prod_col3, prod_col4, prod_col5 = st.columns(5)
+# Quick utilization tabs: a session-state backed selector so only the active
+# view's metrics and figures are built and sent on each rerun
+TAB_LABELS = ["📊 Custom", "10%", "20%", "30%", "40%", "50%"]
+if 'active_tab' not in st.session_state:
+    st.session_state.active_tab = TAB_LABELS[0]
 
-product_options = [2.0, 3.0, 4.0, 5.0, 6.0]
-product_labels = ["2%", "3%", "4%", "5%", "6%"]
+UTILIZATION_RATES = [0.10, 0.20, 0.30, 0.40, 0.50]
 
-for i, (col, pct, label) in enumerate(zip([prod_col1, prod_col2, prod_col3, prod_col4, prod_col5], product_options, product_labels)):
-    with col:
-        button_type = "primary" if st.session_state.product_cost_pct == pct else "secondary"
-        if st.button(label, key=f"prod_{pct}", type=button_type):
-            st.session_state.product_cost_pct = pct
-            st.rerun()
+def render_active_tab(num_customers, treatment_cost, product_cost_pct, kpis):
+    active_tab = st.radio("View", TAB_LABELS, horizontal=True, key="active_tab", label_visibility="collapsed")
 
-product_cost_pct = st.session_state.product_cost_pct
+    if active_tab == TAB_LABELS[0]:  # Custom tab: the current scenario, from the KPI graph
+        st.subheader(f"Custom Analysis: {num_customers} customers @ ₹{treatment_cost}")
+        display_metrics(num_customers, treatment_cost, product_cost_pct, metrics=scenario_kpi_values(kpis, *METRIC_NAMES))
+    else:  # Predefined utilization tabs
+        util_rate = UTILIZATION_RATES[TAB_LABELS.index(active_tab) - 1]
+        customers_at_util = int(util_rate * COST_CONFIG.max_capacity)
+        st.subheader(f"{int(util_rate*100)}% Utilization: {customers_at_util} customers @ ₹{treatment_cost}")
+        display_metrics(customers_at_util, treatment_cost, product_cost_pct, f"{int(util_rate*100)}%")
 
-# Display current selections
-st.info(f"🎯 **Current Selection**: ₹{treatment_cost:,} per treatment | {num_customers} customers ({current_utilization:.1f}% utilization) | {product_cost_pct}% product cost")
+    log_section("active_tab", active_tab)
 
-# Optional: Advanced Settings in Sidebar (collapsed by default)
-with st.sidebar:
-    st.header("🔧 Advanced Settings")
-    modify_fixed = st.checkbox("Modify Fixed Costs")
+# Comparison Analysis Section
+def render_comparative_analysis(num_customers, treatment_cost, product_cost_pct):
+    """Profit vs utilization and price sensitivity charts"""
+    current_utilization = (num_customers / COST_CONFIG.max_capacity) * 100
 
-    if modify_fixed:
-        rent = st.number_input("Rent (displacement)", value=FIXED_COSTS['Rent (displacement)'], step=10000)
-        salary = st.number_input("Salary", value=FIXED_COSTS['Salary (14 staff)'], step=5000)
-        electricity = st.number_input("Electricity", value=FIXED_COSTS['Electricity'], step=1000)
-        marketing = st.number_input("Marketing", value=FIXED_COSTS['Marketing'], step=5000)
+    st.markdown("---")
+    st.header("📈 Comparative Analysis")
 
-        FIXED_COSTS['Rent (displacement)'] = rent
-        FIXED_COSTS['Salary (14 staff)'] = salary
-        FIXED_COSTS['Electricity'] = electricity
-        FIXED_COSTS['Marketing'] = marketing
-        TOTAL_FIXED = sum(FIXED_COSTS.values())
+    # Mobile-friendly comparison charts
+    mobile_charts = st.checkbox("📱 Mobile-Friendly Charts", value=False, key="mobile_charts_comparison")
 
-# Quick summary for mobile users
-if st.checkbox("📱 Show Quick Summary", value=False):
     current_metrics = calculate_metrics(num_customers, treatment_cost, product_cost_pct)
+    fig_profit = profit_utilization_figure(COST_CONFIG, treatment_cost, product_cost_pct, current_utilization, current_metrics['net_profit'], mobile=mobile_charts)
+    fig_price = price_sensitivity_figure(COST_CONFIG, product_cost_pct, mobile=mobile_charts)
 
-    col1, col2 = st.columns(2)
-    with col1:
-        status = "✅ Profitable" if current_metrics['net_profit'] > 0 else "❌ Loss"
-        st.info(f"**Status**: {status}")
-        st.info(f"**Utilization**: {current_metrics['utilization']:.1f}%")
+    if mobile_charts:
+        # Single column layout for mobile
+        st.markdown("#### 📊 Profit vs Utilization Analysis")
+        show_chart(fig_profit, key="profit_utilization_chart")
 
-    with col2:
-        st.info(f"**Monthly Profit**: ₹{current_metrics['net_profit']:,.0f}")
-        st.info(f"**Break-even**: {current_metrics['break_even_customers']:.0f} customers")
+        st.markdown("#### 💰 Price Sensitivity Analysis")
+        show_chart(fig_price, key="price_sensitivity_chart")
 
+    else:
+        # Desktop two-column layout
+        col1, col2 = st.columns(2)
+        with col1:
+            show_chart(fig_profit, key="profit_utilization_chart")
+        with col2:
+            show_chart(fig_price, key="price_sensitivity_chart")
+
+    # Full price x utilization surface, evaluated in one batch; the grid is
+    # coarser on mobile so the figure payload stays small
+    st.markdown("#### 🗺️ Profit Surface (Price × Utilization)")
+    surface_metric = st.radio("Surface metric", ["Net Profit (₹)", "Margin (%)"], horizontal=True, key="surface_metric", label_visibility="collapsed")
+    resolution = SURFACE_RESOLUTION['mobile' if mobile_charts else 'desktop']
+    fig_surface = profit_surface_figure(COST_CONFIG, treatment_cost, current_utilization, product_cost_pct, surface_metric, resolution, mobile_charts)
+    show_chart(fig_surface, key="profit_surface_chart")
+
+    log_section("comparative_analysis")
+
+# Client-side explorer: the KPI grid for the current costs is sent to the
+# browser once, and dragging through price, customers and product % is
+# interpolated there without rerunning the app
+def render_explorer(num_customers, treatment_cost, product_cost_pct):
+    """Price x customers x product % explorer running in the browser"""
     st.markdown("---")
 
-# Quick utilization tabs
-tab_labels = ["📊 Custom", "10%", "20%", "30%", "40%", "50%"]
-tabs = st.tabs(tab_labels)
+    with st.expander("🧭 Scenario Explorer", expanded=False):
+        st.markdown("### Explore scenarios without waiting for the server")
+
+        if not frontend_ready():
+            st.info("Set up the explorer once per install with `python -m explorer_component`, then reload the page.")
+        elif st.checkbox("Load explorer", value=False, key="run_explorer"):
+            grid, payload, errors = cached_explorer_payload(COST_CONFIG)
+            n_pcts, n_customers, n_prices = grid.shape
+            note = (
+                f"Grid of {n_prices} prices × {n_customers} customer levels × {n_pcts} product cost levels "
+                f"({grid.payload_bytes / 1024:,.0f} KB). Between grid points the cards are interpolated; "
+                f"typical (P95) error: margin ±{errors['margin'][0]:.1f} pts, "
+                f"break-even ±{errors['break_even_customers'][0]:.1f} customers, "
+                f"payback ±{errors['capex_payback_months'][0]:.1f} months. Net profit is exact."
+            )
+            scenario_explorer(payload, COST_CONFIG, num_customers, treatment_cost, product_cost_pct, note, key="scenario_explorer")
 
-def calculate_metrics(customers, price, product_pct=5.0):
-    """Calculate all financial metrics with enhanced KPIs"""
-    revenue = customers * price
-    product_cost = revenue * (product_pct / 100)
-    variable_costs = (TOTAL_VARIABLE_PER_CUSTOMER * customers) + product_cost
-    total_expenses = TOTAL_FIXED + variable_costs
-    net_profit = revenue - total_expenses
-    margin = (net_profit / revenue * 100) if revenue > 0 else 0
-    utilization = (customers / MAX_CAPACITY) * 100
-    daily_avg = customers / WORKING_DAYS
-
-    # Enhanced KPIs
-    revenue_per_bed = revenue / 12 if revenue > 0 else 0
-    profit_per_customer = net_profit / customers if customers > 0 else 0
-    break_even_customers = TOTAL_FIXED / (price - TOTAL_VARIABLE_PER_CUSTOMER - (price * product_pct / 100)) if price > (TOTAL_VARIABLE_PER_CUSTOMER + (price * product_pct / 100)) else 0
-    break_even_utilization = (break_even_customers / MAX_CAPACITY) * 100 if break_even_customers <= MAX_CAPACITY else 100
-    roi_monthly = (net_profit / total_expenses * 100) if total_expenses > 0 else 0
-    roi_annual = roi_monthly * 12
-
-    # Cost ratios
-    fixed_cost_ratio = (TOTAL_FIXED / revenue * 100) if revenue > 0 else 0
-    variable_cost_ratio = (variable_costs / revenue * 100) if revenue > 0 else 0
-
-    # Efficiency metrics
-    revenue_per_treatment = price
-    cost_per_treatment = total_expenses / customers if customers > 0 else 0
-    contribution_margin = price - (TOTAL_VARIABLE_PER_CUSTOMER + (price * product_pct / 100))
-    contribution_margin_ratio = (contribution_margin / price * 100) if price > 0 else 0
-
-    # CAPEX payback analysis
-    capex_payback_months = INTERIOR_CAPEX / net_profit if net_profit > 0 else float('inf')
-    capex_payback_years = capex_payback_months / 12 if net_profit > 0 else float('inf')
-    annual_profit = net_profit * 12
-    capex_roi_annual = (annual_profit / INTERIOR_CAPEX * 100) if INTERIOR_CAPEX > 0 else 0
+    log_section("explorer")
 
-    return {
-        'revenue': revenue,
-        'fixed_costs': TOTAL_FIXED,
-        'variable_costs': variable_costs,
-        'total_expenses': total_expenses,
-        'net_profit': net_profit,
-        'margin': margin,
-        'utilization': utilization,
-        'daily_avg': daily_avg,
-        'break_even': net_profit >= 0,
-        'revenue_per_bed': revenue_per_bed,
-        'profit_per_customer': profit_per_customer,
-        'break_even_customers': break_even_customers,
-        'break_even_utilization': break_even_utilization,
-        'roi_monthly': roi_monthly,
-        'roi_annual': roi_annual,
-        'fixed_cost_ratio': fixed_cost_ratio,
-        'variable_cost_ratio': variable_cost_ratio,
-        'revenue_per_treatment': revenue_per_treatment,
-        'cost_per_treatment': cost_per_treatment,
-        'contribution_margin': contribution_margin,
-        'contribution_margin_ratio': contribution_margin_ratio,
-        'capex_payback_months': capex_payback_months,
-        'capex_payback_years': capex_payback_years,
-        'annual_profit': annual_profit,
-        'capex_roi_annual': capex_roi_annual
-    }
+# Detailed breakdown table
+def render_breakdown(num_customers, treatment_cost, product_cost_pct):
+    """Expandable line-item breakdown of the current scenario"""
+    st.markdown("---")
+
+    # Create expandable sections for better mobile navigation
+    with st.expander("📋 Detailed Financial Breakdown", expanded=False):
+        st.markdown("### Complete cost and revenue analysis")
+
+        # Display table
+        df_breakdown = pd.DataFrame(financial_breakdown(num_customers, treatment_cost, product_cost_pct, COST_CONFIG))
+        st.dataframe(df_breakdown, use_container_width=True)
+
+    log_section("breakdown")
+
+# Sensitivity: every scenario input and cost line item moved ±X%, evaluated in
+# one batch per chart and memoized per cost config and scenario
+TORNADO_METRICS = {
+    "Net Profit (₹)": 'net_profit',
+    "Break-even Customers": 'break_even_customers',
+    "CAPEX Payback (months)": 'capex_payback_months',
+}
+DRIVER_LABELS = {'price': "Treatment Price", 'customers': "Customers", 'product_pct': "Product Cost %"}
+
+def render_sensitivity(num_customers, treatment_cost, product_cost_pct):
+    """Tornado chart and two-way tables across every input"""
+    st.markdown("---")
+
+    with st.expander("🌪️ Sensitivity Analysis", expanded=False):
+        st.markdown("### Which inputs move the result most?")
+
+        col1, col2 = st.columns(2)
+        with col1:
+            pct = st.slider("Change each input by ±%", 5, 50, 10, step=5, key="tornado_pct")
+        with col2:
+            metric_label = st.radio("Impact on", list(TORNADO_METRICS), horizontal=True, key="tornado_metric")
+        metric = TORNADO_METRICS[metric_label]
+
+        if st.checkbox("Run analysis", value=False, key="run_sensitivity"):
+            result = cached_tornado(COST_CONFIG, num_customers, treatment_cost, product_cost_pct, float(pct))
+            base = result['base'][metric]
+            # Drivers that don't move the metric (or never pay back) are left out of the chart
+            with np.errstate(invalid='ignore'):
+                low = result['low'][metric] - base
+                high = result['high'][metric] - base
+            shown = np.isfinite(low) & np.isfinite(high) & ((low != 0) | (high != 0))
+            order = np.argsort(np.abs(high - low)[shown], kind='stable')
+            labels = [DRIVER_LABELS.get(driver, driver) for driver in result['driver'][shown][order]]
+
+            fig_tornado = go.Figure()
+            fig_tornado.add_trace(go.Bar(
+                y=labels, x=low[shown][order], orientation='h', name=f"-{pct}%", marker_color='#FF6B6B',
+                hovertemplate="%{y}: %{x:+,.1f}<extra>" + f"-{pct}%</extra>"
+            ))
+            fig_tornado.add_trace(go.Bar(
+                y=labels, x=high[shown][order], orientation='h', name=f"+{pct}%", marker_color='#4ECDC4',
+                hovertemplate="%{y}: %{x:+,.1f}<extra>" + f"+{pct}%</extra>"
+            ))
+            fig_tornado.update_layout(
+                title=f"Change in {metric_label} (base {base:,.1f})" if np.isfinite(base) else f"Change in {metric_label}",
+                barmode='overlay',
+                xaxis_title="Change from base",
+                height=max(350, 28 * len(labels)),
+                legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+            )
+            show_chart(fig_tornado, key="tornado_chart")
+            if not np.isfinite(base):
+                st.caption("The current scenario never pays back its CAPEX, so there is no change in payback to chart.")
+
+            st.markdown("#### Two-way sensitivity")
+            drivers = sensitivity_drivers(COST_CONFIG)
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                row_driver = st.selectbox("Rows", drivers, index=0, format_func=lambda d: DRIVER_LABELS.get(d, d), key="two_way_rows")
+            with col2:
+                col_driver = st.selectbox("Columns", drivers, index=1, format_func=lambda d: DRIVER_LABELS.get(d, d), key="two_way_cols")
+            with col3:
+                table_metric = st.selectbox("Metric", list(TORNADO_METRICS), key="two_way_metric")
+            steps = tuple(range(-2 * pct, 2 * pct + 1, pct))
+            table = cached_two_way(COST_CONFIG, num_customers, treatment_cost, product_cost_pct, row_driver, col_driver, steps, TORNADO_METRICS[table_metric])
+            st.dataframe(pd.DataFrame(
+                table,
+                index=[f"{DRIVER_LABELS.get(row_driver, row_driver)} {step:+d}%" for step in steps],
+                columns=[f"{DRIVER_LABELS.get(col_driver, col_driver)} {step:+d}%" for step in steps],
+            ).style.format("{:,.1f}"), use_container_width=True)
+
+    log_section("sensitivity")
+
+# Monte Carlo risk simulation
+RISK_SEED = 2025
+RISK_SAMPLE_OPTIONS = [100_000, 250_000, 1_000_000, 2_000_000]
+
+def render_risk_simulation(num_customers, treatment_cost, product_cost_pct):
+    """Profit and payback distributions when demand, price and costs vary month to month"""
+    st.markdown("---")
+
+    with st.expander("🎲 Risk Simulation (Monte Carlo)", expanded=False):
+        st.markdown("### How uncertain is the current scenario?")
+
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            demand_cv = st.slider("Demand variability (±%)", 0, 50, 15, key="risk_demand_cv")
+        with col2:
+            price_cv = st.slider("Price variability (±%)", 0, 20, 5, key="risk_price_cv")
+        with col3:
+            product_cv = st.slider("Product cost variability (±%)", 0, 50, 20, key="risk_product_cv")
+        with col4:
+            cost_cv = st.slider("Cost line variability (±%)", 0, 30, 10, key="risk_cost_cv")
+
+        n_samples = st.select_slider("Simulated months", options=RISK_SAMPLE_OPTIONS, value=1_000_000, format_func=lambda n: f"{n:,}", key="risk_samples")
+
+        if st.checkbox("Run simulation", value=False, key="run_risk_simulation"):
+            inputs = RiskInputs.around(
+                COST_CONFIG, num_customers, treatment_cost, product_cost_pct,
+                demand_cv=demand_cv / 100, price_cv=price_cv / 100,
+                product_cv=product_cv / 100, cost_cv=cost_cv / 100,
+            )
+            result = cached_risk(COST_CONFIG, inputs, n_samples, RISK_SEED)
+            profit = dict(result.profit_percentiles)
+            payback = dict(result.payback_percentiles)
+
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric("Probability of Loss", f"{result.prob_loss*100:.1f}%", f"{n_samples:,} simulated months", delta_color="off")
+            with col2:
+                st.metric("Median Profit", f"₹{profit[50]:,.0f}", f"Mean ₹{result.mean_profit:,.0f}", delta_color="off")
+            with col3:
+                st.metric("Profit Range (P5-P95)", f"₹{profit[5]/1000:,.0f}K to ₹{profit[95]/1000:,.0f}K", "90% of months", delta_color="off")
+            with col4:
+                median_payback = f"{payback[50]/12:.1f} years" if payback[50] != float('inf') else "No payback"
+                st.metric("Median CAPEX Payback", median_payback, f"{result.prob_no_payback*100:.1f}% never pay back", delta_color="off")
+
+            counts, edges = result.profit_histogram
+            centers = [(lo + hi) / 2 for lo, hi in zip(edges[:-1], edges[1:])]
+            fig_risk = go.Figure(go.Bar(
+                x=centers,
+                y=[c / result.n_samples * 100 for c in counts],
+                marker_color=['#FFB6C1' if x < 0 else '#95E77E' for x in centers],
+                hovertemplate="₹%{x:,.0f}: %{y:.2f}%<extra></extra>"
+            ))
+            fig_risk.add_vline(x=0, line_dash="dash", line_color="red")
+            fig_risk.update_layout(
+                title="Monthly Net Profit Distribution",
+                xaxis_title="Net Profit (₹)",
+                yaxis_title="% of simulated months",
+                height=350,
+                showlegend=False,
+                bargap=0.05
+            )
+            show_chart(fig_risk, key="risk_profit_histogram")
+
+    log_section("risk_simulation")
+
+# Bed-slot capacity simulation: how much of MAX_CAPACITY the scenario's demand
+# can actually fill once slots, staffing, no-shows and peaks are played out
+CAPACITY_SEED = 2025
+CAPACITY_RUNS = 500  # simulated years
+
+def render_capacity_simulation(num_customers, treatment_cost, product_cost_pct):
+    """Achievable utilization and lost demand for the current scenario"""
+    st.markdown("---")
+
+    with st.expander("🛏️ Capacity Simulation (bed slots)", expanded=False):
+        st.markdown(f"### Can {BEDS} beds actually serve {num_customers} customers a month?")
+
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            opening_hours = st.slider("Opening hours per day", 6, 14, 10, key="cap_opening_hours")
+            treatment_minutes = st.select_slider("Treatment length (min)", options=[45, 60, 75, 90, 120], value=90, key="cap_treatment_minutes")
+        with col2:
+            turnover_minutes = st.slider("Bed turnover (min)", 0, 45, 30, step=5, key="cap_turnover_minutes")
+            therapists = st.slider("Therapists rostered per day", 4, 20, BEDS, key="cap_therapists")
+        with col3:
+            absence = st.slider("Therapist absence (%)", 0, 30, 5, key="cap_absence")
+            no_show = st.slider("No-shows (% of bookings)", 0, 40, 10, key="cap_no_show")
+        with col4:
+            walk_in_share = st.slider("Walk-ins (% of demand)", 0, 100, 30, key="cap_walk_in_share")
+            evening_peak = st.slider("Evening peak (× other slots)", 1.0, 4.0, 2.0, step=0.5, key="cap_evening_peak")
+
+        if st.checkbox("Run simulation", value=False, key="run_capacity_simulation"):
+            inputs = CapacityInputs.for_scenario(
+                num_customers, walk_in_share / 100, WORKING_DAYS,
+                opening_minutes=opening_hours * 60, treatment_minutes=treatment_minutes,
+                turnover_minutes=turnover_minutes, therapists=therapists,
+                therapist_absence=absence / 100, no_show_rate=no_show / 100, evening_peak=evening_peak,
+            )
+            if inputs.slots_per_day == 0:
+                st.error("A treatment plus turnover doesn't fit in the opening hours")
+                log_section("capacity_simulation")
+                return
+            result = cached_capacity(inputs, CAPACITY_RUNS, seed=CAPACITY_SEED)
+            achievable = calculate_metrics(round(result.served), treatment_cost, product_cost_pct)
+            planned = calculate_metrics(num_customers, treatment_cost, product_cost_pct)
+            effective = cached_metrics(effective_config(COST_CONFIG, result), round(result.served), treatment_cost, product_cost_pct)
+
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric("Customers Served", f"{result.served:,.0f}", f"{result.served - num_customers:,.0f} vs scenario")
+            with col2:
+                st.metric("Achievable Utilization", f"{result.mean_utilization:.1f}%", f"{effective['utilization']:.1f}% of staffed slots", delta_color="off")
+            with col3:
+                st.metric("Lost Demand", f"{result.lost_demand:,.0f}/month", f"{result.lost_demand_share:.1f}% turned away or left", delta_color="inverse" if result.lost_demand else "off")
+            with col4:
+                st.metric("Net Profit at Served Volume", f"₹{achievable['net_profit']:,.0f}", f"₹{achievable['net_profit'] - planned['net_profit']:,.0f}")
+
+            st.caption(
+                f"{result.slots_per_day} slots per bed per day → {result.theoretical_capacity:,.0f} treatments/month in theory "
+                f"(model assumes {COST_CONFIG.max_capacity:,}{f', nominal {MAX_CAPACITY:,}' if CAPACITY_NOTE else ''}); therapists on shift cover {result.effective_capacity:,.0f} "
+                f"({result.staffed_share:.1f}%). No-shows: {result.no_shows:,.0f}/month. "
+                f"Utilization P5-P95 across {result.runs} simulated years: "
+                f"{dict(result.utilization_percentiles)[5]:.1f}%-{dict(result.utilization_percentiles)[95]:.1f}%."
+            )
+
+            slot_starts = [f"+{i * inputs.slot_minutes // 60}h{i * inputs.slot_minutes % 60:02d}" for i in range(result.slots_per_day)]
+            fig_slots = go.Figure(go.Bar(
+                x=slot_starts,
+                y=result.slot_utilization,
+                marker_color=['#d62728' if u >= 90 else '#1f77b4' for u in result.slot_utilization],
+                hovertemplate="%{x}: %{y:.1f}% of beds filled<extra></extra>"
+            ))
+            fig_slots.update_layout(
+                title="Bed Occupancy by Slot (time after opening)",
+                yaxis_title="% of beds filled",
+                yaxis_range=[0, 100],
+                height=350,
+                showlegend=False
+            )
+            show_chart(fig_slots, key="capacity_slot_chart")
+
+            # The cost config is settled before the fragment runs, so applying
+            # the capacity reruns the whole app
+            staffed = round(result.effective_capacity)
+            if COST_CONFIG.max_capacity != staffed and st.button(f"🛏️ Use {staffed:,} treatments/month as capacity in every KPI", key="apply_capacity"):
+                st.session_state.applied_capacity = staffed
+                st.rerun()
+
+    log_section("capacity_simulation")
+
+# Multi-month cash-flow projection
+PAYBACK_MAP_RESOLUTION = 40
+
+def render_cash_flow_projection(num_customers, treatment_cost, product_cost_pct):
+    """Cumulative cash flow, NPV, IRR and payback with ramp-up, inflation and financing"""
+    st.markdown("---")
+
+    with st.expander("📅 Cash-Flow Projection (NPV, IRR & Payback)", expanded=False):
+        st.markdown("### Month-by-month view with ramp-up, inflation and CAPEX financing")
+
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            months = st.slider("Projection months", 12, 120, 60, step=6, key="cf_months")
+        with col2:
+            ramp_months = st.slider("Ramp-up months", 0, 24, 6, key="cf_ramp_months")
+        with col3:
+            ramp_start = st.slider("Opening utilization (% of target)", 10, 100, 30, key="cf_ramp_start")
+        with col4:
+            discount_rate = st.slider("Discount rate (%/year)", 0, 25, 12, key="cf_discount")
+
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            price_escalation = st.slider("Price escalation (%/year)", 0, 15, 5, key="cf_price_escalation")
+        with col2:
+            salary_inflation = st.slider("Salary inflation (%/year)", 0, 15, 8, key="cf_salary_inflation")
+        with col3:
+            rent_inflation = st.slider("Rent inflation (%/year)", 0, 15, 5, key="cf_rent_inflation")
+        with col4:
+            cost_inflation = st.slider("Other cost inflation (%/year)", 0, 15, 5, key="cf_cost_inflation")
+
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            loan_pct = st.slider("CAPEX financed by loan (%)", 0, 100, 0, step=5, key="cf_loan_pct")
+        with col2:
+            loan_rate = st.slider("Loan interest (%/year)", 0, 20, 10, key="cf_loan_rate")
+        with col3:
+            loan_years = st.slider("Loan term (years)", 1, 10, 5, key="cf_loan_years")
+
+        if st.checkbox("Run projection", value=False, key="run_cash_flow"):
+            assumptions = ProjectionAssumptions(
+                months=months,
+                ramp_months=ramp_months,
+                ramp_start=ramp_start / 100,
+                price_escalation=price_escalation / 100,
+                cost_inflation=cost_inflation / 100,
+                line_inflation=(
+                    ('Rent (displacement)', rent_inflation / 100),
+                    ('Salary (14 staff)', salary_inflation / 100),
+                ),
+                discount_rate=discount_rate / 100,
+                loan_fraction=loan_pct / 100,
+                loan_rate=loan_rate / 100,
+                loan_term_months=loan_years * 12,
+            )
+            projection = project_cash_flows(COST_CONFIG, num_customers, treatment_cost, product_cost_pct, assumptions)
+
+            def months_text(month):
+                return f"{month:.0f} months" if month != float('inf') else f"Not within {months} months"
+
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                npv = projection.npv[0]
+                st.metric("NPV", f"₹{npv/10000000:,.2f} Cr", f"@ {discount_rate}% discount rate", delta_color="normal" if npv >= 0 else "inverse")
+            with col2:
+                irr_annual = projection.irr_annual[0]
+                st.metric("IRR (Annual)", f"{irr_annual*100:,.1f}%" if np.isfinite(irr_annual) else "n/a", "On equity invested", delta_color="off")
+            with col3:
+                st.metric("Payback", months_text(projection.payback_month[0]), "Cumulative cash flow ≥ 0", delta_color="off")
+            with col4:
+                st.metric("Discounted Payback", months_text(projection.discounted_payback_month[0]), "Discounted cash flow ≥ 0", delta_color="off")
+
+            fig_cash = go.Figure()
+            fig_cash.add_trace(go.Scatter(
+                x=projection.months,
+                y=projection.cumulative[0],
+                mode='lines',
+                name='Cumulative Cash Flow',
+                line=dict(color='#1f77b4', width=3)
+            ))
+            fig_cash.add_trace(go.Scatter(
+                x=projection.months,
+                y=projection.discounted_cumulative[0],
+                mode='lines',
+                name='Discounted',
+                line=dict(color='#4ECDC4', width=2, dash='dot')
+            ))
+            fig_cash.add_hline(y=0, line_dash="dash", line_color="red", annotation_text="Payback")
+            fig_cash.update_layout(
+                title=f"Cumulative Cash Flow ({num_customers} customers @ ₹{treatment_cost})",
+                xaxis_title="Month",
+                yaxis_title="Cumulative Cash Flow (₹)",
+                height=400,
+                showlegend=True
+            )
+            show_chart(fig_cash, key="cash_flow_chart")
+
+            # Discounted payback over a price x utilization grid, projected in one batch
+            prices, util_pct, grid = payback_map(COST_CONFIG, product_cost_pct, assumptions, PAYBACK_MAP_RESOLUTION)
+            payback_grid = grid.discounted_payback_month.reshape(len(util_pct), len(prices))
+            fig_payback = go.Figure(go.Heatmap(
+                x=prices,
+                y=util_pct,
+                z=np.where(np.isfinite(payback_grid), payback_grid, np.nan),
+                colorscale='Viridis_r',
+                colorbar=dict(title="Months"),
+                hovertemplate="₹%{x:,.0f} @ %{y:.1f}%<br>%{z:.0f} months<extra></extra>"
+            ))
+            fig_payback.add_trace(go.Scatter(
+                x=[treatment_cost],
+                y=[num_customers / COST_CONFIG.max_capacity * 100],
+                mode='markers',
+                name='Current Position',
+                marker=dict(size=15, color='red', symbol='star')
+            ))
+            fig_payback.update_layout(
+                title=f"Discounted Payback Map (blank = not within {months} months)",
+                xaxis_title="Treatment Price (₹)",
+                yaxis_title="Utilization %",
+                height=450,
+                showlegend=False
+            )
+            show_chart(fig_payback, key="payback_map_chart")
+
+    log_section("cash_flow_projection")
+
+# Treatment mix: per-service price, duration and product cost instead of one
+# price and a flat product %; the search evaluates every candidate mix in one batch
+MIX_CANDIDATES = 10_000
+MIX_CHART_POINTS = 2_000  # candidates drawn on the frontier chart
+MIX_NUMBER_COLUMNS = ("Price (₹)", "Minutes", "Product Cost (₹)", "Current Share (%)", "Max Share (%)")
+
+def render_treatment_mix(num_customers, treatment_cost, product_cost_pct):
+    """Menu-level revenue, bed-minutes and contribution, and the most profitable mix"""
+    st.markdown("---")
+
+    with st.expander("🧾 Treatment Mix", expanded=False):
+        st.markdown(f"### Which services should {num_customers} customers a month be taking?")
+        st.caption("Edit the menu: prices, treatment minutes (plus 30 min bed turnover), product cost per treatment, today's share of customers and the most any service could take.")
+
+        menu_table = st.data_editor(
+            pd.DataFrame({
+                "Service": [service.name for service in DEFAULT_MENU],
+                "Price (₹)": [service.price for service in DEFAULT_MENU],
+                "Minutes": [service.minutes for service in DEFAULT_MENU],
+                "Product Cost (₹)": [service.product_cost for service in DEFAULT_MENU],
+                "Current Share (%)": [share * 100 for share in DEFAULT_MIX],
+                "Max Share (%)": [service.max_share * 100 for service in DEFAULT_MENU],
+            }),
+            hide_index=True, disabled=["Service"], use_container_width=True, key="mix_menu",
+            column_config={column: st.column_config.NumberColumn(required=True, min_value=0) for column in MIX_NUMBER_COLUMNS},
+        )
+        numbers = menu_table[list(MIX_NUMBER_COLUMNS)]
+        if numbers.isna().any(axis=None) or (numbers < 0).any(axis=None):
+            st.error("Fill in every price, duration, cost and share with a non-negative number")
+            log_section("treatment_mix")
+            return
+        menu = tuple(
+            Service(row["Service"], float(row["Price (₹)"]), int(row["Minutes"]), float(row["Product Cost (₹)"]), row["Max Share (%)"] / 100)
+            for _, row in menu_table.iterrows()
+        )
+        current_mix = menu_table["Current Share (%)"].to_numpy(dtype=float)
+        if current_mix.sum() <= 0 or menu_table["Max Share (%)"].sum() < 100:
+            st.error("Current shares must be positive and max shares must add up to at least 100%")
+            log_section("treatment_mix")
+            return
+
+        if st.checkbox("Run search", value=False, key="run_treatment_mix"):
+            current = mix_metrics(current_mix, num_customers, menu, COST_CONFIG)
+            mixes, candidates, best, frontier = cached_mix_search(num_customers, menu, COST_CONFIG, MIX_CANDIDATES)
+
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric("Average Price (current mix)", f"₹{current['avg_price']:,.0f}", f"₹{current['avg_price'] - treatment_cost:,.0f} vs scenario price")
+            with col2:
+                st.metric("Product Cost", f"{current['product_pct']:.1f}%", f"{current['product_pct'] - product_cost_pct:+.1f} pts vs scenario", delta_color="inverse")
+            with col3:
+                st.metric("Bed-minutes Used", f"{current['bed_minute_utilization']:.1f}%", f"{current['served']:,.0f} of {num_customers:,} customers fit", delta_color="off")
+            with col4:
+                st.metric("Net Profit (best mix)", f"₹{candidates['net_profit'][best]:,.0f}", f"₹{candidates['net_profit'][best] - current['net_profit']:,.0f} vs current mix")
+
+            shown = np.random.default_rng(0).choice(len(mixes), min(MIX_CHART_POINTS, len(mixes)), replace=False)
+            fig_mix = go.Figure()
+            fig_mix.add_trace(go.Scattergl(
+                x=candidates['minutes_per_customer'][shown], y=candidates['contribution_margin'][shown],
+                mode='markers', name="Candidate mixes",
+                marker=dict(size=4, color=candidates['net_profit'][shown], colorscale='RdYlGn', colorbar=dict(title="Net Profit (₹)"), opacity=0.6),
+                hovertemplate="%{x:.0f} min, ₹%{y:,.0f} contribution<extra></extra>"
+            ))
+            fig_mix.add_trace(go.Scatter(
+                x=candidates['minutes_per_customer'][frontier], y=candidates['contribution_margin'][frontier],
+                mode='lines', name="Margin frontier", line=dict(color='black', width=2)
+            ))
+            fig_mix.add_trace(go.Scatter(
+                x=[current['minutes_per_customer'], candidates['minutes_per_customer'][best]],
+                y=[current['contribution_margin'], candidates['contribution_margin'][best]],
+                mode='markers+text', text=["Current", "Best"], textposition="top center", name="Mixes",
+                marker=dict(size=12, color=['#1f77b4', '#d62728'], symbol='star')
+            ))
+            fig_mix.update_layout(
+                title=f"Contribution per Customer vs Bed-minutes ({len(mixes):,} mixes searched)",
+                xaxis_title="Bed-minutes per customer (incl. turnover)",
+                yaxis_title="Contribution per customer (₹)",
+                height=450,
+                showlegend=False
+            )
+            show_chart(fig_mix, key="treatment_mix_chart")
+
+            best_mix = mix_metrics(mixes[best], num_customers, menu, COST_CONFIG)
+            st.dataframe(pd.DataFrame({
+                "Current Share (%)": current_mix / current_mix.sum() * 100,
+                "Best Share (%)": mixes[best] * 100,
+                "Customers (current)": current['service_customers'],
+                "Customers (best)": best_mix['service_customers'],
+                "Contribution (current)": current['service_contribution'],
+                "Contribution (best)": best_mix['service_contribution'],
+                "Bed-minutes (best)": best_mix['service_bed_minutes'],
+            }, index=[service.name for service in menu]).style.format("{:,.0f}"), use_container_width=True)
+
+    log_section("treatment_mix")
+
+# Saved scenarios: a SQLite store shared by every session of the server process
+SCENARIO_DB = os.environ.get("SPA_SCENARIO_DB", "scenarios.db")
+SCENARIO_PAGE_SIZES = [25, 100, 500]
+COMPARE_KPIS = {
+    'revenue': "Revenue (₹)",
+    'net_profit': "Net Profit (₹)",
+    'margin': "Margin (%)",
+    'utilization': "Utilization (%)",
+    'break_even_customers': "Break-even Customers",
+    'capex_payback_months': "CAPEX Payback (months)",
+    'capex_roi_annual': "CAPEX ROI (%/year)",
+}
+
+@st.cache_resource(show_spinner=False)
+def get_scenario_store(path):
+    return ScenarioStore(path)
+
+def render_scenario_store(num_customers, treatment_cost, product_cost_pct):
+    """Save the current scenario and compare saved ones side by side"""
+    st.markdown("---")
+
+    with st.expander("💾 Saved Scenarios", expanded=False):
+        store = get_scenario_store(SCENARIO_DB)
+
+        with st.form("save_scenario", clear_on_submit=True):
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                name = st.text_input("Scenario name")
+            with col2:
+                site = st.text_input("Site", value="Mumbai")
+            with col3:
+                tags = st.text_input("Tags (comma-separated)")
+            if st.form_submit_button("💾 Save current scenario"):
+                if name.strip():
+                    store.save(
+                        name.strip(), num_customers, treatment_cost, product_cost_pct, COST_CONFIG,
+                        site=site.strip(), tags=[tag.strip() for tag in tags.split(",") if tag.strip()],
+                    )
+                    st.success(f"Saved \"{name.strip()}\"")
+                else:
+                    st.warning("Name the scenario to save it")
+
+        # Filtering, sorting and paging run in SQLite on the stored KPI columns
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            site_filter = st.selectbox("Site", ["All"] + store.sites(), key="store_site")
+        with col2:
+            tag_filter = st.selectbox("Tag", ["All"] + store.tags(), key="store_tag")
+        with col3:
+            sort_by = st.selectbox("Sort by", ["created_at", "name", "site", *COMPARE_KPIS], format_func=lambda column: COMPARE_KPIS.get(column, column), key="store_sort")
+        with col4:
+            page_size = st.selectbox("Per page", SCENARIO_PAGE_SIZES, key="store_page_size")
+
+        filters = {
+            'site': None if site_filter == "All" else site_filter,
+            'tag': None if tag_filter == "All" else tag_filter,
+        }
+        total = store.count(**filters)
+        if total == 0:
+            st.info("No saved scenarios yet")
+            log_section("scenario_store")
+            return
+
+        pages = -(-total // page_size)
+        page = st.selectbox(f"Page (of {pages})", range(1, pages + 1)) if pages > 1 else 1
+        rows = store.list(
+            **filters, order_by=sort_by, descending=sort_by not in ("name", "site"),
+            limit=page_size, offset=(page - 1) * page_size,
+        )
+        st.dataframe(pd.DataFrame(rows).set_index('id'), use_container_width=True)
+        st.caption(f"Saved scenarios matching the filters: {total:,}")
+
+        # Comparison: the selected scenarios are recomputed together in one batch
+        labels = {row['id']: f"#{row['id']} {row['name']} ({row['site']})" if row['site'] else f"#{row['id']} {row['name']}" for row in rows}
+        selected = st.multiselect("Compare scenarios (the first is the baseline)", list(labels), format_func=labels.get)
+        if len(selected) >= 2:
+            metrics = compare_scenarios(store.get_many(selected))
+            deltas = kpi_deltas(metrics, names=COMPARE_KPIS)
+            columns = [labels[scenario_id] for scenario_id in selected]
+
+            st.markdown("#### KPIs")
+            st.dataframe(pd.DataFrame(
+                [metrics[kpi] for kpi in COMPARE_KPIS], index=list(COMPARE_KPIS.values()), columns=columns,
+            ).style.format("{:,.1f}"), use_container_width=True)
+            st.markdown(f"#### Change vs {columns[0]}")
+            st.dataframe(pd.DataFrame(
+                [deltas[kpi][1:] for kpi in COMPARE_KPIS], index=list(COMPARE_KPIS.values()), columns=columns[1:],
+            ).style.format("{:+,.1f}"), use_container_width=True)
+
+    log_section("scenario_store")
+
+# Actuals vs model: booking ledgers are streamed into per-day aggregates kept
+# on disk, so a new month's export only parses that file
+LEDGER_DIR = os.environ.get("SPA_LEDGER_DIR", "ledger")
+ACTUAL_VS_MODEL = {
+    "Customers": ('actual_customers', 'model_customers'),
+    "Utilization (%)": ('actual_utilization', 'model_utilization'),
+    "Avg Price (₹)": ('actual_avg_price', 'model_price'),
+    "Variable Cost / Customer (₹)": ('actual_variable_per_customer', 'model_variable_per_customer'),
+    "Revenue (₹)": ('actual_revenue', 'model_revenue'),
+    "Net Profit (₹)": ('actual_net_profit', 'model_net_profit'),
+}
+
+@st.cache_resource(show_spinner=False)
+def get_ledger_store(path):
+    return LedgerStore(path)
+
+def render_actuals(num_customers, treatment_cost, product_cost_pct):
+    """Compare booked months with the current scenario"""
+    st.markdown("---")
+
+    with st.expander("📒 Actuals vs Model", expanded=False):
+        store = get_ledger_store(LEDGER_DIR)
+        st.caption(
+            "Booking exports (CSV or Parquet), one row per booking: `date`, `bed`, `treatment`, `price`, "
+            "`therapist` and optionally `variable_cost`. Files already ingested are skipped."
+        )
+        uploads = st.file_uploader("Booking ledgers", type=["csv", "parquet"], accept_multiple_files=True, key="ledger_upload")
+        ingested = st.session_state.setdefault("ingested_ledgers", set())
+        for upload in uploads or []:
+            if upload.file_id in ingested:
+                continue
+            fmt = "parquet" if upload.name.lower().endswith(".parquet") else "csv"
+            try:
+                added = store.add(io.BytesIO(upload.getvalue()), name=upload.name, fmt=fmt)
+            except (ValueError, pa.ArrowInvalid) as exc:
+                st.error(f"Could not read {upload.name}: {exc}")
+                continue
+            ingested.add(upload.file_id)
+            if not added:
+                st.info(f"{upload.name} was already ingested")
+
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("📥 Load example ledger (6 months)", key="ledger_example"):
+                buffer = io.BytesIO()
+                pq.write_table(example_ledger(config=COST_CONFIG), buffer)
+                buffer.seek(0)
+                store.add(buffer, name="example ledger", fmt="parquet")
+        with col2:
+            if store.manifest and st.button("🗑️ Clear ingested ledgers", key="ledger_clear"):
+                store.clear()
+                ingested.clear()
+
+        if not store.manifest:
+            st.info("No booking ledgers ingested yet")
+            log_section("actuals")
+            return
+
+        comparison = compare_to_model(store.monthly(), num_customers, treatment_cost, product_cost_pct, COST_CONFIG)
+        months = [str(month) for month in comparison['month']]
+        st.caption(
+            f"{len(store.manifest)} ledger file(s), {int(comparison['actual_customers'].sum()):,} bookings, "
+            f"{months[0]} to {months[-1]}. Utilization counts only the days the spa was open."
+        )
+
+        fig_actuals = make_subplots(specs=[[{"secondary_y": True}]])
+        fig_actuals.add_trace(go.Bar(x=months, y=comparison['actual_net_profit'], name="Actual Net Profit", marker_color='#2ca02c'))
+        fig_actuals.add_trace(go.Scatter(x=months, y=comparison['predicted_net_profit'], name="Model at Actual Volume & Price", mode='lines+markers', line=dict(color='#1f77b4')))
+        fig_actuals.add_trace(go.Scatter(x=months, y=comparison['model_net_profit'], name="Current Scenario", mode='lines', line=dict(color='gray', dash='dash')))
+        fig_actuals.add_trace(go.Scatter(x=months, y=comparison['actual_utilization'], name="Actual Utilization", mode='lines+markers', line=dict(color='#ff7f0e')), secondary_y=True)
+        fig_actuals.update_layout(title="Actual vs Modeled Monthly Profit", height=400, hovermode='x unified')
+        fig_actuals.update_yaxes(title_text="Net Profit (₹)", secondary_y=False)
+        fig_actuals.update_yaxes(title_text="Utilization (%)", secondary_y=True)
+        show_chart(fig_actuals, key="actuals_chart")
+
+        month = st.selectbox("Month", months, index=len(months) - 1, key="actuals_month")
+        i = months.index(month)
+        st.dataframe(pd.DataFrame(
+            [(comparison[actual][i], comparison[model][i], comparison[actual][i] - comparison[model][i]) for actual, model in ACTUAL_VS_MODEL.values()],
+            index=list(ACTUAL_VS_MODEL), columns=["Actual", "Current Scenario", "Difference"],
+        ).style.format("{:,.1f}", na_rep="–"), use_container_width=True)
+
+    log_section("actuals")
+
+# Price optimizer: customers respond to price along a demand curve anchored at
+# the current scenario (or fitted to the ingested booking ledgers)
+DEMAND_CURVES = {"Linear": LinearDemand, "Constant elasticity": ConstantElasticity}
+PRICE_ELASTICITY = -1.5
+PRICE_ELASTICITY_SD = 0.3
+TARGET_MARGIN = 20
+
+def demand_curve(num_customers, treatment_cost):
+    """Demand curve chosen in the Price Optimizer (defaults before it is opened)"""
+    curve_type = st.session_state.get("price_curve", "Linear")
+    if st.session_state.get("price_fit_ledgers"):
+        monthly = get_ledger_store(LEDGER_DIR).monthly()
+        try:
+            return fit_demand(monthly['avg_price'], monthly['bookings'], 'linear' if curve_type == "Linear" else 'constant')
+        except ValueError:
+            pass
+    return DEMAND_CURVES[curve_type](
+        treatment_cost, num_customers,
+        st.session_state.get("price_elasticity", PRICE_ELASTICITY),
+        st.session_state.get("price_elasticity_sd", PRICE_ELASTICITY_SD),
+    )
+
+def render_price_optimizer(num_customers, treatment_cost, product_cost_pct):
+    """Profit-maximizing and target-margin prices when demand depends on price"""
+    st.markdown("---")
+
+    with st.expander("🏷️ Price Optimizer", expanded=False):
+        st.markdown(f"### If {num_customers} customers come at ₹{treatment_cost:,}, what price earns the most?")
+
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.radio("Demand curve", list(DEMAND_CURVES), key="price_curve")
+        with col2:
+            st.slider("Price elasticity", -3.0, -0.2, PRICE_ELASTICITY, step=0.1, key="price_elasticity", help="% change in customers for a 1% price rise")
+        with col3:
+            st.slider("Elasticity uncertainty (±)", 0.0, 1.0, PRICE_ELASTICITY_SD, step=0.05, key="price_elasticity_sd")
+        with col4:
+            target_margin = st.slider("Target margin (%)", 0, 60, TARGET_MARGIN, key="price_target_margin")
+
+        ledger_months = len(get_ledger_store(LEDGER_DIR).monthly()['month'])
+        if ledger_months >= 3:
+            st.checkbox(f"Fit the curve to the ingested booking ledgers ({ledger_months} months)", key="price_fit_ledgers")
+
+        if st.checkbox("Run optimizer", value=False, key="run_price_optimizer"):
+            curve = demand_curve(num_customers, treatment_cost)
+            optimum = cached_price_optimum(curve, COST_CONFIG, product_cost_pct, target_margin)
+            current = calculate_metrics(num_customers, treatment_cost, product_cost_pct)
+            if st.session_state.get("price_fit_ledgers"):
+                st.caption(f"Fitted elasticity {curve.elasticity:.2f} ± {curve.elasticity_sd:.2f} around ₹{curve.ref_price:,.0f} and {curve.ref_customers:,.0f} customers")
+
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric("Optimal Price", f"₹{optimum.optimal_price:,.0f}", f"₹{optimum.price_band[0]:,.0f}-{optimum.price_band[1]:,.0f} (P5-P95)", delta_color="off")
+            with col2:
+                st.metric("Customers at Optimum", f"{optimum.customers:,.0f}", f"{optimum.utilization:.1f}% utilization", delta_color="off")
+            with col3:
+                st.metric("Net Profit at Optimum", f"₹{optimum.net_profit:,.0f}", f"₹{optimum.net_profit - current['net_profit']:,.0f} vs current")
+            with col4:
+                low, high = optimum.target_margin_range
+                st.metric(f"Prices with ≥{target_margin}% Margin", f"₹{low:,.0f}-{high:,.0f}" if np.isfinite(low) else "None", f"{optimum.margin:.1f}% margin at optimum", delta_color="off")
+
+            fig_price = go.Figure()
+            fig_price.add_trace(go.Scatter(
+                x=np.concatenate([optimum.prices, optimum.prices[::-1]]),
+                y=np.concatenate([optimum.grid_profit_band[1], optimum.grid_profit_band[0][::-1]]),
+                fill='toself', fillcolor='rgba(31, 119, 180, 0.15)', line=dict(width=0),
+                name="P5-P95", hoverinfo='skip'
+            ))
+            fig_price.add_trace(go.Scatter(
+                x=optimum.prices, y=optimum.grid_profit, mode='lines', name="Net Profit",
+                line=dict(color='#1f77b4', width=2),
+                customdata=optimum.grid_customers,
+                hovertemplate="₹%{x:,.0f}: ₹%{y:,.0f} profit, %{customdata:,.0f} customers<extra></extra>"
+            ))
+            fig_price.add_hline(y=0, line_dash="dash", line_color="red")
+            fig_price.add_vline(x=treatment_cost, line_dash="dot", line_color="gray", annotation_text="Current")
+            fig_price.add_vline(x=optimum.optimal_price, line_dash="dash", line_color="green", annotation_text="Optimal")
+            fig_price.update_layout(
+                title="Net Profit vs Price with Demand Response",
+                xaxis_title="Treatment Price (₹)",
+                yaxis_title="Monthly Net Profit (₹)",
+                height=400,
+                showlegend=False
+            )
+            show_chart(fig_price, key="price_optimizer_chart")
+
+    log_section("price_optimizer")
+
+# Recommendations section
+def render_recommendations(num_customers, treatment_cost, product_cost_pct):
+    """Targets and guidance for the current scenario"""
+    st.markdown("---")
+
+    with st.expander("💡 Business Recommendations & Insights", expanded=True):
+        st.markdown("### Strategic guidance for optimal spa performance")
+
+        # The recommended price band comes from the price optimizer, once it has been run
+        price_band = None
+        if st.session_state.get("run_price_optimizer"):
+            price_band = cached_price_optimum(
+                demand_curve(num_customers, treatment_cost), COST_CONFIG, product_cost_pct,
+                st.session_state.get("price_target_margin", TARGET_MARGIN),
+            ).price_band
+        topics = recommendations(num_customers, treatment_cost, product_cost_pct, COST_CONFIG, price_band)
+        for col, topic in zip(st.columns(len(topics)), topics):
+            with col:
+                st.markdown(f"### {topic['title']}")
+                getattr(st, topic['level'])(topic['message'])
+                st.markdown("\n".join(f"- **{label}**: {text}" for label, text in topic['points']))
+
+    log_section("recommendations")
+
+# Everything that depends on the Quick Controls lives in one fragment, so a
+# button click reruns only this part of the page
+@st.fragment
+def scenario_dashboard():
+    start_fragment_log()
+
+    render_quick_controls()
+
+    treatment_cost = st.session_state.treatment_cost
+    num_customers = st.session_state.num_customers
+    product_cost_pct = st.session_state.product_cost_pct
+    kpis = scenario_kpis(num_customers, treatment_cost, product_cost_pct)
+    current_utilization = scenario_kpi_values(kpis, 'utilization')['utilization']
+
+    # Display current selections
+    st.info(f"🎯 **Current Selection**: ₹{treatment_cost:,} per treatment | {num_customers} customers ({current_utilization:.1f}% utilization) | {product_cost_pct}% product cost")
+
+    render_quick_summary(kpis)
+    render_active_tab(num_customers, treatment_cost, product_cost_pct, kpis)
+    render_comparative_analysis(num_customers, treatment_cost, product_cost_pct)
+    render_explorer(num_customers, treatment_cost, product_cost_pct)
+    render_breakdown(num_customers, treatment_cost, product_cost_pct)
+    render_sensitivity(num_customers, treatment_cost, product_cost_pct)
+    render_risk_simulation(num_customers, treatment_cost, product_cost_pct)
+    render_capacity_simulation(num_customers, treatment_cost, product_cost_pct)
+    render_cash_flow_projection(num_customers, treatment_cost, product_cost_pct)
+    render_treatment_mix(num_customers, treatment_cost, product_cost_pct)
+    render_scenario_store(num_customers, treatment_cost, product_cost_pct)
+    render_actuals(num_customers, treatment_cost, product_cost_pct)
+    render_price_optimizer(num_customers, treatment_cost, product_cost_pct)
+    render_recommendations(num_customers, treatment_cost, product_cost_pct)
+
+    if st.session_state.run_log['scope'] == "fragment":
+        show_run_report("Last click")
+
+scenario_dashboard()
 
 # Business Parameters Header
 st.markdown("---")
@@ -351,10 +1440,10 @@ col1, col2, col3 = st.columns(3)
 with col1:
     st.markdown("### 🏢 **Facility Specifications**")
     st.markdown(f"""
-    - **Beds**: 12 treatment beds
-    - **Treatments per bed/day**: 5
+    - **Beds**: {BEDS} treatment beds
+    - **Treatments per bed/day**: {TREATMENTS_PER_BED_PER_DAY}
     - **Working days/month**: {WORKING_DAYS}
-    - **Maximum capacity**: {MAX_CAPACITY:,} treatments/month
+    - **Maximum capacity**: {COST_CONFIG.max_capacity:,} treatments/month{CAPACITY_NOTE}
     - **Interior CAPEX**: ₹{INTERIOR_CAPEX/10000000:.1f} Crore
     """)
 
@@ -386,7 +1475,7 @@ with col3:
 # Summary metrics in a highlighted box
 st.markdown("### 🎯 **Key Business Ratios**")
 current_metrics_display = calculate_metrics(468, 5000, 5.0)  # Default values for display
-break_even_util = (current_metrics_display['break_even_customers'] / MAX_CAPACITY) * 100
+break_even_util = (current_metrics_display['break_even_customers'] / COST_CONFIG.max_capacity) * 100
 
 col1, col2, col3, col4 = st.columns(4)
 with col1:
@@ -396,597 +1485,92 @@ with col2:
 with col3:
     st.info(f"**Cost Structure**\nFixed: ₹{TOTAL_FIXED:,}/month\nVariable: ₹{TOTAL_VARIABLE_PER_CUSTOMER}/customer")
 with col4:
-    st.info(f"**Capacity Planning**\n{MAX_CAPACITY:,} max treatments\n{MAX_CAPACITY/WORKING_DAYS:.0f} per day")
-
-st.markdown("---")
+    st.info(f"**Capacity Planning**\n{COST_CONFIG.max_capacity:,} max treatments{CAPACITY_NOTE}\n{COST_CONFIG.max_capacity/COST_CONFIG.working_days:.0f} per day")
 
-# Function to display metrics
-def display_metrics(customers, price, tab_name="Custom"):
-    metrics = calculate_metrics(customers, price, product_cost_pct)
-
-    # Row 1: Primary KPIs (responsive columns)
-    col1, col2, col3, col4 = st.columns([1, 1, 1, 1])
-
-    with col1:
-        st.metric(
-            "Utilization Rate",
-            f"{metrics['utilization']:.1f}%",
-            f"{customers} customers",
-            delta_color="normal"
-        )
+log_section("parameters_overview")
 
-    with col2:
-        st.metric(
-            "Daily Average",
-            f"{metrics['daily_avg']:.0f} customers",
-            f"{metrics['daily_avg']/12:.1f} per bed",
-            delta_color="normal"
-        )
+# Branch portfolio: every branch is evaluated once per uploaded table; roll-ups
+# and drill-downs slice the stored results. Its own fragment, so its widgets
+# don't rerun the scenario analysis above.
+PORTFOLIO_GROUPS = {"Region": "region", "City": "city"}
 
-    with col3:
-        st.metric(
-            "Monthly Revenue",
-            f"₹{metrics['revenue']:,.0f}",
-            f"₹{price} per treatment"
-        )
+@st.cache_resource(max_entries=4, show_spinner=False)
+def load_portfolio(csv_bytes, config):
+    table = pd.read_csv(io.BytesIO(csv_bytes))
+    return Portfolio({name: table[name].to_numpy() for name in table.columns}, config)
 
-    with col4:
-        profit_color = "normal" if metrics['net_profit'] >= 0 else "inverse"
-        st.metric(
-            "Net Profit",
-            f"₹{metrics['net_profit']:,.0f}",
-            f"{metrics['margin']:.1f}% margin",
-            delta_color=profit_color
-        )
-
-    # Row 2: Enhanced Business Metrics
-    st.markdown("### 📊 Enhanced Business Metrics")
-    col1, col2, col3, col4 = st.columns(4)
-
-    with col1:
-        st.metric(
-            "Revenue per Bed",
-            f"₹{metrics['revenue_per_bed']:,.0f}",
-            "Monthly per bed"
-        )
-
-    with col2:
-        st.metric(
-            "Profit per Customer",
-            f"₹{metrics['profit_per_customer']:,.0f}",
-            "Per treatment"
-        )
-
-    with col3:
-        roi_color = "normal" if metrics['roi_monthly'] > 0 else "inverse"
-        st.metric(
-            "Monthly ROI",
-            f"{metrics['roi_monthly']:.1f}%",
-            f"{metrics['roi_annual']:.1f}% annual",
-            delta_color=roi_color
-        )
-
-    with col4:
-        st.metric(
-            "Contribution Margin",
-            f"₹{metrics['contribution_margin']:.0f}",
-            f"{metrics['contribution_margin_ratio']:.1f}% ratio"
-        )
+@st.cache_resource(max_entries=4, show_spinner=False)
+def load_example_portfolio(n_branches, config):
+    return example_portfolio(n_branches, base_config=config)
 
-    # Row 3: Break-even Analysis
-    st.markdown("### ⚖️ Break-even Analysis")
-    col1, col2, col3, col4 = st.columns(4)
-
-    with col1:
-        be_color = "normal" if customers >= metrics['break_even_customers'] else "inverse"
-        st.metric(
-            "Break-even Customers",
-            f"{metrics['break_even_customers']:.0f}",
-            f"Need {max(0, metrics['break_even_customers'] - customers):.0f} more" if customers < metrics['break_even_customers'] else "✅ Achieved",
-            delta_color=be_color
-        )
-
-    with col2:
-        st.metric(
-            "Break-even Utilization",
-            f"{metrics['break_even_utilization']:.1f}%",
-            "Minimum required"
-        )
-
-    with col3:
-        st.metric(
-            "Fixed Cost Ratio",
-            f"{metrics['fixed_cost_ratio']:.1f}%",
-            "Of total revenue"
-        )
-
-    with col4:
-        st.metric(
-            "Variable Cost Ratio",
-            f"{metrics['variable_cost_ratio']:.1f}%",
-            "Of total revenue"
-        )
-
-    # Row 4: CAPEX Analysis
-    st.markdown("### 🏗️ CAPEX Payback Analysis")
-    col1, col2, col3, col4 = st.columns(4)
-
-    with col1:
-        st.metric(
-            "Interior Investment",
-            f"₹{INTERIOR_CAPEX/10000000:.1f} Cr",
-            "One-time setup cost"
-        )
-
-    with col2:
-        payback_color = "normal" if metrics['capex_payback_years'] <= 5 else "inverse"
-        payback_text = f"{metrics['capex_payback_years']:.1f} years" if metrics['capex_payback_years'] != float('inf') else "No payback"
-        st.metric(
-            "Payback Period",
-            payback_text,
-            f"{metrics['capex_payback_months']:.0f} months" if metrics['capex_payback_months'] != float('inf') else "Loss making",
-            delta_color=payback_color
-        )
-
-    with col3:
-        capex_roi_color = "normal" if metrics['capex_roi_annual'] > 20 else "inverse"
-        st.metric(
-            "CAPEX ROI (Annual)",
-            f"{metrics['capex_roi_annual']:.1f}%",
-            "Return on investment",
-            delta_color=capex_roi_color
-        )
-
-    with col4:
-        st.metric(
-            "Annual Profit",
-            f"₹{metrics['annual_profit']:,.0f}",
-            f"₹{metrics['annual_profit']/10000000:.2f} Cr/year"
-        )
-    
-    # Row 4: Visual Analysis
-    st.markdown("### 📈 Visual Analysis")
-
-    # Use responsive layout for mobile
-    use_single_column = st.checkbox("📱 Single Column View (Mobile Friendly)", value=False, key=f"mobile_view_{tab_name}")
+@st.fragment
+def portfolio_view():
+    start_fragment_log()
+    st.markdown("---")
 
-    if use_single_column:
-        # Single column layout for mobile
-        # Pie chart for cost breakdown
-        fig_pie = go.Figure(data=[go.Pie(
-            labels=['Fixed Costs', 'Variable Costs', 'Profit' if metrics['net_profit'] > 0 else 'Loss'],
-            values=[
-                metrics['fixed_costs'],
-                metrics['variable_costs'],
-                abs(metrics['net_profit'])
-            ],
-            hole=.3,
-            marker_colors=['#FF6B6B', '#4ECDC4', '#95E77E' if metrics['net_profit'] > 0 else '#FFB6C1'],
-            textinfo='label+percent',
-            textfont_size=12
-        )])
-
-        fig_pie.update_layout(
-            title={"text": "Cost & Profit Distribution", "x": 0.5, "font": {"size": 16}},
-            height=350,
-            showlegend=True,
-            legend=dict(orientation="h", yanchor="bottom", y=-0.2, xanchor="center", x=0.5),
-            margin=dict(t=50, b=50, l=20, r=20)
+    with st.expander("🏬 Branch Portfolio", expanded=False):
+        st.caption(
+            "One row per branch. Needs `branch`, `customers` and `price`; optional `city`, `region`, `product_pct`, "
+            "`beds`, `working_days`, `interior_capex`, `total_fixed`, `total_variable` or any cost line item by name."
         )
-        st.plotly_chart(fig_pie, use_container_width=True, key=f"pie_chart_{tab_name}")
-
-        # Waterfall chart for profit calculation
-        fig_waterfall = go.Figure(go.Waterfall(
-            name = "Profit Calculation",
-            orientation = "v",
-            measure = ["absolute", "relative", "relative", "total"],
-            x = ["Revenue", "Fixed Costs", "Variable Costs", "Net Profit"],
-            y = [metrics['revenue'], -metrics['fixed_costs'], -metrics['variable_costs'], metrics['net_profit']],
-            textposition = "outside",
-            text = [f"₹{metrics['revenue']/1000:.0f}K",
-                   f"-₹{metrics['fixed_costs']/1000:.0f}K",
-                   f"-₹{metrics['variable_costs']/1000:.0f}K",
-                   f"₹{metrics['net_profit']/1000:.0f}K"],
-            connector = {"line":{"color":"rgb(63, 63, 63)"}},
-            textfont_size=10
-        ))
+        upload = st.file_uploader("Branch table (CSV)", type="csv", key="portfolio_upload")
+        if upload is not None:
+            try:
+                portfolio = load_portfolio(upload.getvalue(), COST_CONFIG)
+            except (ValueError, KeyError) as exc:
+                st.error(f"Could not load the branch table: {exc}")
+                log_section("portfolio")
+                return
+        else:
+            n_branches = st.select_slider("Example portfolio size", options=[50, 500, 5000], value=500, key="portfolio_size")
+            portfolio = load_example_portfolio(n_branches, COST_CONFIG)
 
-        fig_waterfall.update_layout(
-            title = {"text": "Profit Waterfall (₹ in thousands)", "x": 0.5, "font": {"size": 16}},
-            height=350,
-            showlegend = False,
-            margin=dict(t=50, b=50, l=20, r=20),
-            xaxis=dict(tickfont=dict(size=10)),
-            yaxis=dict(tickfont=dict(size=10))
-        )
-        st.plotly_chart(fig_waterfall, use_container_width=True, key=f"waterfall_chart_{tab_name}")
-    else:
-        # Two column layout for desktop
-        col1, col2 = st.columns(2)
+        group_label = st.radio("Roll up by", list(PORTFOLIO_GROUPS), horizontal=True, key="portfolio_group")
+        group = PORTFOLIO_GROUPS[group_label]
+        total = portfolio.rollup(None)
+        rollup = pd.DataFrame(portfolio.rollup(group))
 
+        col1, col2, col3, col4 = st.columns(4)
         with col1:
-            # Pie chart for cost breakdown
-            fig_pie = go.Figure(data=[go.Pie(
-                labels=['Fixed Costs', 'Variable Costs', 'Profit' if metrics['net_profit'] > 0 else 'Loss'],
-                values=[
-                    metrics['fixed_costs'],
-                    metrics['variable_costs'],
-                    abs(metrics['net_profit'])
-                ],
-                hole=.3,
-                marker_colors=['#FF6B6B', '#4ECDC4', '#95E77E' if metrics['net_profit'] > 0 else '#FFB6C1']
-            )])
-
-            fig_pie.update_layout(
-                title="Cost & Profit Distribution",
-                height=400,
-                showlegend=True
-            )
-            st.plotly_chart(fig_pie, use_container_width=True, key=f"pie_chart_{tab_name}")
-
+            st.metric("Branches", f"{len(portfolio):,}", f"{total['loss_making'][0]:,} loss-making", delta_color="off")
         with col2:
-            # Waterfall chart for profit calculation
-            fig_waterfall = go.Figure(go.Waterfall(
-                name = "Profit Calculation",
-                orientation = "v",
-                measure = ["absolute", "relative", "relative", "total"],
-                x = ["Revenue", "Fixed Costs", "Variable Costs", "Net Profit"],
-                y = [metrics['revenue'], -metrics['fixed_costs'], -metrics['variable_costs'], metrics['net_profit']],
-                textposition = "outside",
-                text = [f"₹{metrics['revenue']:,.0f}",
-                       f"-₹{metrics['fixed_costs']:,.0f}",
-                       f"-₹{metrics['variable_costs']:,.0f}",
-                       f"₹{metrics['net_profit']:,.0f}"],
-                connector = {"line":{"color":"rgb(63, 63, 63)"}},
-            ))
-
-            fig_waterfall.update_layout(
-                title = "Profit Waterfall",
-                height=400,
-                showlegend = False
-            )
-            st.plotly_chart(fig_waterfall, use_container_width=True, key=f"waterfall_chart_{tab_name}")
-    
-    return metrics
-
-# Display for each tab
-with tabs[0]:  # Custom tab
-    st.subheader(f"Custom Analysis: {num_customers} customers @ ₹{treatment_cost}")
-    custom_metrics = display_metrics(num_customers, treatment_cost)
-
-# Predefined utilization tabs
-utilization_rates = [0.10, 0.20, 0.30, 0.40, 0.50]
-
-for i, util_rate in enumerate(utilization_rates, 1):
-    with tabs[i]:
-        customers_at_util = int(util_rate * MAX_CAPACITY)
-        st.subheader(f"{int(util_rate*100)}% Utilization: {customers_at_util} customers @ ₹{treatment_cost}")
-        display_metrics(customers_at_util, treatment_cost, f"{int(util_rate*100)}%")
-
-# Comparison Analysis Section
-st.markdown("---")
-st.header("📈 Comparative Analysis")
-
-# Mobile-friendly comparison charts
-mobile_charts = st.checkbox("📱 Mobile-Friendly Charts", value=False, key="mobile_charts_comparison")
-
-if mobile_charts:
-    # Single column layout for mobile
-    st.markdown("#### 📊 Profit vs Utilization Analysis")
-    utilization_range = np.arange(0.05, 0.55, 0.05)
-    customers_range = [int(u * MAX_CAPACITY) for u in utilization_range]
-
-    profits = []
-    margins = []
-    for c in customers_range:
-        m = calculate_metrics(c, treatment_cost, product_cost_pct)
-        profits.append(m['net_profit'])
-        margins.append(m['margin'])
-
-    fig_profit = go.Figure()
-    fig_profit.add_trace(go.Scatter(
-        x=[u*100 for u in utilization_range],
-        y=profits,
-        mode='lines+markers',
-        name='Net Profit',
-        line=dict(color='#1f77b4', width=3),
-        marker=dict(size=6)
-    ))
-
-    fig_profit.add_hline(y=0, line_dash="dash", line_color="red",
-                        annotation_text="Break-even")
-
-    # Add current position marker
-    current_metrics = calculate_metrics(num_customers, treatment_cost, product_cost_pct)
-    fig_profit.add_trace(go.Scatter(
-        x=[current_utilization],
-        y=[current_metrics['net_profit']],
-        mode='markers',
-        name='Current Position',
-        marker=dict(size=12, color='red', symbol='star')
-    ))
-
-    fig_profit.update_layout(
-        title={"text": f"Profit vs Utilization @ ₹{treatment_cost}", "x": 0.5, "font": {"size": 14}},
-        xaxis_title="Utilization %",
-        yaxis_title="Net Profit (₹)",
-        height=300,
-        showlegend=True,
-        legend=dict(orientation="h", yanchor="bottom", y=-0.3, xanchor="center", x=0.5),
-        margin=dict(t=50, b=80, l=50, r=50),
-        font=dict(size=10)
-    )
-    st.plotly_chart(fig_profit, use_container_width=True, key="profit_utilization_chart")
-
-    st.markdown("#### 💰 Price Sensitivity Analysis")
-    # Simplified price sensitivity for mobile
-    price_range = range(3000, 6100, 500)
-
-    fig_price = go.Figure()
-
-    for util in [0.20, 0.30, 0.40]:  # Fewer lines for mobile clarity
-        customers_at_util = int(util * MAX_CAPACITY)
-        profits_at_prices = []
-
-        for price in price_range:
-            m = calculate_metrics(customers_at_util, price, product_cost_pct)
-            profits_at_prices.append(m['net_profit'])
-
-        fig_price.add_trace(go.Scatter(
-            x=list(price_range),
-            y=profits_at_prices,
-            mode='lines+markers',
-            name=f'{int(util*100)}%',
-            line=dict(width=2),
-            marker=dict(size=4)
+            st.metric("Monthly Net Profit", f"₹{total['net_profit'][0] / 10000000:,.2f} Cr", f"{total['margin'][0]:.1f}% margin")
+        with col3:
+            st.metric("Utilization", f"{total['utilization'][0]:.1f}%")
+        with col4:
+            payback = total['capex_payback_months'][0]
+            st.metric("CAPEX Payback", f"{payback:.1f} months" if np.isfinite(payback) else "No payback")
+
+        fig_portfolio = go.Figure(go.Bar(
+            x=rollup[group],
+            y=rollup['net_profit'],
+            marker_color=np.where(rollup['net_profit'] >= 0, '#2ca02c', '#d62728'),
         ))
-
-    fig_price.add_hline(y=0, line_dash="dash", line_color="red")
-
-    fig_price.update_layout(
-        title={"text": "Price Sensitivity Analysis", "x": 0.5, "font": {"size": 14}},
-        xaxis_title="Treatment Price (₹)",
-        yaxis_title="Net Profit (₹)",
-        height=300,
-        showlegend=True,
-        legend=dict(orientation="h", yanchor="bottom", y=-0.3, xanchor="center", x=0.5),
-        margin=dict(t=50, b=80, l=50, r=50),
-        font=dict(size=10)
-    )
-    st.plotly_chart(fig_price, use_container_width=True, key="price_sensitivity_chart")
-
-else:
-    # Desktop two-column layout
-    col1, col2 = st.columns(2)
-
-    with col1:
-        # Profitability across different utilization rates
-        utilization_range = np.arange(0.05, 0.55, 0.05)
-        customers_range = [int(u * MAX_CAPACITY) for u in utilization_range]
-
-        profits = []
-        margins = []
-        for c in customers_range:
-            m = calculate_metrics(c, treatment_cost, product_cost_pct)
-            profits.append(m['net_profit'])
-            margins.append(m['margin'])
-
-        fig_profit = go.Figure()
-        fig_profit.add_trace(go.Scatter(
-            x=[u*100 for u in utilization_range],
-            y=profits,
-            mode='lines+markers',
-            name='Net Profit',
-            line=dict(color='#1f77b4', width=3),
-            marker=dict(size=8)
-        ))
-
-        fig_profit.add_hline(y=0, line_dash="dash", line_color="red",
-                            annotation_text="Break-even")
-
-        # Add current position marker
-        current_metrics = calculate_metrics(num_customers, treatment_cost, product_cost_pct)
-        fig_profit.add_trace(go.Scatter(
-            x=[current_utilization],
-            y=[current_metrics['net_profit']],
-            mode='markers',
-            name='Current Position',
-            marker=dict(size=15, color='red', symbol='star')
-        ))
-
-        fig_profit.update_layout(
-            title=f"Profit vs Utilization @ ₹{treatment_cost}",
-            xaxis_title="Utilization %",
+        fig_portfolio.update_layout(
+            title=f"Monthly Net Profit by {group_label}",
             yaxis_title="Net Profit (₹)",
-            height=400,
-            showlegend=True
+            height=350,
         )
-        st.plotly_chart(fig_profit, use_container_width=True, key="profit_utilization_chart")
-
-    with col2:
-        # Price sensitivity analysis
-        price_range = range(2000, 6100, 500)
-
-        fig_price = go.Figure()
-
-        for util in [0.10, 0.20, 0.30, 0.40, 0.50]:
-            customers_at_util = int(util * MAX_CAPACITY)
-            profits_at_prices = []
-
-            for price in price_range:
-                m = calculate_metrics(customers_at_util, price, product_cost_pct)
-                profits_at_prices.append(m['net_profit'])
-
-            fig_price.add_trace(go.Scatter(
-                x=list(price_range),
-                y=profits_at_prices,
-                mode='lines+markers',
-                name=f'{int(util*100)}% Utilization',
-                line=dict(width=2)
-            ))
-
-        fig_price.add_hline(y=0, line_dash="dash", line_color="red")
-
-        fig_price.update_layout(
-            title="Price Sensitivity Analysis",
-            xaxis_title="Treatment Price (₹)",
-            yaxis_title="Net Profit (₹)",
-            height=400,
-            showlegend=True
+        show_chart(fig_portfolio, key="portfolio_rollup_chart")
+        st.dataframe(rollup.set_index(group), use_container_width=True)
+
+        drill = st.selectbox(f"Drill down into a {group_label.lower()}", rollup[group], key="portfolio_drill")
+        branches = pd.DataFrame(portfolio.branches(group, drill))
+        st.dataframe(
+            branches[['branch', 'city', 'beds', 'customers', 'price', 'utilization', 'revenue', 'net_profit', 'margin', 'capex_payback_months']]
+            .sort_values('net_profit'),
+            use_container_width=True, hide_index=True,
         )
-        st.plotly_chart(fig_price, use_container_width=True, key="price_sensitivity_chart")
 
-# Detailed breakdown table
-st.markdown("---")
-
-# Create expandable sections for better mobile navigation
-with st.expander("📋 Detailed Financial Breakdown", expanded=False):
-    st.markdown("### Complete cost and revenue analysis")
-
-    # Create detailed breakdown
-    breakdown_data = {
-        'Item': [],
-        'Amount (₹)': [],
-        'Per Customer (₹)': [],
-        '% of Revenue': []
-    }
-
-    current_metrics = calculate_metrics(num_customers, treatment_cost, product_cost_pct)
-
-    # Add revenue
-    breakdown_data['Item'].append('REVENUE')
-    breakdown_data['Amount (₹)'].append(current_metrics['revenue'])
-    breakdown_data['Per Customer (₹)'].append(treatment_cost)
-    breakdown_data['% of Revenue'].append(100.0)
-
-    # Add fixed costs
-    breakdown_data['Item'].append('FIXED COSTS')
-    breakdown_data['Amount (₹)'].append(None)
-    breakdown_data['Per Customer (₹)'].append(None)
-    breakdown_data['% of Revenue'].append(None)
-
-    for item, amount in FIXED_COSTS.items():
-        breakdown_data['Item'].append(f"  {item}")
-        breakdown_data['Amount (₹)'].append(amount)
-        breakdown_data['Per Customer (₹)'].append(round(amount/num_customers))
-        breakdown_data['% of Revenue'].append(round(amount/current_metrics['revenue']*100, 1))
-
-    # Add variable costs
-    breakdown_data['Item'].append('VARIABLE COSTS')
-    breakdown_data['Amount (₹)'].append(None)
-    breakdown_data['Per Customer (₹)'].append(None)
-    breakdown_data['% of Revenue'].append(None)
-
-    for item, amount in VARIABLE_PER_CUSTOMER.items():
-        total_amount = amount * num_customers
-        breakdown_data['Item'].append(f"  {item}")
-        breakdown_data['Amount (₹)'].append(total_amount)
-        breakdown_data['Per Customer (₹)'].append(amount)
-        breakdown_data['% of Revenue'].append(round(total_amount/current_metrics['revenue']*100, 1))
-
-    # Add product cost
-    product_total = current_metrics['revenue'] * (product_cost_pct/100)
-    breakdown_data['Item'].append(f"  Product ({product_cost_pct}%)")
-    breakdown_data['Amount (₹)'].append(round(product_total))
-    breakdown_data['Per Customer (₹)'].append(round(product_total/num_customers))
-    breakdown_data['% of Revenue'].append(product_cost_pct)
-
-    # Add totals
-    breakdown_data['Item'].append('TOTAL EXPENSES')
-    breakdown_data['Amount (₹)'].append(round(current_metrics['total_expenses']))
-    breakdown_data['Per Customer (₹)'].append(round(current_metrics['total_expenses']/num_customers))
-    breakdown_data['% of Revenue'].append(round(current_metrics['total_expenses']/current_metrics['revenue']*100, 1))
-
-    breakdown_data['Item'].append('NET PROFIT')
-    breakdown_data['Amount (₹)'].append(round(current_metrics['net_profit']))
-    breakdown_data['Per Customer (₹)'].append(round(current_metrics['net_profit']/num_customers))
-    breakdown_data['% of Revenue'].append(round(current_metrics['margin'], 1))
-
-    # Add CAPEX analysis
-    breakdown_data['Item'].append('CAPEX ANALYSIS')
-    breakdown_data['Amount (₹)'].append(None)
-    breakdown_data['Per Customer (₹)'].append(None)
-    breakdown_data['% of Revenue'].append(None)
-
-    breakdown_data['Item'].append('  Interior Investment')
-    breakdown_data['Amount (₹)'].append(INTERIOR_CAPEX)
-    breakdown_data['Per Customer (₹)'].append(round(INTERIOR_CAPEX/num_customers))
-    breakdown_data['% of Revenue'].append(round(INTERIOR_CAPEX/current_metrics['revenue']*100, 1))
-
-    breakdown_data['Item'].append('  Annual Profit')
-    breakdown_data['Amount (₹)'].append(round(current_metrics['annual_profit']))
-    breakdown_data['Per Customer (₹)'].append(round(current_metrics['annual_profit']/num_customers/12))
-    breakdown_data['% of Revenue'].append(round(current_metrics['annual_profit']/(current_metrics['revenue']*12)*100, 1))
-
-    payback_text = f"{current_metrics['capex_payback_years']:.1f} years" if current_metrics['capex_payback_years'] != float('inf') else "No payback"
-    breakdown_data['Item'].append(f"  Payback Period: {payback_text}")
-    breakdown_data['Amount (₹)'].append(None)
-    breakdown_data['Per Customer (₹)'].append(None)
-    breakdown_data['% of Revenue'].append(round(current_metrics['capex_roi_annual'], 1))
-
-    # Display table
-    df_breakdown = pd.DataFrame(breakdown_data)
-    st.dataframe(df_breakdown, use_container_width=True)
-
-# Recommendations section
-st.markdown("---")
-
-with st.expander("💡 Business Recommendations & Insights", expanded=True):
-    st.markdown("### Strategic guidance for optimal spa performance")
+    log_section("portfolio")
+    if st.session_state.run_log['scope'] == "fragment":
+        show_run_report("Last portfolio update")
 
-    col1, col2, col3 = st.columns(3)
-
-    with col1:
-        st.markdown("### 🎯 Target Metrics")
-        if current_utilization < 20:
-            st.error("⚠️ Utilization too low! Target minimum 20%")
-        elif current_utilization < 30:
-            st.warning("📊 Good start! Aim for 30-40%")
-        else:
-            st.success("✅ Excellent utilization!")
-
-        st.markdown(f"""
-        - **Current**: {current_utilization:.1f}%
-        - **Minimum Target**: 20% (312 customers)
-        - **Optimal Target**: 30-35% (468-546)
-        - **Excellent**: 40%+ (624+)
-        """)
-
-    with col2:
-        st.markdown("### 💰 Pricing Strategy")
-        if treatment_cost < 4000:
-            st.warning("⚠️ Consider raising prices")
-        elif treatment_cost < 5000:
-            st.info("📈 Good pricing, room to grow")
-        else:
-            st.success("✅ Premium pricing achieved")
-
-        st.markdown(f"""
-        - **Current**: ₹{treatment_cost}
-        - **Break-even at 10%**: ₹4,900
-        - **Recommended**: ₹5,000-5,500
-        - **Premium**: ₹5,500+
-        """)
-
-    with col3:
-        st.markdown("### 📉 Cost Optimization")
-        current_metrics = calculate_metrics(num_customers, treatment_cost, product_cost_pct)
-        rent_percent = (FIXED_COSTS['Rent (displacement)'] / current_metrics['revenue'] * 100) if current_metrics['revenue'] > 0 else 0
-
-        if rent_percent > 40:
-            st.error(f"⚠️ Rent is {rent_percent:.0f}% of revenue!")
-        elif rent_percent > 25:
-            st.warning(f"📊 Rent is {rent_percent:.0f}% of revenue")
-        else:
-            st.success(f"✅ Rent is {rent_percent:.0f}% of revenue")
-
-        st.markdown(f"""
-        - **Fixed Costs**: ₹{TOTAL_FIXED:,}
-        - **Per Customer**: ₹{TOTAL_FIXED/num_customers:.0f}
-        - **Consider**: Revenue share model
-        - **Target**: <25% of revenue
-        """)
+portfolio_view()
 
 # Footer
 st.markdown("---")
-st.caption("💆 12-Bed Spa Profitability Dashboard | Built with Streamlit | Data as of September 2025")
\ No newline at end of file
+st.caption("💆 12-Bed Spa Profitability Dashboard | Built with Streamlit | Data as of September 2025")
+
+show_run_report("Last full rerun")
+st.session_state._full_run_active = False
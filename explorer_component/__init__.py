@@ -0,0 +1,79 @@
+"""Scenario explorer that runs entirely in the browser, as a Streamlit component.
+
+The frontend in ``frontend/`` receives the precomputed grid of
+``spa_model.cached_explorer_payload`` and does everything else
+client-side: a Plotly heatmap of price x customers with one animation frame
+per product %, scrubbed by Plotly's own slider, range inputs for price and
+customers, and KPI cards interpolated from the grid. Exploring does not
+rerun the app.
+
+The grid is sent only when the browser lacks it: the frontend reports the
+config version of the grid it holds as the component value, and later runs
+pass ``payload=None`` while that version is current.
+
+``plotly.min.js`` is served from ``frontend/`` so the browser caches one copy
+instead of receiving it inline. It is not checked in; write it from the
+installed plotly package once per install with ``python -m explorer_component``.
+"""
+import hashlib
+import json
+from pathlib import Path
+
+import streamlit as st
+import streamlit.components.v1 as components
+
+FRONTEND_DIR = Path(__file__).parent / 'frontend'
+PLOTLY_JS = FRONTEND_DIR / 'plotly.min.js'
+PRICE_STEP = 50
+
+# Heatmap and card settings per explorer metric: label, number format and
+# colour scale (``reverse`` where lower is better; ``zmin``/``zmax`` cap the
+# long tails of margin and payback so the scale stays readable)
+METRIC_DISPLAY = {
+    'net_profit': {'label': "Net Profit (₹)", 'format': 'money', 'diverging': True},
+    'margin': {'label': "Margin (%)", 'format': 'percent', 'zmin': -100, 'zmax': 100},
+    'break_even_customers': {'label': "Break-even Customers", 'format': 'count', 'reverse': True},
+    'capex_payback_months': {'label': "CAPEX Payback (months)", 'format': 'months', 'reverse': True, 'zmin': 0, 'zmax': 120},
+    'roi_monthly': {'label': "Monthly ROI (%)", 'format': 'percent', 'diverging': True},
+}
+
+
+def write_plotly_js():
+    """Copy the installed plotly package's ``plotly.min.js`` next to the frontend."""
+    from plotly.offline import get_plotlyjs
+
+    script = get_plotlyjs().encode()
+    if not PLOTLY_JS.exists() or PLOTLY_JS.stat().st_size != len(script):
+        tmp = PLOTLY_JS.with_name(PLOTLY_JS.name + '.tmp')
+        tmp.write_bytes(script)
+        tmp.replace(PLOTLY_JS)
+    return PLOTLY_JS
+
+
+def frontend_ready():
+    """Whether ``write_plotly_js`` has been run for this install."""
+    return PLOTLY_JS.exists()
+
+
+_component = components.declare_component("scenario_explorer", path=str(FRONTEND_DIR))
+
+
+def scenario_explorer(payload, config, customers, price, product_pct, note="", key="scenario_explorer"):
+    """Render the explorer over ``payload``, starting at the given scenario.
+
+    The browser redraws only when ``config`` changes; a new starting
+    scenario just moves the marker and the product % slider. ``payload`` is
+    sent only while the browser does not hold this config's grid.
+    """
+    version = hashlib.sha256(json.dumps(config.to_dict(), sort_keys=True).encode()).hexdigest()
+    held = st.session_state.get(key)  # version of the grid the browser reported
+    _component(
+        payload=None if held == version else dict(payload),
+        version=version,
+        start={'customers': customers, 'price': price, 'product_pct': product_pct},
+        metrics={name: METRIC_DISPLAY[name] for name in payload['metrics']},
+        price_step=PRICE_STEP,
+        note=note,
+        key=key,
+        default=None,
+    )
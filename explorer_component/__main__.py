@@ -0,0 +1,4 @@
+"""Set up the explorer frontend: ``python -m explorer_component``."""
+from . import write_plotly_js
+
+print(f"Wrote {write_plotly_js()}")
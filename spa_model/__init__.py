@@ -0,0 +1,133 @@
+"""Headless financial model behind the spa profitability dashboard.
+
+Pure Python/NumPy: importing this package never imports Streamlit or Plotly,
+so batch jobs and workers can use the model directly::
+
+    from spa_model import DEFAULT_CONFIG, calculate_metrics, calculate_metrics_grid
+
+    calculate_metrics(468, 5000, 5.0)['net_profit']
+    calculate_metrics_grid([156, 468, 780], 5000)['margin']
+"""
+from .cache import (
+    cached_metrics,
+    cached_price_sensitivity,
+    cached_profit_surface,
+    cached_utilization_curve,
+    metrics_cache_clear,
+    metrics_cache_info,
+)
+from .capacity import CapacityInputs, CapacityResult, cached_capacity, effective_config, simulate_capacity
+from .cashflow import Projection, ProjectionAssumptions, loan_schedule, payback_map, project_cash_flows
+from .config import (
+    BEDS,
+    DEFAULT_CONFIG,
+    FIXED_COSTS,
+    INTERIOR_CAPEX,
+    MAX_CAPACITY,
+    TREATMENTS_PER_BED_PER_DAY,
+    VARIABLE_PER_CUSTOMER,
+    WORKING_DAYS,
+    CostConfig,
+)
+from .engine import METRIC_NAMES, calculate_metrics_batch, calculate_metrics_scalar, scalar_metrics
+from .explorer import ExplorerGrid, cached_explorer_payload, explorer_grid, explorer_payload, interpolation_error
+from .graph import KPIGraph, evaluate_kpis
+from .metrics import calculate_metrics, calculate_metrics_array, calculate_metrics_grid
+from .mix import DEFAULT_MENU, DEFAULT_MIX, Service, cached_mix_search, mix_metrics, search_mixes
+from .montecarlo import RiskInputs, RiskResult, cached_risk, simulate_risk
+from .portfolio import Portfolio, example_portfolio
+from .pricing import (
+    ConstantElasticity,
+    LinearDemand,
+    PriceOptimum,
+    break_even_price,
+    cached_price_optimum,
+    fit_demand,
+    optimize_price,
+)
+from .records import METRICS_DTYPE, MetricsRecord, metrics_array
+from .reports import BREAKDOWN_COLUMNS, financial_breakdown, kpi_cards, recommendations
+from .sensitivity import cached_tornado, cached_two_way, sensitivity_drivers, tornado, two_way
+from .store import Scenario, ScenarioStore, compare_scenarios, kpi_deltas
+from .surface import SURFACE_RESOLUTION, price_sensitivity, profit_surface, utilization_curve
+
+__all__ = [
+    'BEDS',
+    'BREAKDOWN_COLUMNS',
+    'CapacityInputs',
+    'CapacityResult',
+    'ConstantElasticity',
+    'CostConfig',
+    'DEFAULT_CONFIG',
+    'DEFAULT_MENU',
+    'DEFAULT_MIX',
+    'ExplorerGrid',
+    'FIXED_COSTS',
+    'INTERIOR_CAPEX',
+    'KPIGraph',
+    'LinearDemand',
+    'MAX_CAPACITY',
+    'METRICS_DTYPE',
+    'METRIC_NAMES',
+    'MetricsRecord',
+    'Portfolio',
+    'PriceOptimum',
+    'Projection',
+    'ProjectionAssumptions',
+    'RiskInputs',
+    'RiskResult',
+    'SURFACE_RESOLUTION',
+    'Scenario',
+    'ScenarioStore',
+    'Service',
+    'TREATMENTS_PER_BED_PER_DAY',
+    'VARIABLE_PER_CUSTOMER',
+    'WORKING_DAYS',
+    'break_even_price',
+    'cached_capacity',
+    'cached_explorer_payload',
+    'cached_metrics',
+    'cached_mix_search',
+    'cached_price_optimum',
+    'cached_price_sensitivity',
+    'cached_profit_surface',
+    'cached_risk',
+    'cached_tornado',
+    'cached_two_way',
+    'cached_utilization_curve',
+    'calculate_metrics',
+    'calculate_metrics_array',
+    'calculate_metrics_batch',
+    'calculate_metrics_grid',
+    'calculate_metrics_scalar',
+    'compare_scenarios',
+    'effective_config',
+    'evaluate_kpis',
+    'example_portfolio',
+    'explorer_grid',
+    'explorer_payload',
+    'financial_breakdown',
+    'fit_demand',
+    'interpolation_error',
+    'kpi_cards',
+    'kpi_deltas',
+    'loan_schedule',
+    'metrics_array',
+    'metrics_cache_clear',
+    'metrics_cache_info',
+    'mix_metrics',
+    'optimize_price',
+    'payback_map',
+    'price_sensitivity',
+    'profit_surface',
+    'project_cash_flows',
+    'recommendations',
+    'scalar_metrics',
+    'search_mixes',
+    'sensitivity_drivers',
+    'simulate_capacity',
+    'simulate_risk',
+    'tornado',
+    'two_way',
+    'utilization_curve',
+]
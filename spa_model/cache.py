@@ -0,0 +1,73 @@
+"""Memoized metrics keyed on (cost config, customers, price, product %).
+
+The caches live at module level, so they are shared by every session served
+by the same Streamlit process and survive script reruns. Chart grids are
+cached the same way; their arrays are returned read-only since every caller
+shares them.
+"""
+from functools import lru_cache
+from types import MappingProxyType
+
+from .engine import calculate_metrics_scalar
+from .records import MetricsRecord
+from .surface import price_sensitivity, profit_surface, utilization_curve
+
+METRICS_CACHE_SIZE = 4096
+CHART_CACHE_SIZE = 512
+CONFIG_CACHE_SIZE = 64
+
+
+@lru_cache(maxsize=CONFIG_CACHE_SIZE)
+def _model_params(config):
+    return MappingProxyType(config.model_params())
+
+
+@lru_cache(maxsize=METRICS_CACHE_SIZE)
+def _cached_metrics(config, customers, price, product_pct):
+    # One scenario at a time: the plain-float twin of the batch engine
+    return MetricsRecord.from_dict(calculate_metrics_scalar(customers, price, product_pct, **_model_params(config)))
+
+
+def cached_metrics(config, customers, price, product_pct=5.0):
+    """Return the (read-only) ``MetricsRecord`` for one scenario under ``config``.
+
+    Identical scenarios under the same configuration are computed once; the
+    least recently used entries are evicted beyond ``METRICS_CACHE_SIZE``.
+    """
+    return _cached_metrics(config, customers, price, product_pct)
+
+
+def metrics_cache_info():
+    """Hit/miss counters and current size of the metrics cache."""
+    return _cached_metrics.cache_info()
+
+
+def metrics_cache_clear():
+    _cached_metrics.cache_clear()
+
+
+def _read_only(metrics):
+    for values in metrics.values():
+        values.flags.writeable = False
+    return MappingProxyType(metrics)
+
+
+@lru_cache(maxsize=CHART_CACHE_SIZE)
+def cached_utilization_curve(config, price, product_pct, utilization_rates):
+    """``utilization_curve`` memoized; ``utilization_rates`` must be a tuple."""
+    return _read_only(utilization_curve(config, price, product_pct, utilization_rates))
+
+
+@lru_cache(maxsize=CHART_CACHE_SIZE)
+def cached_price_sensitivity(config, utilization_rates, prices, product_pct):
+    """``price_sensitivity`` memoized; rates and prices must be tuples."""
+    return _read_only(price_sensitivity(config, utilization_rates, prices, product_pct))
+
+
+@lru_cache(maxsize=CHART_CACHE_SIZE)
+def cached_profit_surface(config, product_pct, resolution):
+    """``profit_surface`` memoized per (config, product %, resolution)."""
+    prices, utilization_pct, metrics = profit_surface(config, product_pct, resolution)
+    prices.flags.writeable = False
+    utilization_pct.flags.writeable = False
+    return prices, utilization_pct, _read_only(metrics)
@@ -0,0 +1,234 @@
+"""Bed-slot simulation of how much of ``max_capacity`` demand can actually fill.
+
+``MAX_CAPACITY`` assumes every bed is used for every slot of every working
+day. The simulator plays out days slot by slot instead: therapists may be
+off, so a slot holds ``min(beds, therapists on shift)`` treatments; booked
+customers ask for a slot (weighted towards the evening) and are moved up to
+``booking_flex_slots`` later when it is full, otherwise turned away; some
+bookings don't show; walk-ins arriving in a slot take whatever the bookings
+left, waiting up to ``walk_in_patience`` minutes before leaving.
+
+All days of all runs are simulated together as arrays, looping only over the
+few slots of a day. Like the Monte Carlo engine, runs are split into chunks
+seeded from one ``SeedSequence``, so a seed gives the same result in-process
+or on a process pool. ``effective_config`` feeds the result back into the
+profitability model.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+
+from .config import WORKING_DAYS
+from .engine import BEDS
+
+UTILIZATION_PERCENTILES = (5, 25, 50, 75, 95)
+DEFAULT_RUNS_PER_CHUNK = 250
+
+
+@dataclass(frozen=True)
+class CapacityInputs:
+    """Site layout, staffing and demand for one simulated working day.
+
+    The defaults reproduce ``TREATMENTS_PER_BED_PER_DAY``: ten opening hours
+    of 90-minute treatments plus 30 minutes to turn the bed around.
+    """
+    booked_per_day: float
+    walk_ins_per_day: float
+    beds: int = BEDS
+    opening_minutes: int = 600
+    treatment_minutes: int = 90
+    turnover_minutes: int = 30
+    therapists: int = BEDS
+    therapist_absence: float = 0.05  # chance a rostered therapist is off on a given day
+    no_show_rate: float = 0.10
+    booking_flex_slots: int = 1  # later slots a booking accepts when its slot is full
+    walk_in_patience: int = 30  # minutes a walk-in waits for a bed
+    evening_peak: float = 2.0  # demand weight of the last two slots relative to the others
+    working_days: int = WORKING_DAYS
+
+    @classmethod
+    def for_scenario(cls, customers, walk_in_share=0.3, working_days=WORKING_DAYS, **kwargs):
+        """Demand of a monthly ``customers`` scenario, split into bookings and walk-ins."""
+        per_day = customers / working_days
+        return cls(
+            booked_per_day=per_day * (1 - walk_in_share),
+            walk_ins_per_day=per_day * walk_in_share,
+            working_days=working_days,
+            **kwargs,
+        )
+
+    @property
+    def slot_minutes(self):
+        return self.treatment_minutes + self.turnover_minutes
+
+    @property
+    def slots_per_day(self):
+        return self.opening_minutes // self.slot_minutes
+
+    def slot_weights(self):
+        """Share of the day's demand that asks for each slot."""
+        weights = np.ones(self.slots_per_day)
+        weights[-2:] *= self.evening_peak
+        return weights / weights.sum()
+
+
+@dataclass(frozen=True)
+class CapacityResult:
+    """Simulated monthly averages; utilization is of the theoretical capacity."""
+    runs: int
+    days_per_run: int
+    seed: int
+    slots_per_day: int
+    theoretical_capacity: float  # beds x slots x working days
+    effective_capacity: float  # slots that had a therapist, per month
+    demand: float
+    served: float
+    lost_bookings: float  # turned away when no slot was free
+    lost_walk_ins: float  # left after waiting
+    no_shows: float
+    mean_utilization: float
+    utilization_percentiles: tuple  # ((percentile, %), ...) across runs
+    slot_utilization: tuple  # % of beds filled in each slot of the day
+
+    @property
+    def lost_demand(self):
+        return self.lost_bookings + self.lost_walk_ins
+
+    @property
+    def lost_demand_share(self):
+        return self.lost_demand / self.demand * 100 if self.demand > 0 else 0.0
+
+    @property
+    def staffed_share(self):
+        """% of theoretical slots that had a therapist: the utilization ceiling."""
+        return self.effective_capacity / self.theoretical_capacity * 100
+
+
+def _allocate(requests, capacity, max_wait):
+    """Serve per-slot requests against per-slot capacity, oldest first.
+
+    ``requests`` and ``capacity`` are ``(days, slots)``; unserved requests
+    carry to the next slot for up to ``max_wait`` slots. Returns the served
+    counts per slot and the requests lost per day.
+    """
+    days, slots = requests.shape
+    served = np.zeros_like(requests)
+    lost = np.zeros(days, dtype=requests.dtype)
+    waiting = np.zeros((max_wait + 1, days), dtype=requests.dtype)  # waiting[k]: waited k slots
+    for slot in range(slots):
+        waiting = np.roll(waiting, 1, axis=0)
+        lost += waiting[0]  # waited max_wait slots already
+        waiting[0] = requests[:, slot]
+        free = capacity[:, slot].copy()
+        for age in range(max_wait, -1, -1):
+            taken = np.minimum(waiting[age], free)
+            waiting[age] -= taken
+            free -= taken
+            served[:, slot] += taken
+    return served, lost + waiting.sum(axis=0)
+
+
+def _simulate_chunk(inputs, runs, days, seed_seq):
+    """Simulate ``runs`` x ``days`` days; returns per-run totals and per-slot sums."""
+    rng = np.random.default_rng(seed_seq)
+    n = runs * days
+    slots = inputs.slots_per_day
+    weights = inputs.slot_weights()
+
+    on_shift = rng.binomial(inputs.therapists, 1 - inputs.therapist_absence, n)
+    capacity = np.repeat(np.minimum(inputs.beds, on_shift)[:, None], slots, axis=1)
+
+    booked = rng.poisson(inputs.booked_per_day * weights, (n, slots))
+    booked_served, lost_bookings = _allocate(booked, capacity, inputs.booking_flex_slots)
+    shows = rng.binomial(booked_served, 1 - inputs.no_show_rate)
+
+    walk_ins = rng.poisson(inputs.walk_ins_per_day * weights, (n, slots))
+    walk_in_wait = inputs.walk_in_patience // inputs.slot_minutes
+    walk_ins_served, lost_walk_ins = _allocate(walk_ins, capacity - shows, walk_in_wait)
+
+    served = shows + walk_ins_served
+
+    def per_run(values):
+        return values.reshape(runs, days, -1).sum(axis=(1, 2))
+
+    return {
+        'effective_capacity': per_run(capacity),
+        'demand': per_run(booked) + per_run(walk_ins),
+        'served': per_run(served),
+        'lost_bookings': per_run(lost_bookings),
+        'lost_walk_ins': per_run(lost_walk_ins),
+        'no_shows': per_run(booked_served - shows),
+        'slot_served': served.sum(axis=0),
+    }
+
+
+def _simulate_chunk_args(args):
+    return _simulate_chunk(*args)
+
+
+def simulate_capacity(inputs, runs=1000, days_per_run=WORKING_DAYS * 12, seed=0,
+                      runs_per_chunk=DEFAULT_RUNS_PER_CHUNK, workers=None):
+    """Simulate ``runs`` independent years (by default) of working days.
+
+    ``workers`` > 1 spreads chunks across a process pool; the result is
+    identical to the in-process run for the same ``seed``.
+    """
+    n_chunks = -(-runs // runs_per_chunk)
+    sizes = [runs_per_chunk] * (n_chunks - 1) + [runs - runs_per_chunk * (n_chunks - 1)]
+    seeds = np.random.SeedSequence(seed).spawn(n_chunks)
+    jobs = [(inputs, size, days_per_run, seed_seq) for size, seed_seq in zip(sizes, seeds)]
+
+    if workers and workers > 1 and n_chunks > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunks = list(pool.map(_simulate_chunk_args, jobs))
+    else:
+        chunks = [_simulate_chunk(*job) for job in jobs]
+
+    totals = {name: np.concatenate([chunk[name] for chunk in chunks]) for name in chunks[0] if name != 'slot_served'}
+    slot_served = sum(chunk['slot_served'] for chunk in chunks)
+
+    # Per-run totals to monthly averages
+    to_month = inputs.working_days / days_per_run
+    theoretical = inputs.beds * inputs.slots_per_day * inputs.working_days
+    utilization = totals['served'] * to_month / theoretical * 100
+
+    def monthly(name):
+        return float(totals[name].mean() * to_month)
+
+    return CapacityResult(
+        runs=runs,
+        days_per_run=days_per_run,
+        seed=seed,
+        slots_per_day=inputs.slots_per_day,
+        theoretical_capacity=float(theoretical),
+        effective_capacity=monthly('effective_capacity'),
+        demand=monthly('demand'),
+        served=monthly('served'),
+        lost_bookings=monthly('lost_bookings'),
+        lost_walk_ins=monthly('lost_walk_ins'),
+        no_shows=monthly('no_shows'),
+        mean_utilization=float(utilization.mean()),
+        utilization_percentiles=tuple(zip(
+            UTILIZATION_PERCENTILES, map(float, np.percentile(utilization, UTILIZATION_PERCENTILES))
+        )),
+        slot_utilization=tuple((slot_served / (runs * days_per_run * inputs.beds) * 100).tolist()),
+    )
+
+
+@lru_cache(maxsize=32)
+def cached_capacity(inputs, runs=1000, days_per_run=WORKING_DAYS * 12, seed=0, workers=None):
+    """``simulate_capacity`` memoized per (inputs, runs, days, seed)."""
+    return simulate_capacity(inputs, runs=runs, days_per_run=days_per_run, seed=seed, workers=workers)
+
+
+def effective_config(config, result):
+    """``config`` with ``max_capacity`` set to the simulated staffed capacity.
+
+    Utilization and the capacity-based metrics then measure against the
+    slots that can actually be sold; pair it with ``result.served`` as the
+    customer count for the demand-limited picture.
+    """
+    return config.with_capacity(round(result.effective_capacity))
+
@@ -0,0 +1,191 @@
+"""Multi-month cash-flow projection with ramp-up, escalation and CAPEX financing.
+
+Every quantity is an array of shape ``(scenarios, months)``: monthly P&L comes
+from ``calculate_metrics_batch`` with per-month fixed and variable totals, so a
+whole price x utilization grid is projected in one pass.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+from .engine import calculate_metrics_batch
+from .surface import PRICE_RANGE, UTILIZATION_RANGE
+
+IRR_ITERATIONS = 40
+
+
+@dataclass(frozen=True)
+class ProjectionAssumptions:
+    """Time-series assumptions; rates are annual fractions (0.05 = 5%).
+
+    Utilization ramps linearly from ``ramp_start`` x target to the full target
+    over ``ramp_months`` (0: full target from month 1). Price and costs
+    escalate in yearly steps. Fixed cost lines use ``cost_inflation`` unless
+    listed in ``line_inflation`` as ``(name, rate)`` pairs; variable costs per
+    customer use ``cost_inflation``.
+    ``loan_fraction`` of the CAPEX is financed by an amortizing loan.
+    """
+    months: int = 60
+    ramp_months: int = 6
+    ramp_start: float = 0.3
+    price_escalation: float = 0.05
+    cost_inflation: float = 0.05
+    line_inflation: tuple = ()
+    discount_rate: float = 0.12
+    loan_fraction: float = 0.0
+    loan_rate: float = 0.10
+    loan_term_months: int = 60
+
+
+@dataclass(frozen=True)
+class Projection:
+    months: np.ndarray  # 1-based month numbers, shape (M,)
+    customers: np.ndarray  # (S, M)
+    revenue: np.ndarray  # (S, M)
+    net_profit: np.ndarray  # (S, M) operating profit before debt service
+    debt_service: np.ndarray  # (M,)
+    cash_flow: np.ndarray  # (S, M) equity cash flow
+    cumulative: np.ndarray  # (S, M) including the upfront equity outlay
+    discounted_cumulative: np.ndarray  # (S, M)
+    equity: float
+    npv: np.ndarray  # (S,)
+    irr_annual: np.ndarray  # (S,), nan where the cash flows never change sign
+    payback_month: np.ndarray  # (S,), inf if never paid back in the horizon
+    discounted_payback_month: np.ndarray  # (S,)
+
+
+def monthly_rate(annual_rate):
+    return (1 + annual_rate) ** (1 / 12) - 1
+
+
+def loan_schedule(principal, annual_rate, term_months, months):
+    """Equal-instalment amortization: (payment, interest, principal) per month."""
+    payment = np.zeros(months)
+    interest = np.zeros(months)
+    repaid = np.zeros(months)
+    if principal <= 0 or term_months <= 0:
+        return payment, interest, repaid
+
+    rate = annual_rate / 12
+    n = min(term_months, months)
+    k = np.arange(term_months)
+    if rate > 0:
+        instalment = principal * rate / (1 - (1 + rate) ** -term_months)
+        opening_balance = principal * (1 + rate) ** k - instalment * ((1 + rate) ** k - 1) / rate
+    else:
+        instalment = principal / term_months
+        opening_balance = principal - instalment * k
+    payment[:n] = instalment
+    interest[:n] = (opening_balance * rate)[:n]
+    repaid[:n] = payment[:n] - interest[:n]
+    return payment, interest, repaid
+
+
+def _yearly_factor(annual_rate, months):
+    return (1 + annual_rate) ** (np.arange(months) // 12)
+
+
+def _first_month(reached):
+    """1-based index of the first True along the last axis, inf if none."""
+    return np.where(reached.any(axis=-1), reached.argmax(axis=-1) + 1.0, np.inf)
+
+
+def irr(cash_flows, initial_outlay, iterations=IRR_ITERATIONS):
+    """Monthly IRR per row by vectorized bisection; nan without a sign change."""
+    # Month-major copy so Horner's scheme walks contiguous rows
+    by_month = np.ascontiguousarray(np.atleast_2d(cash_flows).T)
+
+    def npv_at(rate):
+        x = 1 / (1 + rate)
+        acc = by_month[-1].copy()
+        for row in by_month[-2::-1]:
+            acc *= x
+            acc += row
+        return acc * x - initial_outlay
+
+    low = np.full(by_month.shape[1], -0.9)
+    high = np.full(by_month.shape[1], 1.0)
+    npv_low = npv_at(low)
+    solvable = np.sign(npv_low) != np.sign(npv_at(high))
+    for _ in range(iterations):
+        mid = (low + high) / 2
+        npv_mid = npv_at(mid)
+        same_side = np.sign(npv_mid) == np.sign(npv_low)
+        low = np.where(same_side, mid, low)
+        npv_low = np.where(same_side, npv_mid, npv_low)
+        high = np.where(same_side, high, mid)
+    return np.where(solvable, (low + high) / 2, np.nan)
+
+
+def project_cash_flows(config, customers, price, product_pct, assumptions=ProjectionAssumptions()):
+    """Project monthly cash flows for one or many steady-state scenarios.
+
+    ``customers`` (the post-ramp monthly target), ``price`` and
+    ``product_pct`` broadcast to a 1-D array of scenarios.
+    """
+    customers, price, product_pct = (
+        np.atleast_1d(a).astype(np.float64).ravel()
+        for a in np.broadcast_arrays(customers, price, product_pct)
+    )
+    months = assumptions.months
+
+    if assumptions.ramp_months > 0:
+        ramp = np.minimum(
+            assumptions.ramp_start + (1 - assumptions.ramp_start) * np.arange(months) / assumptions.ramp_months,
+            1.0,
+        )
+    else:
+        ramp = np.ones(months)  # no ramp-up: full target from month 1
+    customers_m = np.minimum(customers[:, None] * ramp, config.max_capacity)
+    price_m = price[:, None] * _yearly_factor(assumptions.price_escalation, months)
+
+    line_rates = dict(assumptions.line_inflation)
+    fixed_m = sum(
+        amount * _yearly_factor(line_rates.get(name, assumptions.cost_inflation), months)
+        for name, amount in config.fixed_costs
+    )
+    variable_m = config.total_variable * _yearly_factor(assumptions.cost_inflation, months)
+
+    params = config.model_params()
+    params.update(total_fixed=fixed_m, total_variable=variable_m)
+    metrics = calculate_metrics_batch(customers_m, price_m, product_pct[:, None], **params)
+    net_profit = metrics['net_profit']
+
+    loan = config.interior_capex * assumptions.loan_fraction
+    equity = config.interior_capex - loan
+    debt_service, _, _ = loan_schedule(loan, assumptions.loan_rate, assumptions.loan_term_months, months)
+    cash_flow = net_profit - debt_service
+
+    discount = (1 + monthly_rate(assumptions.discount_rate)) ** -np.arange(1, months + 1)
+    cumulative = np.cumsum(cash_flow, axis=-1) - equity
+    discounted_cumulative = np.cumsum(cash_flow * discount, axis=-1) - equity
+
+    return Projection(
+        months=np.arange(1, months + 1),
+        customers=customers_m,
+        revenue=metrics['revenue'],
+        net_profit=net_profit,
+        debt_service=debt_service,
+        cash_flow=cash_flow,
+        cumulative=cumulative,
+        discounted_cumulative=discounted_cumulative,
+        equity=equity,
+        npv=discounted_cumulative[:, -1],
+        irr_annual=(1 + irr(cash_flow, equity)) ** 12 - 1,
+        payback_month=_first_month(cumulative >= 0),
+        discounted_payback_month=_first_month(discounted_cumulative >= 0),
+    )
+
+
+def payback_map(config, product_pct, assumptions=ProjectionAssumptions(), resolution=40,
+                price_range=PRICE_RANGE, utilization_range=UTILIZATION_RANGE):
+    """Project a price x utilization grid and return payback and NPV maps.
+
+    Returns ``(prices, utilization_pct, projection)``; reshape the per-scenario
+    arrays of ``projection`` to ``(len(utilization_pct), len(prices))``.
+    """
+    prices = np.linspace(*price_range, resolution)
+    utilization = np.linspace(*utilization_range, resolution)
+    customers = np.repeat(utilization * config.max_capacity, resolution)
+    projection = project_cash_flows(config, customers, np.tile(prices, resolution), product_pct, assumptions)
+    return prices, utilization * 100, projection
@@ -0,0 +1,228 @@
+"""Command-line batch scenario runner.
+
+    python -m spa_model run scenarios.parquet results.parquet
+    python -m spa_model generate scenarios.parquet --rows 10000000
+
+Scenario files (CSV or Parquet) need ``customers`` and ``price`` columns;
+``product_pct`` falls back to ``--product-pct``. Rows may override costs with
+``total_fixed``, ``total_variable``, ``interior_capex``, ``max_capacity``,
+``working_days`` and ``beds`` columns, or with a column named after any fixed or variable
+line item of the cost config (e.g. ``Rent (displacement)``), which replaces
+that line's default amount. Blank cells in any of these columns are
+rejected rather than evaluated as NaN. All input columns are passed through to
+the output, followed by the metric columns; an input without rows still writes
+an output file with those columns.
+
+Input is read and evaluated in chunks and results are streamed to the output
+file, so memory use is bounded by ``--chunk-rows``. Evaluation is vectorized
+and runs in-process: shipping chunks to a process pool costs more in
+pickling than the model takes to evaluate them.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+
+from .config import DEFAULT_CONFIG
+from .engine import METRIC_NAMES, calculate_metrics_batch
+
+DEFAULT_CHUNK_ROWS = 500_000
+FORMATS = ('csv', 'parquet')
+CSV_BYTES_PER_ROW = 32  # rough row width used to size CSV read blocks
+
+
+def detect_format(path, explicit=None):
+    if explicit:
+        return explicit
+    suffix = Path(path).suffix.lower().lstrip('.')
+    if suffix in ('parquet', 'pq'):
+        return 'parquet'
+    if suffix == 'csv':
+        return 'csv'
+    raise ValueError(f"Cannot infer format of {path}; pass --input-format/--output-format")
+
+
+def read_batches(path, fmt, chunk_rows=DEFAULT_CHUNK_ROWS, config=DEFAULT_CONFIG):
+    """Open the scenario file: ``(schema, batches)``, batches of about ``chunk_rows`` rows.
+
+    CSV column types are otherwise inferred from the first block, so the
+    scenario and override columns are read as float64 up front; a ``150.5``
+    deep in an integer-looking column would fail the stream.
+    """
+    if fmt == 'parquet':
+        scenarios = pq.ParquetFile(path)
+        return scenarios.schema_arrow, scenarios.iter_batches(batch_size=chunk_rows)
+    read_options = pacsv.ReadOptions(block_size=chunk_rows * CSV_BYTES_PER_ROW)
+    numeric = {'customers', 'price', 'product_pct'} | config.override_names()
+    convert_options = pacsv.ConvertOptions(column_types={name: pa.float64() for name in numeric})
+    reader = pacsv.open_csv(path, read_options=read_options, convert_options=convert_options)
+    return reader.schema, reader
+
+
+class BatchWriter:
+    """Streams record batches of ``schema`` to CSV or Parquet.
+
+    The file is opened up front, so it exists (with just the header or
+    schema) even when no batch is ever written.
+    """
+
+    def __init__(self, path, fmt, schema):
+        self.path = path
+        self.fmt = fmt
+        if fmt == 'parquet':
+            self._writer = pq.ParquetWriter(path, schema)
+        else:
+            self._writer = pacsv.CSVWriter(path, schema)
+
+    def write(self, batch):
+        self._writer.write_batch(batch)
+
+    def close(self):
+        self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _column(batch, name):
+    column = batch.column(name)
+    if column.null_count:
+        raise ValueError(f"Column {name!r} has {column.null_count:,} blank value(s); fill them in or drop the column")
+    return column.to_numpy(zero_copy_only=False).astype(np.float64, copy=False)
+
+
+def _check_columns(names):
+    missing = {'customers', 'price'} - set(names)
+    if missing:
+        raise ValueError(f"Scenario file is missing required columns: {sorted(missing)}")
+
+
+def output_schema(schema, metrics=METRIC_NAMES):
+    """Schema of ``evaluate_batch`` results: the input columns, then the metric columns."""
+    metric_fields = [pa.field(name, pa.bool_() if name == 'break_even' else pa.float64()) for name in metrics]
+    return pa.schema(list(schema) + metric_fields)
+
+
+def scenario_params(batch, config=DEFAULT_CONFIG):
+    """Engine keyword arguments for one batch, applying per-row cost overrides."""
+    override_names = config.override_names()
+    return config.model_params({
+        name: _column(batch, name) for name in batch.schema.names if name in override_names
+    })
+
+
+def evaluate_batch(batch, config=DEFAULT_CONFIG, metrics=METRIC_NAMES, product_pct=5.0):
+    """Append the requested metric columns to a batch of scenarios."""
+    _check_columns(batch.schema.names)
+
+    if 'product_pct' in batch.schema.names:
+        product_pct = _column(batch, 'product_pct')
+    results = calculate_metrics_batch(
+        _column(batch, 'customers'), _column(batch, 'price'), product_pct, **scenario_params(batch, config)
+    )
+    return pa.RecordBatch.from_arrays(
+        list(batch.columns) + [pa.array(results[name]) for name in metrics],
+        names=list(batch.schema.names) + list(metrics),
+    )
+
+
+def run_scenarios(input_path, output_path, config=DEFAULT_CONFIG, metrics=METRIC_NAMES, product_pct=5.0,
+                  chunk_rows=DEFAULT_CHUNK_ROWS, input_format=None, output_format=None,
+                  progress=None):
+    """Evaluate every scenario in ``input_path`` and stream results to ``output_path``.
+
+    ``progress(rows, seconds)`` is called after each chunk is written.
+    Returns ``(rows, seconds)``.
+    """
+    schema, batches = read_batches(input_path, detect_format(input_path, input_format), chunk_rows, config)
+    _check_columns(schema.names)
+    started = time.perf_counter()
+    rows = 0
+
+    with BatchWriter(output_path, detect_format(output_path, output_format), output_schema(schema, metrics)) as writer:
+        for batch in batches:
+            writer.write(evaluate_batch(batch, config, metrics, product_pct))
+            rows += batch.num_rows
+            if progress:
+                progress(rows, time.perf_counter() - started)
+
+    return rows, time.perf_counter() - started
+
+
+def generate_scenarios(output_path, rows, seed=0, chunk_rows=DEFAULT_CHUNK_ROWS, output_format=None,
+                       config=DEFAULT_CONFIG):
+    """Write ``rows`` random scenarios (customers, price, product_pct) for benchmarking."""
+    rng = np.random.default_rng(seed)
+    schema = pa.schema([('customers', pa.int64()), ('price', pa.int64()), ('product_pct', pa.float64())])
+    with BatchWriter(output_path, detect_format(output_path, output_format), schema) as writer:
+        for start in range(0, rows, chunk_rows):
+            size = min(chunk_rows, rows - start)
+            writer.write(pa.RecordBatch.from_pydict(schema=schema, mapping={
+                'customers': rng.integers(50, config.max_capacity + 1, size),
+                'price': rng.integers(40, 141, size) * 50,
+                'product_pct': rng.integers(2, 7, size).astype(np.float64),
+            }))
+
+
+def _print_progress(rows, seconds):
+    print(f"\r{rows:,} rows  {rows / max(seconds, 1e-9):,.0f} rows/s", end='', file=sys.stderr, flush=True)
+
+
+def _metric_list(value):
+    metrics = tuple(name.strip() for name in value.split(',') if name.strip())
+    unknown = set(metrics) - set(METRIC_NAMES)
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown metrics: {', '.join(sorted(unknown))}")
+    return metrics
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m spa_model', description="Batch spa profitability scenarios.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help="evaluate a scenario file")
+    run.add_argument('input', help="scenario file (.csv or .parquet)")
+    run.add_argument('output', help="result file (.csv or .parquet)")
+    run.add_argument('--input-format', choices=FORMATS)
+    run.add_argument('--output-format', choices=FORMATS)
+    run.add_argument('--metrics', type=_metric_list, default=METRIC_NAMES,
+                     help="comma-separated metric columns to write (default: all)")
+    run.add_argument('--product-pct', type=float, default=5.0,
+                     help="product cost %% for rows without a product_pct column")
+    run.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS)
+    run.add_argument('--quiet', action='store_true', help="don't report progress")
+
+    generate = commands.add_parser('generate', help="write a random scenario file")
+    generate.add_argument('output')
+    generate.add_argument('--rows', type=int, default=1_000_000)
+    generate.add_argument('--seed', type=int, default=0)
+    generate.add_argument('--output-format', choices=FORMATS)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    if args.command == 'generate':
+        generate_scenarios(args.output, args.rows, seed=args.seed, output_format=args.output_format)
+        return 0
+
+    rows, seconds = run_scenarios(
+        args.input, args.output,
+        metrics=args.metrics,
+        product_pct=args.product_pct,
+        chunk_rows=args.chunk_rows,
+        input_format=args.input_format,
+        output_format=args.output_format,
+        progress=None if args.quiet else _print_progress,
+    )
+    print(f"\r{rows:,} scenarios in {seconds:.2f} s ({rows / max(seconds, 1e-9):,.0f} rows/s)", file=sys.stderr)
+    return 0
@@ -0,0 +1,135 @@
+"""Immutable cost configuration and the default site it describes."""
+from dataclasses import asdict, dataclass, replace
+from types import MappingProxyType
+
+from .engine import BEDS
+
+
+@dataclass(frozen=True)
+class CostConfig:
+    """Hashable snapshot of every cost input the metrics depend on.
+
+    Line items are stored as tuples of ``(name, amount)`` pairs so the
+    config can be used directly as a cache key.
+    """
+    fixed_costs: tuple
+    variable_per_customer: tuple
+    interior_capex: float
+    max_capacity: int
+    working_days: int
+    beds: int = BEDS
+
+    @classmethod
+    def from_dicts(cls, fixed_costs, variable_per_customer, **kwargs):
+        """Build a config from the ``{name: amount}`` dicts used by the dashboard."""
+        return cls(
+            fixed_costs=tuple(fixed_costs.items()),
+            variable_per_customer=tuple(variable_per_customer.items()),
+            **kwargs,
+        )
+
+    @classmethod
+    def from_dict(cls, data):
+        """Inverse of ``to_dict``."""
+        return cls(**{
+            **data,
+            'fixed_costs': tuple(map(tuple, data['fixed_costs'])),
+            'variable_per_customer': tuple(map(tuple, data['variable_per_customer'])),
+        })
+
+    def to_dict(self):
+        """JSON-serializable form; line items become ``[name, amount]`` lists."""
+        return asdict(self)
+
+    @property
+    def total_fixed(self):
+        return sum(amount for _, amount in self.fixed_costs)
+
+    @property
+    def total_variable(self):
+        return sum(amount for _, amount in self.variable_per_customer)
+
+    def fixed_dict(self):
+        return dict(self.fixed_costs)
+
+    def variable_dict(self):
+        return dict(self.variable_per_customer)
+
+    def with_fixed_costs(self, **overrides):
+        """Return a copy with some fixed cost line items replaced by name."""
+        unknown = set(overrides) - {name for name, _ in self.fixed_costs}
+        if unknown:
+            raise KeyError(f"Unknown fixed cost items: {sorted(unknown)}")
+        items = tuple((name, overrides.get(name, amount)) for name, amount in self.fixed_costs)
+        return replace(self, fixed_costs=items)
+
+    def with_capacity(self, max_capacity):
+        """Return a copy with ``max_capacity`` treatments per month."""
+        return replace(self, max_capacity=int(max_capacity))
+
+    def override_names(self):
+        """Names accepted as ``model_params`` overrides."""
+        return frozenset(self.model_params()) | {name for name, _ in self.fixed_costs + self.variable_per_customer}
+
+    def model_params(self, overrides=None):
+        """Keyword arguments for ``calculate_metrics_batch``.
+
+        ``overrides`` maps parameter names (``total_fixed``, ``max_capacity``,
+        ...) or fixed/variable line item names to per-scenario values. A line
+        item replaces that line's amount in the total; an explicit total wins
+        over line items.
+        """
+        params = {
+            'total_fixed': self.total_fixed,
+            'total_variable': self.total_variable,
+            'max_capacity': self.max_capacity,
+            'working_days': self.working_days,
+            'interior_capex': self.interior_capex,
+            'beds': self.beds,
+        }
+        if not overrides:
+            return params
+
+        for total, items in (('total_fixed', self.fixed_costs), ('total_variable', self.variable_per_customer)):
+            for name, amount in items:
+                if name in overrides:
+                    params[total] = params[total] + (overrides[name] - amount)
+        params.update((name, overrides[name]) for name in params if name in overrides)
+        return params
+
+
+# Default site: 12-bed spa in Mumbai
+TREATMENTS_PER_BED_PER_DAY = 5
+WORKING_DAYS = 26
+MAX_CAPACITY = BEDS * TREATMENTS_PER_BED_PER_DAY * WORKING_DAYS  # 1560 treatments/month
+
+# One-time capital expenditure
+INTERIOR_CAPEX = 10000000  # ₹1 crore for interior setup
+
+# Fixed costs (monthly)
+FIXED_COSTS = MappingProxyType({
+    'Rent (displacement)': 200000,
+    'Salary (14 staff)': 475000,
+    'Electricity': 45000,
+    'Marketing': 125000,
+    'IISC': 10000,
+    'Accommodation': 100000,
+    'Snacks (26 days)': 10000
+})
+
+# Variable costs per customer
+VARIABLE_PER_CUSTOMER = MappingProxyType({
+    'Laundry': 35,
+    'Bathrobe': 50,
+    'Disposal': 10,
+    'Disposal U': 20,
+    'Incentive': 200
+})
+
+DEFAULT_CONFIG = CostConfig.from_dicts(
+    FIXED_COSTS,
+    VARIABLE_PER_CUSTOMER,
+    interior_capex=INTERIOR_CAPEX,
+    max_capacity=MAX_CAPACITY,
+    working_days=WORKING_DAYS,
+)
@@ -0,0 +1,361 @@
+"""Vectorized financial model for the spa dashboard.
+
+Every KPI is evaluated element-wise over NumPy arrays, so whole scenario
+grids (customers x price x product %) are computed in a single pass. The
+formulas and edge cases mirror the original scalar ``calculate_metrics``.
+Each formula is a small function in ``FORMULAS``, shared by the batch engine
+and the lazy ``graph.KPIGraph``. ``calculate_metrics_scalar`` spells the same
+formulas out on Python floats for single scenarios, where NumPy's per-call
+overhead would dominate.
+"""
+import inspect
+import math
+
+import numpy as np
+
+BEDS = 12
+
+# Output columns, in the same order as the original metrics dict
+METRIC_NAMES = (
+    'revenue',
+    'fixed_costs',
+    'variable_costs',
+    'total_expenses',
+    'net_profit',
+    'margin',
+    'utilization',
+    'daily_avg',
+    'break_even',
+    'revenue_per_bed',
+    'profit_per_customer',
+    'break_even_customers',
+    'break_even_utilization',
+    'roi_monthly',
+    'roi_annual',
+    'fixed_cost_ratio',
+    'variable_cost_ratio',
+    'revenue_per_treatment',
+    'cost_per_treatment',
+    'contribution_margin',
+    'contribution_margin_ratio',
+    'capex_payback_months',
+    'capex_payback_years',
+    'annual_profit',
+    'capex_roi_annual',
+)
+
+
+def _safe_div(num, den, mask, fill=0.0):
+    """Divide where ``mask`` holds, ``fill`` elsewhere, without warnings."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        quotient = np.divide(num, den)
+    quotient = np.asarray(quotient, dtype=np.float64)
+    if not mask.all():
+        quotient = np.broadcast_to(quotient, mask.shape).copy()
+        np.putmask(quotient, ~mask, fill)
+    return quotient
+
+
+# The model inputs: ``customers``, ``price`` and ``product_pct`` per scenario,
+# the rest from ``CostConfig.model_params``
+INPUT_NAMES = (
+    'customers', 'price', 'product_pct', 'total_fixed', 'total_variable',
+    'max_capacity', 'working_days', 'interior_capex', 'beds',
+)
+
+# name -> (dependencies, function) for every KPI and the intermediates they
+# share, in definition (topological) order. ``calculate_metrics_batch`` runs
+# them all; ``graph.KPIGraph`` runs just the ones a caller asks for.
+FORMULAS = {}
+
+
+def _formula(fn):
+    FORMULAS[fn.__name__] = (tuple(inspect.signature(fn).parameters), fn)
+    return fn
+
+
+@_formula
+def revenue(customers, price):
+    return customers * price
+
+
+@_formula
+def product_cost(revenue, product_pct):
+    return revenue * (product_pct / 100)
+
+
+@_formula
+def variable_costs(total_variable, customers, product_cost):
+    return (total_variable * customers) + product_cost
+
+
+@_formula
+def total_expenses(total_fixed, variable_costs):
+    return total_fixed + variable_costs
+
+
+@_formula
+def net_profit(revenue, total_expenses):
+    return revenue - total_expenses
+
+
+@_formula
+def has_revenue(revenue):
+    return revenue > 0
+
+
+@_formula
+def has_customers(customers):
+    return customers > 0
+
+
+@_formula
+def fixed_costs(total_fixed, customers):
+    return np.broadcast_to(total_fixed, np.shape(customers)).astype(np.float64)
+
+
+@_formula
+def margin(net_profit, revenue, has_revenue):
+    margin = _safe_div(net_profit, revenue, has_revenue)
+    margin *= 100
+    return margin
+
+
+@_formula
+def utilization(customers, max_capacity):
+    utilization = customers / max_capacity
+    utilization *= 100
+    return utilization
+
+
+@_formula
+def daily_avg(customers, working_days):
+    return customers / working_days
+
+
+@_formula
+def break_even(net_profit):
+    return net_profit >= 0
+
+
+# Enhanced KPIs
+@_formula
+def revenue_per_bed(revenue, beds, has_revenue):
+    return _safe_div(revenue, beds, has_revenue)
+
+
+@_formula
+def profit_per_customer(net_profit, customers, has_customers):
+    return _safe_div(net_profit, customers, has_customers)
+
+
+@_formula
+def price_product(price, product_pct):
+    return price * product_pct / 100
+
+
+@_formula
+def break_even_customers(total_fixed, price, total_variable, price_product):
+    unit_contribution = price - total_variable - price_product
+    return _safe_div(total_fixed, unit_contribution, price > (total_variable + price_product))
+
+
+@_formula
+def break_even_utilization(break_even_customers, max_capacity):
+    return np.where(
+        break_even_customers <= max_capacity,
+        (break_even_customers / max_capacity) * 100,
+        100.0,
+    )
+
+
+@_formula
+def roi_monthly(net_profit, total_expenses):
+    roi_monthly = _safe_div(net_profit, total_expenses, total_expenses > 0)
+    roi_monthly *= 100
+    return roi_monthly
+
+
+@_formula
+def roi_annual(roi_monthly):
+    return roi_monthly * 12
+
+
+# Cost ratios
+@_formula
+def fixed_cost_ratio(total_fixed, revenue, has_revenue):
+    fixed_cost_ratio = _safe_div(total_fixed, revenue, has_revenue)
+    fixed_cost_ratio *= 100
+    return fixed_cost_ratio
+
+
+@_formula
+def variable_cost_ratio(variable_costs, revenue, has_revenue):
+    variable_cost_ratio = _safe_div(variable_costs, revenue, has_revenue)
+    variable_cost_ratio *= 100
+    return variable_cost_ratio
+
+
+# Efficiency metrics
+@_formula
+def revenue_per_treatment(price):
+    return price.astype(np.float64)
+
+
+@_formula
+def cost_per_treatment(total_expenses, customers, has_customers):
+    return _safe_div(total_expenses, customers, has_customers)
+
+
+@_formula
+def contribution_margin(price, total_variable, price_product):
+    return price - (total_variable + price_product)
+
+
+@_formula
+def contribution_margin_ratio(contribution_margin, price):
+    contribution_margin_ratio = _safe_div(contribution_margin, price, price > 0)
+    contribution_margin_ratio *= 100
+    return contribution_margin_ratio
+
+
+# CAPEX payback analysis
+@_formula
+def capex_payback_months(interior_capex, net_profit):
+    return _safe_div(interior_capex, net_profit, net_profit > 0, np.inf)
+
+
+@_formula
+def capex_payback_years(capex_payback_months):
+    return capex_payback_months / 12
+
+
+@_formula
+def annual_profit(net_profit):
+    return net_profit * 12
+
+
+@_formula
+def capex_roi_annual(annual_profit, interior_capex):
+    capex_roi_annual = _safe_div(annual_profit, interior_capex, np.broadcast_to(interior_capex > 0, np.shape(annual_profit)))
+    capex_roi_annual *= 100
+    return capex_roi_annual
+
+
+def calculate_metrics_batch(customers, price, product_pct, *, total_fixed,
+                            total_variable, max_capacity, working_days,
+                            interior_capex, beds=BEDS):
+    """Calculate every KPI for arrays of scenarios.
+
+    ``customers``, ``price`` and ``product_pct`` may be scalars or arrays of
+    any broadcast-compatible shape. ``total_fixed`` and ``total_variable`` are
+    usually scalars but may also be arrays (e.g. sampled per scenario), as
+    may ``interior_capex``, ``max_capacity``, ``working_days`` and ``beds``.
+    Returns a dict mapping each name in ``METRIC_NAMES`` to an array of the
+    broadcast shape.
+    """
+    total_fixed = np.asarray(total_fixed, dtype=np.float64)
+    total_variable = np.asarray(total_variable, dtype=np.float64)
+    interior_capex = np.asarray(interior_capex, dtype=np.float64)
+    customers = np.asarray(customers, dtype=np.float64)
+    price = np.asarray(price, dtype=np.float64)
+    product_pct = np.asarray(product_pct, dtype=np.float64)
+    shape = np.broadcast_shapes(
+        customers.shape, price.shape, product_pct.shape, total_fixed.shape, total_variable.shape,
+        interior_capex.shape, np.shape(max_capacity), np.shape(working_days), np.shape(beds),
+    )
+    values = {
+        'customers': np.broadcast_to(customers, shape),
+        'price': np.broadcast_to(price, shape),
+        'product_pct': np.broadcast_to(product_pct, shape),
+        'total_fixed': total_fixed,
+        'total_variable': total_variable,
+        'max_capacity': max_capacity,
+        'working_days': working_days,
+        'interior_capex': interior_capex,
+        'beds': beds,
+    }
+    for name, (dependencies, formula) in FORMULAS.items():
+        values[name] = formula(*[values[dependency] for dependency in dependencies])
+    return {name: values[name] for name in METRIC_NAMES}
+
+
+def _div(num, den):
+    """``num / den`` on floats, with NumPy's inf/nan instead of an error for a zero ``den``."""
+    if den:
+        return num / den
+    if num == 0 or num != num:
+        return math.nan
+    return math.copysign(math.inf, num) * math.copysign(1.0, den)
+
+
+def calculate_metrics_scalar(customers, price, product_pct, *, total_fixed,
+                             total_variable, max_capacity, working_days,
+                             interior_capex, beds=BEDS):
+    """``calculate_metrics_batch`` for one scenario of plain numbers, as a dict.
+
+    Each line is the matching ``FORMULAS`` entry with the operations in the
+    same order, so results are bit-for-bit equal to the batch engine's (floats,
+    and a bool for ``break_even``); ``benchmarks/bench.py`` checks this.
+    """
+    customers, price, product_pct = float(customers), float(price), float(product_pct)
+    total_fixed, total_variable = float(total_fixed), float(total_variable)
+    max_capacity, working_days = float(max_capacity), float(working_days)
+    interior_capex, beds = float(interior_capex), float(beds)
+
+    revenue = customers * price
+    product_cost = revenue * (product_pct / 100)
+    variable_costs = (total_variable * customers) + product_cost
+    total_expenses = total_fixed + variable_costs
+    net_profit = revenue - total_expenses
+    has_revenue = revenue > 0
+    has_customers = customers > 0
+
+    price_product = price * product_pct / 100
+    break_even_customers = (
+        _div(total_fixed, price - total_variable - price_product)
+        if price > (total_variable + price_product) else 0.0
+    )
+    roi_monthly = (_div(net_profit, total_expenses) if total_expenses > 0 else 0.0) * 100
+    contribution_margin = price - (total_variable + price_product)
+    capex_payback_months = _div(interior_capex, net_profit) if net_profit > 0 else math.inf
+    annual_profit = net_profit * 12
+
+    return {
+        'revenue': revenue,
+        'fixed_costs': total_fixed,
+        'variable_costs': variable_costs,
+        'total_expenses': total_expenses,
+        'net_profit': net_profit,
+        'margin': (_div(net_profit, revenue) if has_revenue else 0.0) * 100,
+        'utilization': _div(customers, max_capacity) * 100,
+        'daily_avg': _div(customers, working_days),
+        'break_even': net_profit >= 0,
+        'revenue_per_bed': _div(revenue, beds) if has_revenue else 0.0,
+        'profit_per_customer': _div(net_profit, customers) if has_customers else 0.0,
+        'break_even_customers': break_even_customers,
+        'break_even_utilization': (
+            _div(break_even_customers, max_capacity) * 100
+            if break_even_customers <= max_capacity else 100.0
+        ),
+        'roi_monthly': roi_monthly,
+        'roi_annual': roi_monthly * 12,
+        'fixed_cost_ratio': (_div(total_fixed, revenue) if has_revenue else 0.0) * 100,
+        'variable_cost_ratio': (_div(variable_costs, revenue) if has_revenue else 0.0) * 100,
+        'revenue_per_treatment': price,
+        'cost_per_treatment': _div(total_expenses, customers) if has_customers else 0.0,
+        'contribution_margin': contribution_margin,
+        'contribution_margin_ratio': (_div(contribution_margin, price) if price > 0 else 0.0) * 100,
+        'capex_payback_months': capex_payback_months,
+        'capex_payback_years': capex_payback_months / 12,
+        'annual_profit': annual_profit,
+        'capex_roi_annual': (_div(annual_profit, interior_capex) if interior_capex > 0 else 0.0) * 100,
+    }
+
+
+def scalar_metrics(batch):
+    """Convert a single-scenario batch result into a plain metrics dict."""
+    return {
+        name: bool(batch[name]) if name == 'break_even' else float(batch[name])
+        for name in METRIC_NAMES
+    }
@@ -0,0 +1,161 @@
+"""Precomputed KPI grid for exploring scenarios in the browser.
+
+``explorer_grid`` evaluates the explorer's metrics over product % x customers
+x price in one batch, at the finest resolution whose encoded payload fits a
+byte budget. ``explorer_payload`` packs it for the client: the axes as lists
+and each metric as base64 little-endian float32 in C order. The browser
+decodes it once and interpolates trilinearly between grid points, as
+``interpolate`` does here, so scrubbing through scenarios never contacts the
+server.
+
+Revenue and net profit are bilinear in customers and price, so within a
+product % they interpolate exactly; ``interpolation_error`` measures the
+other metrics at the cell centres, where interpolation is furthest from the
+grid. Margin and payback are steep near zero revenue and near break-even, so
+their worst case is far above the typical (95th percentile) error.
+"""
+import base64
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+
+import numpy as np
+
+from .config import DEFAULT_CONFIG
+from .engine import calculate_metrics_batch
+
+EXPLORER_METRICS = ('net_profit', 'margin', 'break_even_customers', 'capex_payback_months', 'roi_monthly')
+PAYLOAD_BUDGET = 384 * 1024  # bytes of encoded metric data
+PRICE_RANGE = (2000, 10000)
+UTILIZATION_RANGE = (0.05, 1.0)  # of max_capacity; margin jumps to 0 at zero revenue
+PRODUCT_PCTS = tuple(float(pct) for pct in range(0, 11))
+MIN_AXIS_POINTS = 2
+
+
+@dataclass(frozen=True, eq=False)
+class ExplorerGrid:
+    """Metrics of shape ``(len(product_pcts), len(customers), len(prices))``, as read-only float32."""
+    prices: np.ndarray
+    customers: np.ndarray
+    product_pcts: np.ndarray
+    metrics: MappingProxyType
+    max_capacity: int
+
+    @property
+    def shape(self):
+        return (len(self.product_pcts), len(self.customers), len(self.prices))
+
+    @property
+    def payload_bytes(self):
+        return sum(_encoded_size(values.nbytes) for values in self.metrics.values())
+
+
+def _encoded_size(nbytes):
+    return 4 * -(-nbytes // 3)  # base64
+
+
+def axis_points(budget, n_metrics, n_product_pcts):
+    """Points per price and customer axis so the encoded metrics fit ``budget`` bytes."""
+    cells = budget * 3 // 4 // 4 // n_metrics
+    points = int(np.sqrt(cells / n_product_pcts))
+    while points >= MIN_AXIS_POINTS and _encoded_size(4 * n_product_pcts * points ** 2) * n_metrics > budget:
+        points -= 1
+    if points < MIN_AXIS_POINTS:
+        raise ValueError(f"A {budget:,}-byte budget is too small for {n_metrics} metrics")
+    return points
+
+
+def explorer_grid(config=DEFAULT_CONFIG, budget=PAYLOAD_BUDGET, metrics=EXPLORER_METRICS,
+                  price_range=PRICE_RANGE, utilization_range=UTILIZATION_RANGE, product_pcts=PRODUCT_PCTS):
+    """Evaluate ``metrics`` over the largest grid whose payload fits ``budget``.
+
+    Prices and customers (``utilization_range`` of ``config.max_capacity``)
+    get the same number of points.
+    """
+    points = axis_points(budget, len(metrics), len(product_pcts))
+    prices = np.linspace(*price_range, points)
+    customers = np.linspace(*(rate * config.max_capacity for rate in utilization_range), points)
+    product_pcts = np.asarray(product_pcts, dtype=np.float64)
+    batch = calculate_metrics_batch(
+        customers[None, :, None], prices[None, None, :], product_pcts[:, None, None], **config.model_params()
+    )
+    values = {}
+    for name in metrics:
+        values[name] = batch[name].astype(np.float32)
+        values[name].flags.writeable = False
+    for axis in (prices, customers, product_pcts):
+        axis.flags.writeable = False
+    return ExplorerGrid(prices, customers, product_pcts, MappingProxyType(values), config.max_capacity)
+
+
+def explorer_payload(grid):
+    """JSON-ready form of ``grid`` for the browser."""
+    return {
+        'price': grid.prices.tolist(),
+        'customers': grid.customers.tolist(),
+        'product_pct': grid.product_pcts.tolist(),
+        'shape': list(grid.shape),
+        'max_capacity': grid.max_capacity,
+        'metrics': {
+            name: base64.b64encode(values.astype('<f4').tobytes()).decode('ascii')
+            for name, values in grid.metrics.items()
+        },
+    }
+
+
+def _locate(axis, values):
+    """Lower grid index and fraction towards the next point, clamped to the axis."""
+    values = np.clip(values, axis[0], axis[-1])
+    index = np.clip(np.searchsorted(axis, values, side='right') - 1, 0, len(axis) - 2)
+    return index, (values - axis[index]) / (axis[index + 1] - axis[index])
+
+
+def interpolate(grid, name, customers, price, product_pct):
+    """Trilinear interpolation of metric ``name`` between grid points.
+
+    Where a neighbouring grid value is not finite (a payback that never
+    comes), the nearest grid point's value is returned instead.
+    """
+    values = grid.metrics[name]
+    (k, tk), (j, tj), (i, ti) = (
+        _locate(axis, np.asarray(value, dtype=np.float64))
+        for axis, value in ((grid.product_pcts, product_pct), (grid.customers, customers), (grid.prices, price))
+    )
+    result = np.zeros(np.broadcast_shapes(k.shape, j.shape, i.shape))
+    finite = np.ones(result.shape, dtype=bool)
+    for dk, dj, di in np.ndindex(2, 2, 2):
+        corner = values[k + dk, j + dj, i + di].astype(np.float64)
+        weight = (tk if dk else 1 - tk) * (tj if dj else 1 - tj) * (ti if di else 1 - ti)
+        finite &= np.isfinite(corner)
+        result += np.where(np.isfinite(corner), corner, 0.0) * weight
+    nearest = values[k + np.rint(tk).astype(int), j + np.rint(tj).astype(int), i + np.rint(ti).astype(int)]
+    return np.where(finite, result, nearest)
+
+
+def interpolation_error(grid, config=DEFAULT_CONFIG):
+    """Absolute interpolation error per metric at the cell centres.
+
+    Returns ``{metric: (95th percentile, max)}``; centres where the exact
+    value is not finite are skipped.
+    """
+    def centres(axis):
+        return (axis[:-1] + axis[1:]) / 2
+
+    product_pct, customers, price = np.meshgrid(
+        centres(grid.product_pcts), centres(grid.customers), centres(grid.prices), indexing='ij'
+    )
+    exact = calculate_metrics_batch(customers, price, product_pct, **config.model_params())
+    errors = {}
+    for name in grid.metrics:
+        with np.errstate(invalid='ignore'):
+            error = np.abs(interpolate(grid, name, customers, price, product_pct) - exact[name])
+        error = error[np.isfinite(exact[name]) & np.isfinite(error)]
+        errors[name] = (float(np.percentile(error, 95)), float(error.max())) if error.size else (0.0, 0.0)
+    return errors
+
+
+@lru_cache(maxsize=32)
+def cached_explorer_payload(config=DEFAULT_CONFIG, budget=PAYLOAD_BUDGET):
+    """``(grid, payload, interpolation errors)`` memoized per (config, budget)."""
+    grid = explorer_grid(config, budget)
+    return grid, MappingProxyType(explorer_payload(grid)), MappingProxyType(interpolation_error(grid, config))
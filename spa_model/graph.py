@@ -0,0 +1,137 @@
+"""The KPIs as a declared dependency graph, evaluated lazily and incrementally.
+
+Each node is one of ``engine.FORMULAS``, the functions ``calculate_metrics_batch``
+itself runs; its parameters name the nodes (or inputs) it reads::
+
+    customers, price -> revenue -> product_cost -> variable_costs
+        -> total_expenses -> net_profit -> margin, roi_monthly, capex_payback_months, ...
+
+``KPIGraph`` holds one set of inputs. Asking for a subset of KPIs evaluates
+only those nodes and their ancestors; changing an input drops just the nodes
+downstream of it, so the next request recomputes only what the change
+affected. ``last_recomputed`` records which nodes that was.
+"""
+import numpy as np
+
+from .config import DEFAULT_CONFIG
+from .engine import FORMULAS, INPUT_NAMES, METRIC_NAMES
+
+# name -> (dependencies, function), in definition (topological) order: the
+# batch engine's own formulas, so the graph cannot drift from it
+NODES = FORMULAS
+
+
+def _dependents():
+    dependents = {name: [] for name in INPUT_NAMES + tuple(NODES)}
+    for name, (dependencies, _) in NODES.items():
+        for dependency in dependencies:
+            dependents[dependency].append(name)
+    return dependents
+
+
+DEPENDENTS = _dependents()
+
+
+def downstream(names):
+    """Every node whose value depends on any of ``names``."""
+    affected, stack = set(), list(names)
+    while stack:
+        for dependent in DEPENDENTS[stack.pop()]:
+            if dependent not in affected:
+                affected.add(dependent)
+                stack.append(dependent)
+    return frozenset(affected)
+
+
+def upstream(names):
+    """``names`` and every node they need, excluding inputs."""
+    needed, stack = set(), [name for name in names if name in NODES]
+    while stack:
+        name = stack.pop()
+        if name not in needed:
+            needed.add(name)
+            stack.extend(dependency for dependency in NODES[name][0] if dependency in NODES)
+    return frozenset(needed)
+
+
+class KPIGraph:
+    """Cached node values for one set of model inputs.
+
+    Inputs are the ``calculate_metrics_batch`` arguments (scalars or
+    broadcast-compatible arrays). ``get`` returns read-only arrays of the
+    broadcast shape, equal to the batch engine's.
+    """
+
+    def __init__(self, **inputs):
+        missing = set(INPUT_NAMES) - set(inputs)
+        if missing:
+            raise TypeError(f"KPIGraph is missing inputs: {sorted(missing)}")
+        self._raw = {}
+        self._values = {}
+        self.last_recomputed = ()
+        self.update(**inputs)
+
+    @classmethod
+    def for_scenario(cls, customers, price, product_pct=5.0, config=DEFAULT_CONFIG):
+        return cls(customers=customers, price=price, product_pct=product_pct, **config.model_params())
+
+    def update(self, **changes):
+        """Change some inputs; returns the nodes this invalidated.
+
+        Inputs set to their current value invalidate nothing.
+        """
+        unknown = set(changes) - set(INPUT_NAMES)
+        if unknown:
+            raise TypeError(f"Unknown KPI graph inputs: {sorted(unknown)}")
+        changed = [
+            name for name, value in changes.items()
+            if name not in self._raw or not np.array_equal(value, self._raw[name])
+        ]
+        if not changed:
+            return frozenset()
+
+        raw = {**self._raw, **changes}
+        arrays = np.broadcast_arrays(*(np.asarray(raw[name], dtype=np.float64) for name in INPUT_NAMES))
+        if any(name in self._values and self._values[name].shape != arrays[0].shape for name in INPUT_NAMES):
+            changed = INPUT_NAMES  # the broadcast shape changed, so every node did
+        invalidated = downstream(changed)
+        for name in invalidated:
+            self._values.pop(name, None)
+        self._raw = raw
+        self._values.update(zip(INPUT_NAMES, arrays))
+        return invalidated
+
+    def get(self, *names):
+        """Values of the requested KPIs (all of ``METRIC_NAMES`` when none are given)."""
+        names = names or METRIC_NAMES
+        unknown = set(names) - set(NODES)
+        if unknown:
+            raise KeyError(f"Unknown KPIs: {sorted(unknown)}")
+        needed = upstream(names)
+        recomputed = []
+        for name in NODES:  # definition order is a topological order
+            if name in self._values or name not in needed:
+                continue
+            dependencies, fn = NODES[name]
+            value = fn(*(self._values[dependency] for dependency in dependencies))
+            if isinstance(value, np.ndarray):
+                value.flags.writeable = False  # shared with every later caller
+            self._values[name] = value
+            recomputed.append(name)
+        self.last_recomputed = tuple(recomputed)
+        return {name: self._values[name] for name in names}
+
+    def __getitem__(self, name):
+        return self.get(name)[name]
+
+    def scalars(self, *names):
+        """``get`` for a single scenario, as plain floats (and a bool for ``break_even``)."""
+        return {
+            name: bool(value) if name == 'break_even' else float(value)
+            for name, value in self.get(*names).items()
+        }
+
+
+def evaluate_kpis(names, customers, price, product_pct, **params):
+    """Compute only ``names`` (and what they need) for one batch of inputs."""
+    return KPIGraph(customers=customers, price=price, product_pct=product_pct, **params).get(*names)
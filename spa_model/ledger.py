@@ -0,0 +1,301 @@
+"""Streaming ingest of booking ledgers and model-vs-actual comparison.
+
+Ledgers are CSV or Parquet exports with one row per booking: ``date``,
+``bed``, ``treatment``, ``price``, ``therapist`` and optionally
+``variable_cost`` (consumables, laundry, incentive, ... for that booking).
+Only ``date`` and ``price`` are required. Files are read in Arrow record
+batches with fixed column types and reduced to one row per day as they
+stream, so memory stays flat for ledgers of any size.
+
+``LedgerStore`` keeps the daily aggregates in a directory, together with a
+manifest of the files already ingested. Adding a new month parses only that
+file; monthly figures are re-derived from the small daily table.
+
+This module needs pyarrow and is not imported by ``spa_model`` itself.
+"""
+import hashlib
+import json
+import threading
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+
+from .config import DEFAULT_CONFIG
+from .metrics import calculate_metrics_grid
+
+# Column types enforced while parsing; labels are dictionary-encoded
+LEDGER_COLUMNS = {
+    'date': pa.timestamp('s'),
+    'bed': pa.int16(),
+    'treatment': pa.dictionary(pa.int32(), pa.string()),
+    'price': pa.float64(),
+    'therapist': pa.dictionary(pa.int32(), pa.string()),
+    'variable_cost': pa.float64(),
+}
+REQUIRED_COLUMNS = ('date', 'price')
+DAILY_COLUMNS = ('day', 'bookings', 'revenue', 'variable_cost', 'costed_bookings')
+DEFAULT_CHUNK_ROWS = 1_000_000
+CSV_BLOCK_BYTES = 64 << 20
+
+
+def read_ledger(source, fmt=None, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Yield a ledger as record batches with the ``LEDGER_COLUMNS`` types.
+
+    ``source`` is a path or a binary file object; ``fmt`` ('csv' or
+    'parquet') is inferred from the file name when omitted.
+    """
+    if fmt is None:
+        fmt = 'parquet' if str(getattr(source, 'name', source)).lower().endswith(('.parquet', '.pq')) else 'csv'
+
+    if fmt == 'parquet':
+        parquet = pq.ParquetFile(source)
+        names = [name for name in LEDGER_COLUMNS if name in parquet.schema_arrow.names]
+        _check_columns(names)
+        for batch in parquet.iter_batches(batch_size=chunk_rows, columns=names):
+            yield pa.RecordBatch.from_arrays(
+                [batch.column(name).cast(LEDGER_COLUMNS[name]) for name in names], names=names
+            )
+    else:
+        # The header decides the columns: filling absent ones with nulls would
+        # let a ledger without prices through as zero revenue
+        reader = pacsv.open_csv(
+            source,
+            read_options=pacsv.ReadOptions(block_size=CSV_BLOCK_BYTES),
+            convert_options=pacsv.ConvertOptions(column_types=LEDGER_COLUMNS),
+        )
+        names = [name for name in LEDGER_COLUMNS if name in reader.schema.names]
+        _check_columns(names)
+        for batch in reader:
+            yield pa.RecordBatch.from_arrays([batch.column(name) for name in names], names=names)
+
+
+def _check_columns(names):
+    missing = set(REQUIRED_COLUMNS) - set(names)
+    if missing:
+        raise ValueError(f"Ledger is missing required columns: {sorted(missing)}")
+
+
+def _daily_from_batch(batch):
+    """One row per day for a batch: bookings, revenue and booked variable costs."""
+    valid = pc.is_valid(batch.column('date'))
+    days = pc.cast(pc.cast(batch.column('date').filter(valid), pa.date32()), pa.int32()).to_numpy()
+    price = batch.column('price').filter(valid).to_numpy(zero_copy_only=False)
+    if 'variable_cost' in batch.schema.names:
+        cost = batch.column('variable_cost').filter(valid).to_numpy(zero_copy_only=False).astype(np.float64)
+    else:
+        cost = np.full(len(days), np.nan)
+    return _group_days(days, {
+        'bookings': np.ones(len(days)),
+        'revenue': np.nan_to_num(price),
+        'variable_cost': np.nan_to_num(cost),
+        'costed_bookings': (~np.isnan(cost)).astype(np.float64),
+    })
+
+
+def _group_days(days, sums):
+    """Sum each column of ``sums`` per distinct day."""
+    if len(days) == 0:
+        return {name: np.zeros(0, dtype=np.int32 if name == 'day' else np.float64) for name in DAILY_COLUMNS}
+    unique_days, group = np.unique(days, return_inverse=True)
+    daily = {'day': unique_days.astype(np.int32)}
+    for name, values in sums.items():
+        daily[name] = np.bincount(group, weights=values, minlength=len(unique_days))
+    return daily
+
+
+def merge_daily(*tables):
+    """Combine daily aggregates (e.g. chunks, or old history plus a new file)."""
+    days = np.concatenate([table['day'] for table in tables])
+    return _group_days(days, {
+        name: np.concatenate([table[name] for table in tables]) for name in DAILY_COLUMNS[1:]
+    })
+
+
+def aggregate_ledger(source, fmt=None, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Stream a ledger and return its daily aggregates."""
+    partials = [_daily_from_batch(batch) for batch in read_ledger(source, fmt, chunk_rows)]
+    return merge_daily(*partials) if partials else _group_days(np.zeros(0, dtype=np.int32), {})
+
+
+def monthly_from_daily(daily):
+    """Roll daily aggregates up to calendar months.
+
+    Returns a dict of arrays: ``month`` (``datetime64[M]``), ``open_days``
+    (days with at least one booking), ``bookings``, ``revenue``,
+    ``avg_price``, ``variable_cost`` and ``variable_per_customer`` (nan
+    when the ledger carries no costs).
+    """
+    months = daily['day'].astype('datetime64[D]').astype('datetime64[M]')
+    unique_months, group = np.unique(months, return_inverse=True)
+
+    def total(values):
+        return np.bincount(group, weights=values, minlength=len(unique_months))
+
+    bookings = total(daily['bookings'])
+    revenue = total(daily['revenue'])
+    variable_cost = total(daily['variable_cost'])
+    costed = total(daily['costed_bookings'])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return {
+            'month': unique_months,
+            'open_days': np.bincount(group, minlength=len(unique_months)),
+            'bookings': bookings,
+            'revenue': revenue,
+            'avg_price': np.where(bookings > 0, revenue / bookings, np.nan),
+            'variable_cost': variable_cost,
+            'variable_per_customer': np.where(costed > 0, variable_cost / costed, np.nan),
+        }
+
+
+def compare_to_model(monthly, customers, price, product_pct=5.0, config=DEFAULT_CONFIG):
+    """Actual months against the modeled scenario, as a dict of arrays.
+
+    ``model_*`` columns are the plan (the scenario's customers and price);
+    ``predicted_net_profit`` is what the model predicts at each month's actual
+    volume and price; ``actual_net_profit`` replaces the configured variable
+    cost per customer with the booked one where the ledger has costs.
+    Utilization is measured against the capacity of the days the spa was
+    open, so a month in progress is not understated.
+    """
+    plan = calculate_metrics_grid(customers, price, product_pct, config)
+    predicted = calculate_metrics_grid(monthly['bookings'], np.nan_to_num(monthly['avg_price']), product_pct, config)
+
+    daily_capacity = config.max_capacity / config.working_days
+    variable_per_customer = np.where(
+        np.isnan(monthly['variable_per_customer']), config.total_variable, monthly['variable_per_customer']
+    )
+    actual_net_profit = (
+        monthly['revenue'] * (1 - product_pct / 100)
+        - variable_per_customer * monthly['bookings']
+        - config.total_fixed
+    )
+    n = len(monthly['month'])
+    return {
+        'month': monthly['month'],
+        'actual_customers': monthly['bookings'],
+        'model_customers': np.full(n, float(customers)),
+        'actual_utilization': monthly['bookings'] / (daily_capacity * monthly['open_days']) * 100,
+        'model_utilization': np.full(n, float(plan['utilization'])),
+        'actual_avg_price': monthly['avg_price'],
+        'model_price': np.full(n, float(price)),
+        'actual_variable_per_customer': monthly['variable_per_customer'],
+        'model_variable_per_customer': np.full(n, float(config.total_variable)),
+        'actual_revenue': monthly['revenue'],
+        'model_revenue': np.full(n, float(plan['revenue'])),
+        'actual_net_profit': actual_net_profit,
+        'predicted_net_profit': predicted['net_profit'],
+        'model_net_profit': np.full(n, float(plan['net_profit'])),
+    }
+
+
+def fingerprint(source):
+    """Content hash identifying a ledger file, so re-adding it is a no-op."""
+    digest = hashlib.sha256()
+    if isinstance(source, (str, Path)):
+        with open(source, 'rb') as handle:
+            for block in iter(lambda: handle.read(1 << 20), b''):
+                digest.update(block)
+    else:
+        position = source.tell()
+        for block in iter(lambda: source.read(1 << 20), b''):
+            digest.update(block)
+        source.seek(position)
+    return digest.hexdigest()
+
+
+class LedgerStore:
+    """Daily aggregates of every ingested ledger, persisted in ``directory``.
+
+    ``add`` parses only files it has not seen (by content hash) and merges
+    their days into the stored table; ``monthly`` re-derives months from it.
+    Updates are serialized by a lock, so a store can serve every session of a
+    Streamlit process.
+    """
+
+    def __init__(self, directory):
+        self._lock = threading.Lock()
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._daily_path = self.directory / 'daily.parquet'
+        self._manifest_path = self.directory / 'manifest.json'
+        self.manifest = json.loads(self._manifest_path.read_text()) if self._manifest_path.exists() else []
+        self.daily = self._load_daily()
+
+    def _load_daily(self):
+        if not self._daily_path.exists():
+            return _group_days(np.zeros(0, dtype=np.int32), {})
+        table = pq.read_table(self._daily_path)
+        daily = {name: table.column(name).to_numpy() for name in DAILY_COLUMNS[1:]}
+        daily['day'] = pc.cast(table.column('day'), pa.int32()).to_numpy()
+        return daily
+
+    def _save(self):
+        table = pa.table({
+            'day': pa.array(self.daily['day'], pa.int32()).cast(pa.date32()),
+            **{name: self.daily[name] for name in DAILY_COLUMNS[1:]},
+        })
+        pq.write_table(table, self._daily_path)
+        self._manifest_path.write_text(json.dumps(self.manifest, indent=2))
+
+    def add(self, source, name=None, fmt=None):
+        """Ingest one ledger file; returns False when it was already ingested."""
+        key = fingerprint(source)
+        if any(entry['sha256'] == key for entry in self.manifest):
+            return False
+        daily = aggregate_ledger(source, fmt)
+        with self._lock:
+            self._append(daily, key, name or str(getattr(source, 'name', source)))
+        return True
+
+    def _append(self, daily, key, name):
+        if any(entry['sha256'] == key for entry in self.manifest):
+            return
+        self.daily = merge_daily(self.daily, daily)
+        self.manifest.append({
+            'name': name,
+            'sha256': key,
+            'bookings': int(daily['bookings'].sum()),
+            'first_day': str(daily['day'].min().astype('datetime64[D]')) if len(daily['day']) else None,
+            'last_day': str(daily['day'].max().astype('datetime64[D]')) if len(daily['day']) else None,
+        })
+        self._save()
+
+    def monthly(self):
+        return monthly_from_daily(self.daily)
+
+    def clear(self):
+        with self._lock:
+            self.manifest = []
+            self.daily = _group_days(np.zeros(0, dtype=np.int32), {})
+            self._daily_path.unlink(missing_ok=True)
+            self._manifest_path.unlink(missing_ok=True)
+
+
+def example_ledger(start='2025-04-01', months=6, seed=0, config=DEFAULT_CONFIG, utilization=(0.2, 0.45)):
+    """Synthetic booking ledger (one row per booking) as an Arrow table."""
+    rng = np.random.default_rng(seed)
+    first = np.datetime64(start, 'D')
+    last = (np.datetime64(start, 'M') + months).astype('datetime64[D]')
+    days = np.arange(first, last)
+    days = days[days.astype('datetime64[D]').view('int64') % 7 != 6]  # closed one day a week
+    daily_capacity = config.max_capacity / config.working_days
+    per_day = rng.poisson(daily_capacity * np.linspace(*utilization, len(days)))
+    booking_days = np.repeat(days, per_day)
+    n = len(booking_days)
+    treatments = np.array(['Swedish', 'Deep Tissue', 'Aromatherapy', 'Hot Stone', 'Facial'])
+    treatment_prices = np.array([4500, 5500, 5000, 6000, 3500])
+    treatment = rng.integers(0, len(treatments), n)
+    return pa.table({
+        'date': pa.array(booking_days.astype('datetime64[s]')),
+        'bed': pa.array(rng.integers(1, config.beds + 1, n), pa.int16()),
+        'treatment': pa.DictionaryArray.from_arrays(pa.array(treatment, pa.int32()), pa.array(treatments)),
+        'price': treatment_prices[treatment] * rng.choice([0.9, 1.0, 1.0, 1.1], n),
+        'therapist': pa.DictionaryArray.from_arrays(
+            pa.array(rng.integers(0, 14, n), pa.int32()), pa.array([f"T{i + 1:02d}" for i in range(14)])
+        ),
+        'variable_cost': config.total_variable * rng.uniform(0.85, 1.2, n),
+    })
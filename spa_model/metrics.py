@@ -0,0 +1,38 @@
+"""Config-aware entry points for single scenarios and scenario grids."""
+import numpy as np
+
+from .cache import cached_metrics
+from .config import DEFAULT_CONFIG
+from .engine import METRIC_NAMES, calculate_metrics_batch
+from .records import METRICS_DTYPE
+
+ARRAY_CHUNK_ROWS = 8192  # small enough for the intermediates to stay in cache
+
+
+def calculate_metrics(customers, price, product_pct=5.0, config=DEFAULT_CONFIG):
+    """Calculate all financial metrics for one scenario (memoized per config)."""
+    return cached_metrics(config, customers, price, product_pct)
+
+
+def calculate_metrics_grid(customers, price, product_pct=5.0, config=DEFAULT_CONFIG):
+    """Calculate all metrics for arrays of scenarios as columnar arrays."""
+    return calculate_metrics_batch(customers, price, product_pct, **config.model_params())
+
+
+def calculate_metrics_array(customers, price, product_pct=5.0, config=DEFAULT_CONFIG, chunk_rows=ARRAY_CHUNK_ROWS):
+    """Calculate all metrics for arrays of scenarios as one ``METRICS_DTYPE`` array.
+
+    Scenarios are evaluated ``chunk_rows`` at a time straight into the result,
+    so the engine's intermediate arrays never exceed one chunk.
+    """
+    inputs = np.broadcast_arrays(*(np.asarray(value, dtype=np.float64) for value in (customers, price, product_pct)))
+    records = np.empty(inputs[0].shape, dtype=METRICS_DTYPE)
+    rows_out = records.reshape(-1)
+    rows_in = [values.reshape(-1) for values in inputs]
+    params = config.model_params()
+    for start in range(0, rows_out.size, chunk_rows):
+        rows = slice(start, start + chunk_rows)
+        batch = calculate_metrics_batch(*(values[rows] for values in rows_in), **params)
+        for name in METRIC_NAMES:
+            rows_out[name][rows] = batch[name]
+    return records
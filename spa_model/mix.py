@@ -0,0 +1,178 @@
+"""Treatment-mix model: per-service price, duration and product cost.
+
+The core model prices every customer at one ``price`` with a flat product
+cost %. Here a mix vector (the share of customers taking each service on the
+menu) sets the average price, the product cost % and how many bed-minutes a
+customer uses, and the bed-minutes the beds offer in a month cap how many
+customers can be served. The totals go through ``calculate_metrics_batch``,
+so every metric of the core model is available for a mix.
+
+``search_mixes`` evaluates thousands of random mixes (within each service's
+``max_share`` of demand) in one batch and marks the margin frontier: the
+mixes that earn the most contribution per customer for the bed-minutes each
+customer takes.
+"""
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+
+import numpy as np
+
+from .config import DEFAULT_CONFIG
+from .engine import calculate_metrics_batch
+
+OPENING_MINUTES = 600  # per bed per day
+TURNOVER_MINUTES = 30  # bed cleaning and reset between treatments
+MIX_CANDIDATES = 10_000
+
+
+@dataclass(frozen=True)
+class Service:
+    name: str
+    price: float
+    minutes: int  # treatment time, excluding turnover
+    product_cost: float  # ₹ of oils, masks, scrubs, ... per treatment
+    max_share: float = 1.0  # largest share of customers who would choose it
+
+
+DEFAULT_MENU = (
+    Service('Swedish Massage (60 min)', 3500, 60, 150, 0.30),
+    Service('Swedish Massage (90 min)', 4800, 90, 200, 0.30),
+    Service('Deep Tissue (60 min)', 4200, 60, 180, 0.20),
+    Service('Deep Tissue (90 min)', 5500, 90, 240, 0.20),
+    Service('Aromatherapy (90 min)', 5200, 90, 450, 0.25),
+    Service('Balinese (90 min)', 5000, 90, 250, 0.15),
+    Service('Thai Massage (90 min)', 5000, 90, 100, 0.15),
+    Service('Hot Stone (90 min)', 6000, 90, 300, 0.15),
+    Service('Signature Facial (60 min)', 3800, 60, 650, 0.20),
+    Service('Body Scrub & Wrap (75 min)', 4500, 75, 700, 0.10),
+    Service('Foot Reflexology (45 min)', 2500, 45, 80, 0.15),
+    Service('Signature Ritual (120 min)', 7500, 120, 500, 0.10),
+)
+# Current share of customers per service (same order as DEFAULT_MENU)
+DEFAULT_MIX = (0.14, 0.16, 0.07, 0.10, 0.12, 0.06, 0.05, 0.08, 0.08, 0.04, 0.06, 0.04)
+
+
+def menu_arrays(menu):
+    """``(price, minutes, product_cost, max_share)`` arrays in menu order."""
+    return tuple(
+        np.array([getattr(service, name) for service in menu], dtype=np.float64)
+        for name in ('price', 'minutes', 'product_cost', 'max_share')
+    )
+
+
+def bed_minute_capacity(config=DEFAULT_CONFIG, opening_minutes=OPENING_MINUTES):
+    """Bed-minutes available per month."""
+    return config.beds * opening_minutes * config.working_days
+
+
+def mix_metrics(mix, customers, menu=DEFAULT_MENU, config=DEFAULT_CONFIG,
+                opening_minutes=OPENING_MINUTES, turnover_minutes=TURNOVER_MINUTES):
+    """Every metric for one mix or a batch of mixes.
+
+    ``mix`` has shape ``(..., len(menu))`` and is normalized to sum to 1;
+    ``customers`` is the monthly demand, of which at most the bed-minute
+    capacity is served. On top of the engine metrics (computed for the
+    served customers at the mix's average price and product cost %) the
+    result has ``served``, ``avg_price``, ``product_pct``,
+    ``minutes_per_customer``, ``bed_minutes``, ``bed_minute_utilization``
+    and per-service arrays of shape ``(..., len(menu))``:
+    ``service_customers``, ``service_revenue``, ``service_product_cost``,
+    ``service_variable_cost``, ``service_contribution`` and
+    ``service_bed_minutes``.
+    """
+    mix = np.asarray(mix, dtype=np.float64)
+    mix = mix / mix.sum(axis=-1, keepdims=True)
+    price, minutes, product_cost, _ = menu_arrays(menu)
+    capacity = bed_minute_capacity(config, opening_minutes)
+
+    minutes_per_customer = mix @ (minutes + turnover_minutes)
+    served = np.minimum(customers, np.floor(capacity / minutes_per_customer))
+    avg_price = mix @ price
+    with np.errstate(divide='ignore', invalid='ignore'):
+        product_pct = np.where(avg_price > 0, (mix @ product_cost) / avg_price * 100, 0.0)
+    metrics = calculate_metrics_batch(served, avg_price, product_pct, **config.model_params())
+
+    service_customers = served[..., None] * mix
+    service_revenue = service_customers * price
+    service_product_cost = service_customers * product_cost
+    service_variable_cost = service_customers * config.total_variable + service_product_cost
+    bed_minutes = served * minutes_per_customer
+    return {
+        **metrics,
+        'served': served,
+        'avg_price': avg_price,
+        'product_pct': product_pct,
+        'minutes_per_customer': minutes_per_customer,
+        'bed_minutes': bed_minutes,
+        'bed_minute_utilization': bed_minutes / capacity * 100,
+        'service_customers': service_customers,
+        'service_revenue': service_revenue,
+        'service_product_cost': service_product_cost,
+        'service_variable_cost': service_variable_cost,
+        'service_contribution': service_revenue - service_variable_cost,
+        'service_bed_minutes': service_customers * (minutes + turnover_minutes),
+    }
+
+
+def cap_shares(mix, max_share, iterations=None):
+    """Scale mixes to sum to 1 with no service above its ``max_share``.
+
+    Excess share is moved to the services with room left, in proportion to
+    that room; ``max_share`` must sum to at least 1.
+    """
+    mix = np.asarray(mix, dtype=np.float64)
+    mix = mix / mix.sum(axis=-1, keepdims=True)
+    for _ in range(iterations or len(max_share)):
+        excess = np.maximum(mix - max_share, 0).sum(axis=-1, keepdims=True)
+        if not excess.any():
+            break
+        mix = np.minimum(mix, max_share)
+        room = max_share - mix
+        mix = mix + excess * room / room.sum(axis=-1, keepdims=True)
+    return mix
+
+
+def pareto_frontier(x, y):
+    """Indices of the points not beaten on both ``x`` and ``y`` (higher is better), by ascending ``x``."""
+    order = np.argsort(-x, kind='stable')
+    best = np.maximum.accumulate(y[order])
+    keep = np.r_[True, y[order][1:] > best[:-1]]
+    return order[keep][::-1]
+
+
+def search_mixes(customers, menu=DEFAULT_MENU, config=DEFAULT_CONFIG, n_candidates=MIX_CANDIDATES, seed=0,
+                 opening_minutes=OPENING_MINUTES, turnover_minutes=TURNOVER_MINUTES):
+    """Evaluate ``n_candidates`` random feasible mixes in one batch.
+
+    Candidates are drawn from flat and from corner-seeking Dirichlet
+    distributions and capped at each service's ``max_share``. Returns
+    ``(mixes, metrics, best, frontier)``: the ``(n_candidates, len(menu))``
+    mixes, their ``mix_metrics``, the index of the most profitable mix and
+    the indices on the margin frontier (no other mix earns more contribution
+    per customer in fewer bed-minutes), by ascending bed-minutes per customer.
+    """
+    _, _, _, max_share = menu_arrays(menu)
+    if max_share.sum() < 1:
+        raise ValueError("Service max_share values must add up to at least 1")
+    rng = np.random.default_rng(seed)
+    flat = rng.dirichlet(np.ones(len(menu)), n_candidates // 2)
+    corners = rng.dirichlet(np.full(len(menu), 0.2), n_candidates - len(flat))
+    mixes = cap_shares(np.vstack([flat, corners]), max_share)
+
+    metrics = mix_metrics(mixes, customers, menu, config, opening_minutes, turnover_minutes)
+    best = int(np.argmax(metrics['net_profit']))
+    frontier = pareto_frontier(-metrics['minutes_per_customer'], metrics['contribution_margin'])[::-1]
+    return mixes, metrics, best, frontier
+
+
+@lru_cache(maxsize=64)
+def cached_mix_search(customers, menu=DEFAULT_MENU, config=DEFAULT_CONFIG, n_candidates=MIX_CANDIDATES, seed=0,
+                      opening_minutes=OPENING_MINUTES, turnover_minutes=TURNOVER_MINUTES):
+    """``search_mixes`` memoized; the returned arrays are read-only."""
+    mixes, metrics, best, frontier = search_mixes(
+        customers, menu, config, n_candidates, seed, opening_minutes, turnover_minutes
+    )
+    for values in (mixes, frontier, *metrics.values()):
+        values.flags.writeable = False
+    return mixes, MappingProxyType(metrics), best, frontier
@@ -0,0 +1,235 @@
+"""Monte Carlo risk engine for monthly profit and CAPEX payback.
+
+Demand, price, product cost and every fixed/variable cost line are drawn from
+simple distributions and pushed through ``calculate_metrics_batch`` in
+fixed-size chunks. Each chunk gets its own child of one ``SeedSequence``, so a
+given seed produces the same result whether chunks run in-process or on a
+process pool.
+
+The random numbers themselves are standard normal or uniform draws, one row
+per input, which each distribution rescales to its parameters. They depend
+only on the seed, the sample count and which kind of draw each input needs,
+so ``standard_draws`` caches them and moving a slider only rescales them and
+re-evaluates the model.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+
+from .engine import calculate_metrics_batch
+
+PROFIT_PERCENTILES = (5, 25, 50, 75, 95)
+HISTOGRAM_BINS = 60
+DEFAULT_CHUNK_SIZE = 250_000
+DRAWS_CACHE_SIZE = 2  # float32 draws: 4 bytes x inputs x samples each
+
+
+@dataclass(frozen=True)
+class Fixed:
+    # Takes a normal row like Normal, so setting a spread to zero keeps the cached draws
+    kind = 'normal'
+    value: float
+
+    def from_standard(self, draws):
+        return np.full(draws.shape, float(self.value))
+
+
+@dataclass(frozen=True)
+class Normal:
+    """Normal distribution truncated at zero (costs and demand can't go negative)."""
+    kind = 'normal'
+    mean: float
+    sd: float
+
+    def from_standard(self, draws):
+        return np.maximum(self.mean + self.sd * draws.astype(np.float64), 0.0)
+
+
+@dataclass(frozen=True)
+class Uniform:
+    kind = 'uniform'
+    low: float
+    high: float
+
+    def from_standard(self, draws):
+        return self.low + (self.high - self.low) * draws.astype(np.float64)
+
+
+@dataclass(frozen=True)
+class Triangular:
+    kind = 'uniform'
+    low: float
+    mode: float
+    high: float
+
+    def from_standard(self, draws):
+        """Inverse CDF of the triangular distribution."""
+        u = draws.astype(np.float64)
+        span = self.high - self.low
+        split = (self.mode - self.low) / span if span else 0.0
+        return np.where(
+            u < split,
+            self.low + np.sqrt(u * span * (self.mode - self.low)),
+            self.high - np.sqrt((1 - u) * span * (self.high - self.mode)),
+        )
+
+
+@dataclass(frozen=True)
+class RiskInputs:
+    """Distributions for every uncertain model input.
+
+    ``fixed_costs`` and ``variable_per_customer`` are tuples of
+    ``(name, distribution)`` pairs mirroring the cost config line items.
+    """
+    customers: object
+    price: object
+    product_pct: object
+    fixed_costs: tuple
+    variable_per_customer: tuple
+
+    @classmethod
+    def around(cls, config, customers, price, product_pct,
+               demand_cv=0.15, price_cv=0.05, product_cv=0.20, cost_cv=0.10):
+        """Normal distributions centred on a scenario, with relative spreads."""
+        def normal(value, cv):
+            return Normal(value, abs(value) * cv) if cv > 0 else Fixed(value)
+
+        return cls(
+            customers=normal(customers, demand_cv),
+            price=normal(price, price_cv),
+            product_pct=normal(product_pct, product_cv),
+            fixed_costs=tuple((name, normal(amount, cost_cv)) for name, amount in config.fixed_costs),
+            variable_per_customer=tuple(
+                (name, normal(amount, cost_cv)) for name, amount in config.variable_per_customer
+            ),
+        )
+
+    def distributions(self):
+        """Every distribution, in the order of the rows of ``standard_draws``."""
+        return (
+            (self.customers, self.price, self.product_pct)
+            + tuple(dist for _, dist in self.fixed_costs)
+            + tuple(dist for _, dist in self.variable_per_customer)
+        )
+
+    @property
+    def kinds(self):
+        return tuple(dist.kind for dist in self.distributions())
+
+
+@dataclass(frozen=True)
+class RiskResult:
+    n_samples: int
+    seed: int
+    mean_profit: float
+    profit_percentiles: tuple  # ((percentile, value), ...)
+    prob_loss: float
+    payback_percentiles: tuple  # months; inf where the percentile never pays back
+    prob_no_payback: float
+    profit_histogram: tuple  # (counts, bin_edges)
+    payback_histogram: tuple  # (counts, bin_edges) over paying-back samples only
+
+
+def _draw_chunk(kinds, size, seed_seq):
+    """Standard draws of one chunk, shaped ``(len(kinds), size)``."""
+    rng = np.random.default_rng(seed_seq)
+    draws = np.empty((len(kinds), size), dtype=np.float32)
+    for row, kind in zip(draws, kinds):
+        if kind == 'normal':
+            rng.standard_normal(size, dtype=np.float32, out=row)
+        else:
+            rng.random(size, dtype=np.float32, out=row)
+    return draws
+
+
+def _chunks(n_samples, seed, chunk_size):
+    n_chunks = -(-n_samples // chunk_size)
+    sizes = [chunk_size] * (n_chunks - 1) + [n_samples - chunk_size * (n_chunks - 1)]
+    return list(zip(sizes, np.random.SeedSequence(seed).spawn(n_chunks)))
+
+
+@lru_cache(maxsize=DRAWS_CACHE_SIZE)
+def standard_draws(kinds, n_samples, seed=0, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Read-only standard draws for every chunk, memoized per (kinds, samples, seed)."""
+    chunks = []
+    for size, seed_seq in _chunks(n_samples, seed, chunk_size):
+        draws = _draw_chunk(kinds, size, seed_seq)
+        draws.flags.writeable = False
+        chunks.append(draws)
+    return tuple(chunks)
+
+
+def _simulate_chunk(config, inputs, draws):
+    """Rescale one chunk of standard draws and return (net_profit, capex_payback_months)."""
+    samples = [dist.from_standard(row) for dist, row in zip(inputs.distributions(), draws)]
+    customers, price, product_pct = samples[:3]
+    n_fixed = len(inputs.fixed_costs)
+    total_fixed = sum(samples[3:3 + n_fixed])
+    total_variable = sum(samples[3 + n_fixed:])
+
+    params = config.model_params()
+    params.update(total_fixed=total_fixed, total_variable=total_variable)
+    metrics = calculate_metrics_batch(np.clip(customers, 0, config.max_capacity), price, product_pct, **params)
+    return metrics['net_profit'], metrics['capex_payback_months']
+
+
+def _simulate_chunk_args(args):
+    config, inputs, size, seed_seq = args
+    return _simulate_chunk(config, inputs, _draw_chunk(inputs.kinds, size, seed_seq))
+
+
+def simulate_risk(config, inputs, n_samples=1_000_000, seed=0,
+                  chunk_size=DEFAULT_CHUNK_SIZE, workers=None):
+    """Run the simulation and summarise the profit and payback distributions.
+
+    In-process runs reuse the cached ``standard_draws``. ``workers`` > 1
+    spreads chunks across a process pool, each worker drawing its own chunks
+    rather than receiving them; the result is identical to the in-process run
+    for the same ``seed``.
+    """
+    if workers and workers > 1 and n_samples > chunk_size:
+        jobs = [(config, inputs, size, seed_seq) for size, seed_seq in _chunks(n_samples, seed, chunk_size)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunks = list(pool.map(_simulate_chunk_args, jobs))
+    else:
+        chunks = [_simulate_chunk(config, inputs, draws)
+                  for draws in standard_draws(inputs.kinds, n_samples, seed, chunk_size)]
+
+    net_profit = np.concatenate([profit for profit, _ in chunks])
+    payback = np.concatenate([months for _, months in chunks])
+    pays_back = np.isfinite(payback)
+
+    profit_values = np.percentile(net_profit, PROFIT_PERCENTILES)
+    # No interpolation: a percentile that falls among non-paying samples is inf, not nan
+    payback_values = np.percentile(payback, PROFIT_PERCENTILES, method='inverted_cdf')
+    profit_counts, profit_edges = np.histogram(net_profit, bins=HISTOGRAM_BINS)
+    if pays_back.any():
+        payback_counts, payback_edges = np.histogram(
+            payback[pays_back], bins=HISTOGRAM_BINS,
+            range=(0, np.percentile(payback[pays_back], 99)),
+        )
+    else:
+        payback_counts, payback_edges = np.zeros(0, dtype=np.int64), np.zeros(0)
+
+    return RiskResult(
+        n_samples=n_samples,
+        seed=seed,
+        mean_profit=float(net_profit.mean()),
+        profit_percentiles=tuple(zip(PROFIT_PERCENTILES, map(float, profit_values))),
+        prob_loss=float((net_profit < 0).mean()),
+        payback_percentiles=tuple(zip(PROFIT_PERCENTILES, map(float, payback_values))),
+        prob_no_payback=float((~pays_back).mean()),
+        profit_histogram=(tuple(profit_counts.tolist()), tuple(profit_edges.tolist())),
+        payback_histogram=(tuple(payback_counts.tolist()), tuple(payback_edges.tolist())),
+    )
+
+
+@lru_cache(maxsize=32)
+def cached_risk(config, inputs, n_samples=1_000_000, seed=0, workers=None):
+    """``simulate_risk`` memoized per (config, inputs, samples, seed).
+
+    A miss with new inputs still reuses the cached ``standard_draws``.
+    """
+    return simulate_risk(config, inputs, n_samples=n_samples, seed=seed, workers=workers)
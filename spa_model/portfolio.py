@@ -0,0 +1,185 @@
+"""Multi-branch portfolio evaluated in one vectorized pass.
+
+Branch parameters are a columnar table: a dict of equal-length arrays, one
+row per branch. Any column the cost config accepts as an override (``beds``,
+``working_days``, ``interior_capex``, ``total_fixed`` or a line item such as
+``Rent (displacement)``) varies per branch; missing columns take the base
+config's value. Capacity follows each branch's beds and working days unless
+``max_capacity`` is given.
+
+Metrics are computed once when the portfolio is built. Roll-ups group the
+stored arrays with ``np.bincount`` and drill-downs index into them, so neither
+re-runs the model; ``with_changes`` re-evaluates only the edited branches.
+"""
+import numpy as np
+
+from .config import DEFAULT_CONFIG, TREATMENTS_PER_BED_PER_DAY
+from .engine import calculate_metrics_batch
+
+NUMERIC_COLUMNS = ('customers', 'price', 'product_pct', 'treatments_per_bed_per_day')
+# Summed across branches in roll-ups
+ROLLUP_SUMS = (
+    'customers', 'max_capacity', 'interior_capex', 'revenue', 'fixed_costs',
+    'variable_costs', 'total_expenses', 'net_profit', 'annual_profit',
+)
+
+
+class Portfolio:
+    """Branch table plus the metrics of every branch.
+
+    ``columns`` needs ``branch``, ``customers`` and ``price``; ``city``,
+    ``region``, ``product_pct`` (default 5.0), ``treatments_per_bed_per_day``
+    and the cost overrides described in the module docstring are optional.
+    Any other column is kept as a label.
+    """
+
+    def __init__(self, columns, base_config=DEFAULT_CONFIG):
+        missing = {'branch', 'customers', 'price'} - set(columns)
+        if missing:
+            raise ValueError(f"Portfolio is missing required columns: {sorted(missing)}")
+        self.base_config = base_config
+        self.columns = self._normalize(columns)
+        self.metrics = self._evaluate(self.columns)
+
+    @classmethod
+    def from_records(cls, records, base_config=DEFAULT_CONFIG):
+        """Build from an iterable of per-branch dicts."""
+        records = list(records)
+        names = dict.fromkeys(name for record in records for name in record)
+        return cls({name: [record.get(name) for record in records] for name in names}, base_config)
+
+    def __len__(self):
+        return len(self.columns['branch'])
+
+    def _normalize(self, columns):
+        n = len(columns['branch'])
+        config = self.base_config
+        numeric = config.override_names() | set(NUMERIC_COLUMNS)
+        table = {}
+        for name, values in columns.items():
+            dtype = np.float64 if name in numeric else object
+            table[name] = np.asarray(values, dtype=dtype)
+            if table[name].shape != (n,):
+                raise ValueError(f"Column {name!r} has {table[name].shape[0]} rows, expected {n}")
+        for name in ('city', 'region'):
+            table.setdefault(name, np.full(n, '', dtype=object))
+        table.setdefault('product_pct', np.full(n, 5.0))
+
+        if 'max_capacity' not in table:
+            beds = table.get('beds', config.beds)
+            per_bed = table.get('treatments_per_bed_per_day', TREATMENTS_PER_BED_PER_DAY)
+            working_days = table.get('working_days', config.working_days)
+            table['max_capacity'] = np.broadcast_to(beds * per_bed * working_days, (n,)).astype(np.float64)
+        for name in ('beds', 'working_days', 'interior_capex'):
+            table.setdefault(name, np.full(n, float(getattr(config, name))))
+
+        for values in table.values():
+            values.flags.writeable = False
+        return table
+
+    def _evaluate(self, table, rows=slice(None)):
+        overrides = self.base_config.override_names()
+        params = self.base_config.model_params({
+            name: values[rows] for name, values in table.items() if name in overrides
+        })
+        return calculate_metrics_batch(table['customers'][rows], table['price'][rows], table['product_pct'][rows], **params)
+
+    def rollup(self, by='city'):
+        """Consolidated P&L per group (``city``, ``region`` or None for the whole portfolio).
+
+        Returns a dict of arrays, one entry per group: the group key, branch
+        and loss-making counts, summed volumes and P&L lines, and the
+        consolidated margin, utilization, break-even customers and CAPEX
+        payback (which weigh branches by size, not equally).
+        """
+        if by is None:
+            keys, group = np.array(['All branches'], dtype=object), np.zeros(len(self), dtype=np.intp)
+        else:
+            keys, group = np.unique(self.columns[by].astype(str), return_inverse=True)
+
+        def total(values):
+            return np.bincount(group, weights=values, minlength=len(keys))
+
+        sums = {name: total(self.columns[name] if name in self.columns else self.metrics[name]) for name in ROLLUP_SUMS}
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # Break-even volume at the group's average contribution per customer
+            contribution = sums['revenue'] - sums['variable_costs']
+            contribution_per_customer = contribution / sums['customers']
+            rollup = {
+                by or 'portfolio': keys,
+                'branches': np.bincount(group, minlength=len(keys)),
+                'loss_making': np.bincount(group[self.metrics['net_profit'] < 0], minlength=len(keys)),
+                **sums,
+                'margin': np.where(sums['revenue'] > 0, sums['net_profit'] / sums['revenue'] * 100, 0.0),
+                'utilization': sums['customers'] / sums['max_capacity'] * 100,
+                'break_even_customers': np.where(contribution > 0, sums['fixed_costs'] / contribution_per_customer, np.inf),
+                'capex_payback_months': np.where(sums['net_profit'] > 0, sums['interior_capex'] / sums['net_profit'], np.inf),
+            }
+        return rollup
+
+    def branches(self, by=None, value=None, mask=None):
+        """Inputs and metrics of the branches where ``columns[by] == value`` (or ``mask``).
+
+        Slices the stored arrays; nothing is recomputed.
+        """
+        if mask is None:
+            mask = np.ones(len(self), dtype=bool) if by is None else self.columns[by] == value
+        return {
+            **{name: values[mask] for name, values in self.columns.items()},
+            **{name: values[mask] for name, values in self.metrics.items()},
+        }
+
+    def with_changes(self, index, **changes):
+        """Copy with some branches' inputs edited; only those rows are re-evaluated.
+
+        ``index`` selects rows (an int, a list of ints or a boolean mask);
+        ``changes`` maps column names to new values for them.
+        """
+        columns = {name: values.copy() for name, values in self.columns.items()}
+        for name, value in changes.items():
+            if name not in columns:
+                raise KeyError(f"Unknown portfolio column: {name!r}")
+            columns[name][index] = value
+        if not {'beds', 'treatments_per_bed_per_day', 'working_days'}.isdisjoint(changes) and 'max_capacity' not in changes:
+            per_bed = columns.get('treatments_per_bed_per_day', TREATMENTS_PER_BED_PER_DAY)
+            capacity = columns['beds'] * per_bed * columns['working_days']
+            columns['max_capacity'][index] = np.broadcast_to(capacity, columns['max_capacity'].shape)[index]
+
+        for values in columns.values():
+            values.flags.writeable = False
+
+        rows = np.arange(len(self))[index]
+        metrics = {name: values.copy() for name, values in self.metrics.items()}
+        for name, values in self._evaluate(columns, rows).items():
+            metrics[name][rows] = values
+
+        portfolio = object.__new__(type(self))
+        portfolio.base_config, portfolio.columns, portfolio.metrics = self.base_config, columns, metrics
+        return portfolio
+
+
+def example_portfolio(n_branches=500, seed=0, base_config=DEFAULT_CONFIG):
+    """Synthetic portfolio of ``n_branches`` branches across a few cities."""
+    rng = np.random.default_rng(seed)
+    cities = {
+        'Mumbai': 'West', 'Pune': 'West', 'Ahmedabad': 'West', 'Delhi': 'North', 'Jaipur': 'North',
+        'Bengaluru': 'South', 'Chennai': 'South', 'Hyderabad': 'South', 'Kolkata': 'East',
+    }
+    city = rng.choice(list(cities), n_branches)
+    beds = rng.integers(6, 21, n_branches)
+    working_days = rng.choice([24, 26, 28], n_branches)
+    capacity = beds * TREATMENTS_PER_BED_PER_DAY * working_days
+    fixed = base_config.fixed_dict()
+    return Portfolio({
+        'branch': [f"{c} #{i + 1}" for i, c in enumerate(city)],
+        'city': city,
+        'region': [cities[c] for c in city],
+        'beds': beds,
+        'working_days': working_days,
+        'customers': np.round(capacity * rng.uniform(0.1, 0.5, n_branches)),
+        'price': rng.integers(60, 121, n_branches) * 50,
+        'product_pct': rng.choice([3.0, 4.0, 5.0, 6.0], n_branches),
+        'Rent (displacement)': np.round(fixed['Rent (displacement)'] * rng.uniform(0.5, 1.8, n_branches), -3),
+        'Salary (14 staff)': np.round(fixed['Salary (14 staff)'] * beds / base_config.beds, -3),
+        'interior_capex': np.round(base_config.interior_capex * beds / base_config.beds, -5),
+    }, base_config)
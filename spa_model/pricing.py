@@ -0,0 +1,181 @@
+"""Price optimization when demand responds to price.
+
+The price-sensitivity chart holds the customer count fixed while the price
+moves. Here a demand curve sets the customers at each price, anchored at a
+reference (price, customers) point with an elasticity there:
+
+* ``ConstantElasticity``: customers scale with ``(price / ref_price) ** elasticity``;
+* ``LinearDemand``: a straight line with the given elasticity at the reference;
+* ``fit_demand`` fits either shape to observed (price, customers) pairs, e.g.
+  the monthly averages of an ingested booking ledger.
+
+``optimize_price`` evaluates the model over a dense price grid for the
+central elasticity and for draws from its uncertainty in one batch, and
+reports the profit-maximizing price, the price ranges that break even and
+reach a target margin, and percentile bands across the draws.
+"""
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+import numpy as np
+
+from .config import DEFAULT_CONFIG
+from .engine import calculate_metrics_batch
+
+PRICE_RANGE = (2000, 10000)
+PRICE_STEP = 10
+ELASTICITY_DRAWS = 100
+PRICE_BAND = (5, 95)  # percentiles across elasticity draws
+
+
+@dataclass(frozen=True)
+class ConstantElasticity:
+    ref_price: float
+    ref_customers: float
+    elasticity: float = -1.5
+    elasticity_sd: float = 0.0  # uncertainty in the elasticity, for the bands
+
+    def customers(self, prices, elasticity=None):
+        elasticity = self.elasticity if elasticity is None else elasticity
+        return self.ref_customers * (np.asarray(prices) / self.ref_price) ** elasticity
+
+
+@dataclass(frozen=True)
+class LinearDemand:
+    ref_price: float
+    ref_customers: float
+    elasticity: float = -1.5
+    elasticity_sd: float = 0.0
+
+    def customers(self, prices, elasticity=None):
+        elasticity = self.elasticity if elasticity is None else elasticity
+        relative = np.asarray(prices) / self.ref_price - 1
+        return np.maximum(self.ref_customers * (1 + elasticity * relative), 0.0)
+
+
+DEMAND_CURVES = {'constant': ConstantElasticity, 'linear': LinearDemand}
+
+
+def fit_demand(prices, customers, kind='constant'):
+    """Fit a demand curve to observed (price, customers) pairs by least squares.
+
+    ``constant`` regresses log customers on log price, ``linear`` customers on
+    price. The reference point is the mean observed price and the elasticity
+    there carries its standard error as ``elasticity_sd``. Needs at least
+    three observations with different prices.
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    customers = np.asarray(customers, dtype=np.float64)
+    keep = (prices > 0) & (customers > 0)
+    prices, customers = prices[keep], customers[keep]
+    if len(prices) < 3 or np.ptp(prices) == 0:
+        raise ValueError("Fitting demand needs at least three observations at different prices")
+
+    if kind == 'constant':
+        x, y = np.log(prices), np.log(customers)
+    elif kind == 'linear':
+        x, y = prices, customers
+    else:
+        raise ValueError(f"Unknown demand curve {kind!r}; choose from {sorted(DEMAND_CURVES)}")
+    x_mean = x.mean()
+    slope = ((x - x_mean) * (y - y.mean())).sum() / ((x - x_mean) ** 2).sum()
+    intercept = y.mean() - slope * x_mean
+    residual_var = ((y - intercept - slope * x) ** 2).sum() / (len(x) - 2)
+    slope_se = np.sqrt(residual_var / ((x - x_mean) ** 2).sum())
+
+    ref_price = float(prices.mean())
+    if kind == 'constant':
+        ref_customers = float(np.exp(intercept + slope * np.log(ref_price)))
+        elasticity, elasticity_sd = slope, slope_se
+    else:
+        ref_customers = float(intercept + slope * ref_price)
+        elasticity, elasticity_sd = slope * ref_price / ref_customers, slope_se * ref_price / ref_customers
+    return DEMAND_CURVES[kind](ref_price, ref_customers, float(elasticity), float(elasticity_sd))
+
+
+def break_even_price(customers, config=DEFAULT_CONFIG, product_pct=5.0):
+    """Price at which ``customers`` a month exactly cover fixed and variable costs."""
+    customers = np.asarray(customers, dtype=np.float64)
+    return (config.total_fixed + config.total_variable * customers) / (customers * (1 - product_pct / 100))
+
+
+@dataclass(frozen=True, eq=False)
+class PriceOptimum:
+    """Best price on a demand curve; ranges are nan when never reached.
+
+    The grid arrays (read-only) hold the central curve's customers, profit and
+    margin, and the profit band across elasticity draws, at every price.
+    """
+    optimal_price: float
+    customers: float
+    utilization: float
+    net_profit: float
+    margin: float
+    break_even_range: tuple  # (lowest, highest) price that breaks even on this curve
+    target_margin: float
+    target_margin_range: tuple  # (lowest, highest) price reaching target_margin
+    price_band: tuple  # (low, high) optimal price across elasticity draws
+    profit_band: tuple  # (low, high) best profit across elasticity draws
+    prices: np.ndarray = field(repr=False)
+    grid_customers: np.ndarray = field(repr=False)
+    grid_profit: np.ndarray = field(repr=False)
+    grid_margin: np.ndarray = field(repr=False)
+    grid_profit_band: np.ndarray = field(repr=False)  # shape (2, len(prices))
+
+
+def _price_range(prices, reached):
+    if not reached.any():
+        return (float('nan'), float('nan'))
+    return (float(prices[reached].min()), float(prices[reached].max()))
+
+
+def optimize_price(curve, config=DEFAULT_CONFIG, product_pct=5.0, target_margin=20.0,
+                   price_range=PRICE_RANGE, price_step=PRICE_STEP, n_draws=ELASTICITY_DRAWS, seed=0):
+    """Profit-maximizing and target-margin prices for ``curve``.
+
+    Customers are capped at ``config.max_capacity``. Row 0 of the batch is
+    the central elasticity; with ``curve.elasticity_sd`` > 0 another
+    ``n_draws`` rows sample it from a normal distribution for the bands.
+    """
+    prices = np.arange(price_range[0], price_range[1] + price_step, price_step, dtype=np.float64)
+    elasticities = np.array([curve.elasticity])
+    if curve.elasticity_sd > 0 and n_draws:
+        draws = np.random.default_rng(seed).normal(curve.elasticity, curve.elasticity_sd, n_draws)
+        elasticities = np.concatenate([elasticities, draws])
+
+    customers = np.minimum(curve.customers(prices, elasticities[:, None]), config.max_capacity)
+    metrics = calculate_metrics_batch(customers, prices, product_pct, **config.model_params())
+    profit, margin = metrics['net_profit'], metrics['margin']
+
+    best = int(np.argmax(profit[0]))
+    draws = profit[1:] if len(elasticities) > 1 else profit
+    band_prices = prices[np.argmax(draws, axis=1)]
+    grid = {
+        'prices': prices,
+        'grid_customers': customers[0],
+        'grid_profit': profit[0],
+        'grid_margin': margin[0],
+        'grid_profit_band': np.percentile(draws, PRICE_BAND, axis=0),
+    }
+    for values in grid.values():
+        values.flags.writeable = False
+
+    return PriceOptimum(
+        optimal_price=float(prices[best]),
+        customers=float(customers[0, best]),
+        utilization=float(metrics['utilization'][0, best]),
+        net_profit=float(profit[0, best]),
+        margin=float(margin[0, best]),
+        break_even_range=_price_range(prices, profit[0] >= 0),
+        target_margin=target_margin,
+        target_margin_range=_price_range(prices, margin[0] >= target_margin),
+        price_band=tuple(map(float, np.percentile(band_prices, PRICE_BAND))),
+        profit_band=tuple(map(float, np.percentile(draws.max(axis=1), PRICE_BAND))),
+        **grid,
+    )
+
+
+@lru_cache(maxsize=256)
+def cached_price_optimum(curve, config=DEFAULT_CONFIG, product_pct=5.0, target_margin=20.0):
+    """``optimize_price`` memoized per (curve, config, product %, target margin)."""
+    return optimize_price(curve, config, product_pct, target_margin)
@@ -0,0 +1,78 @@
+"""Compact containers for metric results.
+
+``MetricsRecord`` holds one scenario's metrics in ``__slots__``: no
+per-instance dict, attribute access (``record.net_profit``) and, being a
+read-only ``Mapping``, the same ``record['net_profit']`` access as the
+metrics dicts it replaces.
+
+For batches, ``METRICS_DTYPE`` packs every metric of a scenario into one
+193-byte row of a NumPy structured array. ``array['net_profit']`` and
+``array[i:j]['net_profit']`` are views into the same buffer, so chart series
+are sliced out without copying and a row is read without building a dict.
+"""
+from collections.abc import Mapping
+
+import numpy as np
+
+from .engine import METRIC_NAMES
+
+METRICS_DTYPE = np.dtype([
+    (name, np.bool_ if name == 'break_even' else np.float64) for name in METRIC_NAMES
+])
+
+
+class MetricsRecord(Mapping):
+    """One scenario's metrics: floats, and a bool for ``break_even``."""
+    __slots__ = METRIC_NAMES
+
+    def __init__(self, **values):
+        for name, set_slot in _SLOT_SETTERS:
+            set_slot(self, values[name])
+
+    @classmethod
+    def from_dict(cls, metrics):
+        """The record of a ``{name: value}`` dict, e.g. from ``calculate_metrics_scalar``."""
+        record = object.__new__(cls)
+        for name, set_slot in _SLOT_SETTERS:
+            set_slot(record, metrics[name])
+        return record
+
+    @classmethod
+    def from_batch(cls, batch, index=()):
+        """The record at ``index`` of a metrics dict of arrays or a ``METRICS_DTYPE`` array.
+
+        The default ``index`` reads a single-scenario (0-d) batch.
+        """
+        return cls(**{
+            name: bool(batch[name][index]) if name == 'break_even' else float(batch[name][index])
+            for name in METRIC_NAMES
+        })
+
+    def __setattr__(self, name, value):
+        raise AttributeError("MetricsRecord is read-only")
+
+    def __getitem__(self, name):
+        if name not in METRIC_NAMES:
+            raise KeyError(name)
+        return getattr(self, name)
+
+    def __iter__(self):
+        return iter(METRIC_NAMES)
+
+    def __len__(self):
+        return len(METRIC_NAMES)
+
+    def __repr__(self):
+        return f"MetricsRecord(revenue={self.revenue:,.0f}, net_profit={self.net_profit:,.0f}, margin={self.margin:.1f})"
+
+
+# Slot descriptors' setters, bypassing the read-only ``__setattr__`` at C speed
+_SLOT_SETTERS = tuple((name, getattr(MetricsRecord, name).__set__) for name in METRIC_NAMES)
+
+
+def metrics_array(batch):
+    """Pack a ``calculate_metrics_batch`` result into one ``METRICS_DTYPE`` array of its shape."""
+    records = np.empty(np.shape(batch['revenue']), dtype=METRICS_DTYPE)
+    for name in METRIC_NAMES:
+        records[name] = batch[name]
+    return records
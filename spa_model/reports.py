@@ -0,0 +1,169 @@
+"""Tabular reports built from the model, independent of any UI.
+
+The KPI cards and recommendations are plain data (labels, formatted values,
+a status level), so the dashboard and the static report render the same
+content.
+"""
+from .config import DEFAULT_CONFIG
+from .metrics import calculate_metrics
+from .pricing import break_even_price
+
+BREAKDOWN_COLUMNS = ('Item', 'Amount (₹)', 'Per Customer (₹)', '% of Revenue')
+
+
+def financial_breakdown(customers, price, product_pct=5.0, config=DEFAULT_CONFIG):
+    """Line-item cost and revenue breakdown as ``{column: [values]}``.
+
+    Section header rows (FIXED COSTS, VARIABLE COSTS, CAPEX ANALYSIS) carry
+    ``None`` in the numeric columns.
+    """
+    breakdown_data = {column: [] for column in BREAKDOWN_COLUMNS}
+
+    def add(item, amount=None, per_customer=None, pct_of_revenue=None):
+        for column, value in zip(BREAKDOWN_COLUMNS, (item, amount, per_customer, pct_of_revenue)):
+            breakdown_data[column].append(value)
+
+    metrics = calculate_metrics(customers, price, product_pct, config)
+    revenue = metrics['revenue']
+
+    add('REVENUE', revenue, price, 100.0)
+
+    add('FIXED COSTS')
+    for item, amount in config.fixed_costs:
+        add(f"  {item}", amount, round(amount/customers), round(amount/revenue*100, 1))
+
+    add('VARIABLE COSTS')
+    for item, amount in config.variable_per_customer:
+        total_amount = amount * customers
+        add(f"  {item}", total_amount, amount, round(total_amount/revenue*100, 1))
+
+    product_total = revenue * (product_pct/100)
+    add(f"  Product ({product_pct}%)", round(product_total), round(product_total/customers), product_pct)
+
+    add('TOTAL EXPENSES', round(metrics['total_expenses']), round(metrics['total_expenses']/customers),
+        round(metrics['total_expenses']/revenue*100, 1))
+    add('NET PROFIT', round(metrics['net_profit']), round(metrics['net_profit']/customers),
+        round(metrics['margin'], 1))
+
+    add('CAPEX ANALYSIS')
+    capex = config.interior_capex
+    add('  Interior Investment', capex, round(capex/customers), round(capex/revenue*100, 1))
+    add('  Annual Profit', round(metrics['annual_profit']), round(metrics['annual_profit']/customers/12),
+        round(metrics['annual_profit']/(revenue*12)*100, 1))
+
+    payback_text = f"{metrics['capex_payback_years']:.1f} years" if metrics['capex_payback_years'] != float('inf') else "No payback"
+    add(f"  Payback Period: {payback_text}", pct_of_revenue=round(metrics['capex_roi_annual'], 1))
+
+    return breakdown_data
+
+
+def kpi_cards(customers, price, product_pct=5.0, config=DEFAULT_CONFIG, metrics=None):
+    """The scenario's KPI cards as ``[(heading, [card, ...]), ...]``.
+
+    The first section has no heading. Each card is a dict with ``label``,
+    ``value`` and ``delta`` text and a ``delta_color`` of ``'normal'`` or
+    ``'inverse'``, as taken by ``st.metric``. Pass ``metrics`` when the
+    scenario's KPIs are already at hand (e.g. from a ``KPIGraph``).
+    """
+    if metrics is None:
+        metrics = calculate_metrics(customers, price, product_pct, config)
+
+    def card(label, value, delta, delta_color='normal'):
+        return {'label': label, 'value': value, 'delta': delta, 'delta_color': delta_color}
+
+    be_customers = metrics['break_even_customers']
+    payback_years, payback_months = metrics['capex_payback_years'], metrics['capex_payback_months']
+    return [
+        (None, [
+            card("Utilization Rate", f"{metrics['utilization']:.1f}%", f"{customers} customers"),
+            card("Daily Average", f"{metrics['daily_avg']:.0f} customers", f"{metrics['daily_avg']/config.beds:.1f} per bed"),
+            card("Monthly Revenue", f"₹{metrics['revenue']:,.0f}", f"₹{price} per treatment"),
+            card("Net Profit", f"₹{metrics['net_profit']:,.0f}", f"{metrics['margin']:.1f}% margin",
+                 'normal' if metrics['net_profit'] >= 0 else 'inverse'),
+        ]),
+        ("📊 Enhanced Business Metrics", [
+            card("Revenue per Bed", f"₹{metrics['revenue_per_bed']:,.0f}", "Monthly per bed"),
+            card("Profit per Customer", f"₹{metrics['profit_per_customer']:,.0f}", "Per treatment"),
+            card("Monthly ROI", f"{metrics['roi_monthly']:.1f}%", f"{metrics['roi_annual']:.1f}% annual",
+                 'normal' if metrics['roi_monthly'] > 0 else 'inverse'),
+            card("Contribution Margin", f"₹{metrics['contribution_margin']:.0f}",
+                 f"{metrics['contribution_margin_ratio']:.1f}% ratio"),
+        ]),
+        ("⚖️ Break-even Analysis", [
+            card("Break-even Customers", f"{be_customers:.0f}",
+                 f"Need {max(0, be_customers - customers):.0f} more" if customers < be_customers else "✅ Achieved",
+                 'normal' if customers >= be_customers else 'inverse'),
+            card("Break-even Utilization", f"{metrics['break_even_utilization']:.1f}%", "Minimum required"),
+            card("Fixed Cost Ratio", f"{metrics['fixed_cost_ratio']:.1f}%", "Of total revenue"),
+            card("Variable Cost Ratio", f"{metrics['variable_cost_ratio']:.1f}%", "Of total revenue"),
+        ]),
+        ("🏗️ CAPEX Payback Analysis", [
+            card("Interior Investment", f"₹{config.interior_capex/10000000:.1f} Cr", "One-time setup cost"),
+            card("Payback Period",
+                 f"{payback_years:.1f} years" if payback_years != float('inf') else "No payback",
+                 f"{payback_months:.0f} months" if payback_months != float('inf') else "Loss making",
+                 'normal' if payback_years <= 5 else 'inverse'),
+            card("CAPEX ROI (Annual)", f"{metrics['capex_roi_annual']:.1f}%", "Return on investment",
+                 'normal' if metrics['capex_roi_annual'] > 20 else 'inverse'),
+            card("Annual Profit", f"₹{metrics['annual_profit']:,.0f}", f"₹{metrics['annual_profit']/10000000:.2f} Cr/year"),
+        ]),
+    ]
+
+
+def recommendations(customers, price, product_pct=5.0, config=DEFAULT_CONFIG, recommended_prices=None):
+    """Targets and guidance for a scenario, one dict per topic.
+
+    Each has a ``title``, a status ``level`` (``'error'``, ``'warning'``,
+    ``'info'`` or ``'success'``) with its ``message``, and ``points``: a list
+    of ``(label, text)`` pairs. ``recommended_prices`` is the ``(low, high)``
+    price band to recommend, e.g. ``PriceOptimum.price_band``.
+    """
+    utilization = customers / config.max_capacity * 100
+    if utilization < 20:
+        utilization_status = ('error', "⚠️ Utilization too low! Target minimum 20%")
+    elif utilization < 30:
+        utilization_status = ('warning', "📊 Good start! Aim for 30-40%")
+    else:
+        utilization_status = ('success', "✅ Excellent utilization!")
+
+    if price < 4000:
+        price_status = ('warning', "⚠️ Consider raising prices")
+    elif price < 5000:
+        price_status = ('info', "📈 Good pricing, room to grow")
+    else:
+        price_status = ('success', "✅ Premium pricing achieved")
+    price_points = [
+        ("Current", f"₹{price}"),
+        ("Break-even at 10%", f"₹{break_even_price(config.max_capacity * 0.10, config, product_pct):,.0f}"),
+    ]
+    if recommended_prices is not None:
+        price_points.append(("Recommended", f"₹{recommended_prices[0]:,.0f}-{recommended_prices[1]:,.0f}"))
+    price_points.append(("Premium", "₹5,500+"))
+
+    revenue = calculate_metrics(customers, price, product_pct, config)['revenue']
+    rent_percent = (config.fixed_dict()['Rent (displacement)'] / revenue * 100) if revenue > 0 else 0
+    if rent_percent > 40:
+        rent_status = ('error', f"⚠️ Rent is {rent_percent:.0f}% of revenue!")
+    elif rent_percent > 25:
+        rent_status = ('warning', f"📊 Rent is {rent_percent:.0f}% of revenue")
+    else:
+        rent_status = ('success', f"✅ Rent is {rent_percent:.0f}% of revenue")
+
+    def topic(title, status, points):
+        return {'title': title, 'level': status[0], 'message': status[1], 'points': points}
+
+    return [
+        topic("🎯 Target Metrics", utilization_status, [
+            ("Current", f"{utilization:.1f}%"),
+            ("Minimum Target", "20% (312 customers)"),
+            ("Optimal Target", "30-35% (468-546)"),
+            ("Excellent", "40%+ (624+)"),
+        ]),
+        topic("💰 Pricing Strategy", price_status, price_points),
+        topic("📉 Cost Optimization", rent_status, [
+            ("Fixed Costs", f"₹{config.total_fixed:,}"),
+            ("Per Customer", f"₹{config.total_fixed/customers:.0f}"),
+            ("Consider", "Revenue share model"),
+            ("Target", "<25% of revenue"),
+        ]),
+    ]
@@ -0,0 +1,103 @@
+"""One-way (tornado) and two-way sensitivity of the metrics to every input.
+
+Drivers are the scenario inputs (``price``, ``customers``, ``product_pct``)
+and every fixed and variable line item of the cost config. Each analysis
+builds one row per perturbed scenario, scaling drivers by a factor, and
+evaluates all rows in a single ``calculate_metrics_batch`` call; line items
+are passed as ``model_params`` overrides. Customers are capped at
+``max_capacity``.
+"""
+from functools import lru_cache
+from types import MappingProxyType
+
+import numpy as np
+
+from .engine import calculate_metrics_batch
+
+SCENARIO_DRIVERS = ('price', 'customers', 'product_pct')
+TORNADO_METRICS = ('net_profit', 'break_even_customers', 'capex_payback_months')
+TWO_WAY_STEPS = (-20, -10, 0, 10, 20)  # % change along each axis
+
+
+def sensitivity_drivers(config):
+    """Every input a sensitivity can perturb, scenario inputs first."""
+    return SCENARIO_DRIVERS + tuple(name for name, _ in config.fixed_costs + config.variable_per_customer)
+
+
+def _evaluate(config, customers, price, product_pct, factors):
+    """Metrics with each driver in ``factors`` scaled by its array of factors."""
+    line_items = config.fixed_dict() | config.variable_dict()
+    unknown = set(factors) - set(SCENARIO_DRIVERS) - set(line_items)
+    if unknown:
+        raise KeyError(f"Unknown sensitivity drivers: {sorted(unknown)}")
+    scenario = {'customers': customers, 'price': price, 'product_pct': product_pct}
+    inputs = {name: value * factors.get(name, 1.0) for name, value in scenario.items()}
+    overrides = {name: line_items[name] * factor for name, factor in factors.items() if name in line_items}
+    return calculate_metrics_batch(
+        np.minimum(inputs['customers'], config.max_capacity), inputs['price'], inputs['product_pct'],
+        **config.model_params(overrides),
+    )
+
+
+def tornado(config, customers, price, product_pct=5.0, pct=10.0, metrics=TORNADO_METRICS):
+    """Each driver moved down and up by ``pct`` %, all others at base.
+
+    Returns a dict with ``driver`` (names, largest ``metrics[0]`` swing first),
+    ``base`` (``{metric: value}`` at the unperturbed scenario) and ``low`` /
+    ``high`` (``{metric: array}`` with the driver at -``pct`` / +``pct`` %).
+    """
+    drivers = sensitivity_drivers(config)
+    n = len(drivers)
+    # Row 0 is the base scenario, then each driver low, then each driver high
+    factors = {}
+    for i, driver in enumerate(drivers):
+        factors[driver] = np.ones(2 * n + 1)
+        factors[driver][1 + i] = 1 - pct / 100
+        factors[driver][1 + n + i] = 1 + pct / 100
+    results = _evaluate(config, customers, price, product_pct, factors)
+
+    low = {name: results[name][1:n + 1] for name in metrics}
+    high = {name: results[name][n + 1:] for name in metrics}
+    with np.errstate(invalid='ignore'):
+        swing = np.abs(high[metrics[0]] - low[metrics[0]])
+    order = np.argsort(-np.nan_to_num(swing, nan=-1.0), kind='stable')
+    return {
+        'driver': np.array(drivers, dtype=object)[order],
+        'base': {name: float(results[name][0]) for name in metrics},
+        'low': {name: values[order] for name, values in low.items()},
+        'high': {name: values[order] for name, values in high.items()},
+    }
+
+
+def two_way(config, customers, price, product_pct=5.0, row_driver='price', col_driver='customers',
+            steps=TWO_WAY_STEPS, metric='net_profit'):
+    """``metric`` with two drivers changed together by every pair of ``steps`` (%).
+
+    Returns an array of shape ``(len(steps), len(steps))``: rows follow
+    ``row_driver``, columns ``col_driver``.
+    """
+    change = 1 + np.asarray(steps, dtype=np.float64) / 100
+    rows, cols = np.meshgrid(change, change, indexing='ij')
+    if row_driver == col_driver:
+        factors = {row_driver: rows * cols}
+    else:
+        factors = {row_driver: rows, col_driver: cols}
+    return _evaluate(config, customers, price, product_pct, factors)[metric]
+
+
+@lru_cache(maxsize=256)
+def cached_tornado(config, customers, price, product_pct=5.0, pct=10.0):
+    """``tornado`` memoized per (config, scenario, pct); arrays are read-only."""
+    result = tornado(config, customers, price, product_pct, pct)
+    for values in (result['driver'], *result['low'].values(), *result['high'].values()):
+        values.flags.writeable = False
+    return MappingProxyType(result)
+
+
+@lru_cache(maxsize=256)
+def cached_two_way(config, customers, price, product_pct=5.0, row_driver='price', col_driver='customers',
+                   steps=TWO_WAY_STEPS, metric='net_profit'):
+    """``two_way`` memoized; ``steps`` must be a tuple. The table is read-only."""
+    table = two_way(config, customers, price, product_pct, row_driver, col_driver, steps, metric)
+    table.flags.writeable = False
+    return table
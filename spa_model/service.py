@@ -0,0 +1,425 @@
+"""Asynchronous JSON/HTTP service for tools that need the model's numbers.
+
+    python -m spa_model.service --port 8765
+
+Every POST takes a JSON object and may carry a ``config`` (the
+``CostConfig.to_dict`` form, as returned by ``GET /config``); without one the
+default site is used. Non-finite results (a payback that never comes) are
+returned as ``null``.
+
+``GET /health``
+    Status plus response-cache and batching counters.
+``GET /config``
+    The default cost config.
+``POST /metrics``
+    ``{"customers", "price", "product_pct"?, "metrics"?}`` for one scenario,
+    or ``{"scenarios": [...], "metrics"?}`` for many in one request.
+``POST /grid``
+    Lists of ``customers`` and ``price`` (and a ``product_pct``); each metric
+    comes back as a ``len(customers)`` x ``len(price)`` nested list.
+``POST /break-even``
+    ``price`` and ``product_pct`` (scalars or equal-length lists): the
+    customers and utilization needed to break even, and with ``customers``
+    the price at which those customers break even.
+``POST /payback``
+    ``customers``, ``price``, ``product_pct``: months and years to recover
+    the interior CAPEX, annual profit and annual ROI on it.
+
+Responses are cached in an LRU keyed on the route, the cost config and the
+rest of the request, so a changed config never sees stale numbers. Single
+``/metrics`` requests that miss the cache and arrive in the same event-loop
+pass are evaluated together, one ``calculate_metrics_batch`` call per config.
+
+Throughput target: 5,000 requests/s on one core for keep-alive clients
+asking for a mix of cached scenarios, measured with
+``python benchmarks/bench.py --only service``. The server uses only the
+standard library; ``LocalClient`` drives the same routing, validation and
+caching in-process, as a stand-in for the server in other tools' tests.
+"""
+import argparse
+import asyncio
+import json
+import math
+import traceback
+from collections import OrderedDict
+
+import numpy as np
+
+from .config import DEFAULT_CONFIG, CostConfig
+from .engine import METRIC_NAMES, calculate_metrics_batch
+from .pricing import break_even_price
+from .records import MetricsRecord
+
+RESPONSE_CACHE_SIZE = 4096
+MAX_BODY_BYTES = 1 << 20
+MAX_SCENARIOS = 100_000  # per /metrics, /break-even or /payback request, and grid cells per /grid
+BREAK_EVEN_METRICS = ('break_even_customers', 'break_even_utilization', 'contribution_margin')
+PAYBACK_METRICS = ('capex_payback_months', 'capex_payback_years', 'capex_roi_annual', 'annual_profit', 'net_profit')
+CONFIG_COUNTS = ('max_capacity', 'working_days', 'beds')  # config fields the KPIs divide by
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 413: 'Payload Too Large',
+           500: 'Internal Server Error'}
+
+
+class RequestError(ValueError):
+    """A request the service rejects; ``status`` is the HTTP status to answer with."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def _json_values(values):
+    """Array (or scalar) as JSON-ready lists, with non-finite floats as ``None``."""
+    values = np.asarray(values)
+    if values.dtype != np.bool_ and not np.isfinite(values).all():
+        values = np.where(np.isfinite(values), values, None)
+    return values.tolist()
+
+
+def _json_number(value):
+    """A record's float (or bool) for JSON, ``None`` when non-finite."""
+    return value if isinstance(value, bool) or math.isfinite(value) else None
+
+
+def _dumps(payload):
+    return json.dumps(payload, separators=(',', ':'), allow_nan=False).encode()
+
+
+def _number(payload, name, default=None):
+    value = payload.get(name, default)
+    if value is None:
+        raise RequestError(f"'{name}' is required")
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise RequestError(f"'{name}' must be a number") from None
+
+
+def _numbers(payload, name, default=None):
+    """A number or a list of numbers, as a float array."""
+    value = payload.get(name, default)
+    if value is None:
+        raise RequestError(f"'{name}' is required")
+    try:
+        values = np.asarray(value, dtype=np.float64)
+    except (TypeError, ValueError):
+        raise RequestError(f"'{name}' must be a number or a list of numbers") from None
+    if values.ndim > 1:
+        raise RequestError(f"'{name}' must be a number or a flat list of numbers")
+    if values.size > MAX_SCENARIOS:
+        raise RequestError(f"At most {MAX_SCENARIOS:,} values per request", 413)
+    return values
+
+
+def _metric_names(payload, default=METRIC_NAMES):
+    names = payload.get('metrics', default)
+    if not isinstance(names, (list, tuple)) or not all(isinstance(name, str) for name in names):
+        raise RequestError("'metrics' must be a list of metric names")
+    unknown = set(names) - set(METRIC_NAMES)
+    if unknown:
+        raise RequestError(f"Unknown metrics: {sorted(unknown)}")
+    return tuple(names)
+
+
+def _finite(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+def _config(payload):
+    """The request's ``CostConfig``, checked line by line so bad values answer 400."""
+    data = payload.get('config')
+    if data is None:
+        return DEFAULT_CONFIG
+    if not isinstance(data, dict):
+        raise RequestError("'config' must be a cost config as returned by GET /config")
+    for field in ('fixed_costs', 'variable_per_customer'):
+        items = data.get(field)
+        if not isinstance(items, list) or not all(isinstance(item, list) and len(item) == 2 for item in items):
+            raise RequestError(f"'config.{field}' must be a list of [name, amount] pairs")
+        for name, amount in items:
+            if not isinstance(name, str) or not _finite(amount):
+                raise RequestError(f"'config.{field}' needs string names and finite amounts, got {json.dumps([name, amount])}")
+    for field in CONFIG_COUNTS:
+        if field in data and not (_finite(data[field]) and data[field] > 0):
+            raise RequestError(f"'config.{field}' must be a positive number")
+    if 'interior_capex' in data and not _finite(data['interior_capex']):
+        raise RequestError("'config.interior_capex' must be a finite number")
+    try:
+        return CostConfig.from_dict(data)
+    except TypeError:  # missing or unknown fields
+        raise RequestError("'config' must be a cost config as returned by GET /config") from None
+
+
+def _check_lengths(*values):
+    try:
+        np.broadcast_shapes(*map(np.shape, values))
+    except ValueError:
+        raise RequestError("List inputs must have the same length") from None
+
+
+def _evaluate(config, customers, price, product_pct, names):
+    """``names`` of the metrics batch, broadcast over the inputs, JSON-ready."""
+    _check_lengths(customers, price, product_pct)
+    metrics = calculate_metrics_batch(customers, price, product_pct, **config.model_params())
+    return {name: _json_values(metrics[name]) for name in names}
+
+
+class _MetricsBatcher:
+    """Collects single-scenario requests and evaluates them together.
+
+    The first request of a pass schedules a flush for the next loop
+    iteration; every request submitted before it runs joins the batch.
+    """
+
+    def __init__(self):
+        self._pending = []
+        self.batches = 0
+        self.scenarios = 0
+
+    def submit(self, config, customers, price, product_pct):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        if not self._pending:
+            loop.call_soon(self._flush)
+        self._pending.append((config, customers, price, product_pct, future))
+        return future
+
+    def _flush(self):
+        pending, self._pending = self._pending, []
+        by_config = {}
+        for request in pending:
+            by_config.setdefault(request[0], []).append(request)
+        for config, requests in by_config.items():
+            customers, price, product_pct = (
+                np.array([request[i] for request in requests], dtype=np.float64) for i in (1, 2, 3)
+            )
+            try:
+                batch = calculate_metrics_batch(customers, price, product_pct, **config.model_params())
+            except Exception as error:
+                for request in requests:
+                    if not request[4].done():
+                        request[4].set_exception(error)
+                continue
+            for row, request in enumerate(requests):
+                if not request[4].done():  # its client may have gone
+                    request[4].set_result(MetricsRecord.from_batch(batch, row))
+            self.batches += 1
+            self.scenarios += len(requests)
+
+
+class MetricsService:
+    """Routing, validation, batching and the response cache, independent of the transport."""
+
+    def __init__(self, cache_size=RESPONSE_CACHE_SIZE):
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._batcher = _MetricsBatcher()
+        self._routes = {
+            ('GET', '/health'): self._health,
+            ('GET', '/config'): self._default_config,
+            ('POST', '/metrics'): self._metrics,
+            ('POST', '/grid'): self._grid,
+            ('POST', '/break-even'): self._break_even,
+            ('POST', '/payback'): self._payback,
+        }
+
+    async def handle(self, method, path, body=b''):
+        """Answer one request; returns ``(status, JSON bytes)``."""
+        try:
+            return 200, await self._dispatch(method, path, body)
+        except RequestError as error:
+            return error.status, _dumps({'error': str(error)})
+        except Exception as error:
+            traceback.print_exc()
+            return 500, _dumps({'error': f"{type(error).__name__}: {error}"})
+
+    async def _dispatch(self, method, path, body):
+        handler = self._routes.get((method, path))
+        if handler is None:
+            if any(route_path == path for _, route_path in self._routes):
+                raise RequestError(f"{method} is not allowed on {path}", 405)
+            raise RequestError(f"No such endpoint: {path}", 404)
+        if method == 'GET':
+            return _dumps(handler())
+
+        try:
+            payload = json.loads(body or b'{}')
+        except ValueError:
+            raise RequestError("Request body must be JSON") from None
+        if not isinstance(payload, dict):
+            raise RequestError("Request body must be a JSON object")
+        config = _config(payload)
+        request = {name: value for name, value in payload.items() if name != 'config'}
+        key = (path, config, json.dumps(request, sort_keys=True))
+
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self.cache_hits += 1
+            return cached
+        self.cache_misses += 1
+        response = _dumps(await handler(config, request))
+        self._cache[key] = response
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return response
+
+    def _health(self):
+        return {
+            'status': 'ok',
+            'cache': {'size': len(self._cache), 'hits': self.cache_hits, 'misses': self.cache_misses},
+            'batching': {'batches': self._batcher.batches, 'scenarios': self._batcher.scenarios},
+        }
+
+    def _default_config(self):
+        return DEFAULT_CONFIG.to_dict()
+
+    async def _metrics(self, config, request):
+        names = _metric_names(request)
+        if 'scenarios' in request:
+            scenarios = request['scenarios']
+            if not isinstance(scenarios, list) or not all(isinstance(scenario, dict) for scenario in scenarios):
+                raise RequestError("'scenarios' must be a list of objects")
+            if len(scenarios) > MAX_SCENARIOS:
+                raise RequestError(f"At most {MAX_SCENARIOS:,} scenarios per request", 413)
+            customers, price, product_pct = (
+                np.array([_number(scenario, name, default) for scenario in scenarios])
+                for name, default in (('customers', None), ('price', None), ('product_pct', 5.0))
+            )
+            return {'metrics': _evaluate(config, customers, price, product_pct, names)}
+
+        record = await self._batcher.submit(
+            config, _number(request, 'customers'), _number(request, 'price'), _number(request, 'product_pct', 5.0)
+        )
+        return {'metrics': {name: _json_number(record[name]) for name in names}}
+
+    async def _grid(self, config, request):
+        names = _metric_names(request)
+        customers, price = _numbers(request, 'customers'), _numbers(request, 'price')
+        if customers.ndim != 1 or price.ndim != 1:
+            raise RequestError("'customers' and 'price' must be lists")
+        if customers.size * price.size > MAX_SCENARIOS:
+            raise RequestError(f"At most {MAX_SCENARIOS:,} grid cells per request", 413)
+        product_pct = _number(request, 'product_pct', 5.0)
+        values = _evaluate(config, customers[:, None], price[None, :], product_pct, names)
+        return {'customers': customers.tolist(), 'price': price.tolist(), 'product_pct': product_pct, 'metrics': values}
+
+    async def _break_even(self, config, request):
+        price, product_pct = _numbers(request, 'price'), _numbers(request, 'product_pct', 5.0)
+        response = _evaluate(config, 0.0, price, product_pct, BREAK_EVEN_METRICS)
+        if 'customers' in request:
+            customers = _numbers(request, 'customers')
+            _check_lengths(customers, price, product_pct)
+            if (customers <= 0).any():
+                raise RequestError("'customers' must be positive")
+            response['break_even_price'] = _json_values(break_even_price(customers, config, product_pct))
+        return response
+
+    async def _payback(self, config, request):
+        response = _evaluate(
+            config, _numbers(request, 'customers'), _numbers(request, 'price'),
+            _numbers(request, 'product_pct', 5.0), PAYBACK_METRICS,
+        )
+        response['interior_capex'] = config.interior_capex
+        return response
+
+    # HTTP/1.1 transport
+
+    async def _serve_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await self._respond(writer, 400, _dumps({'error': "Malformed request line"}), False)
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection == 'keep-alive' if version == 'HTTP/1.0' else connection != 'close'
+                length = int(headers.get('content-length') or 0)
+                if length > MAX_BODY_BYTES:
+                    await self._respond(writer, 413, _dumps({'error': "Request body too large"}), False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+                status, response = await self.handle(method, target.partition('?')[0], body)
+                await self._respond(writer, status, response, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer, status, body, keep_alive):
+        writer.write(
+            f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + body
+        )
+        await writer.drain()
+
+    async def start(self, host='127.0.0.1', port=8765):
+        """Start listening; returns the ``asyncio.Server`` (``port=0`` picks a free port)."""
+        return await asyncio.start_server(self._serve_connection, host, port)
+
+
+class LocalClient:
+    """In-process stand-in for an HTTP client of the service.
+
+    Requests go through ``MetricsService.handle`` without a socket; responses
+    are ``(status, decoded JSON)``.
+    """
+
+    def __init__(self, service=None):
+        self.service = service or MetricsService()
+
+    def get(self, path):
+        return self.request('GET', path)
+
+    def post(self, path, payload):
+        return self.request('POST', path, payload)
+
+    def request(self, method, path, payload=None):
+        body = b'' if payload is None else json.dumps(payload).encode()
+        status, response = asyncio.run(self.service.handle(method, path, body))
+        return status, json.loads(response)
+
+
+async def serve(host='127.0.0.1', port=8765, service=None):
+    server = await (service or MetricsService()).start(host, port)
+    addresses = ', '.join(f"{address[0]}:{address[1]}" for address in (sock.getsockname() for sock in server.sockets))
+    print(f"Serving spa metrics on {addresses}", flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m spa_model.service', description="Serve spa metrics as JSON over HTTP.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--cache-size', type=int, default=RESPONSE_CACHE_SIZE, help="cached responses (LRU)")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, MetricsService(args.cache_size)))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,239 @@
+"""SQLite-backed store of named scenarios.
+
+Each row keeps the scenario inputs, its full cost configuration (as JSON) and
+a set of KPI columns computed when it is saved, so listing, filtering and
+sorting thousands of scenarios never re-runs the model. Tags live in their own
+table so filtering by tag uses an index.
+
+    store = ScenarioStore('scenarios.db')
+    store.save('Bandra launch', 468, 5000, site='Bandra', tags=('launch',))
+    rows = store.list(site='Bandra', limit=25, offset=0)
+    metrics = compare_scenarios(store.get_many([row['id'] for row in rows]))
+"""
+import json
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+import numpy as np
+
+from .config import DEFAULT_CONFIG, CostConfig
+from .engine import calculate_metrics_batch
+
+# Precomputed at save time and stored as columns
+KPI_COLUMNS = (
+    'revenue', 'net_profit', 'margin', 'utilization',
+    'break_even_customers', 'capex_payback_months', 'capex_roi_annual',
+)
+SORT_COLUMNS = ('created_at', 'name', 'site') + KPI_COLUMNS
+DEFAULT_PAGE_SIZE = 25
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS scenarios (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    site TEXT NOT NULL DEFAULT '',
+    created_at TEXT NOT NULL,
+    customers REAL NOT NULL,
+    price REAL NOT NULL,
+    product_pct REAL NOT NULL,
+    config TEXT NOT NULL,
+    {', '.join(f'{name} REAL' for name in KPI_COLUMNS)}
+);
+CREATE INDEX IF NOT EXISTS scenarios_site_created ON scenarios (site, created_at);
+CREATE INDEX IF NOT EXISTS scenarios_created ON scenarios (created_at);
+CREATE TABLE IF NOT EXISTS scenario_tags (
+    tag TEXT NOT NULL,
+    scenario_id INTEGER NOT NULL REFERENCES scenarios (id) ON DELETE CASCADE,
+    PRIMARY KEY (tag, scenario_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS scenario_tags_scenario ON scenario_tags (scenario_id);
+"""
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    customers: float
+    price: float
+    product_pct: float = 5.0
+    config: CostConfig = DEFAULT_CONFIG
+    site: str = ''
+    tags: tuple = ()
+    created_at: str = ''  # ISO 8601 UTC; filled in on save when empty
+    id: int = field(default=None, compare=False)
+
+
+def scenario_params(scenarios):
+    """Engine inputs for a list of scenarios as parallel 1-D arrays."""
+    def column(values):
+        return np.fromiter(values, dtype=np.float64, count=len(scenarios))
+
+    configs = [scenario.config for scenario in scenarios]
+    return (
+        column(s.customers for s in scenarios),
+        column(s.price for s in scenarios),
+        column(s.product_pct for s in scenarios),
+        {
+            'total_fixed': column(c.total_fixed for c in configs),
+            'total_variable': column(c.total_variable for c in configs),
+            'interior_capex': column(c.interior_capex for c in configs),
+            'max_capacity': column(c.max_capacity for c in configs),
+            'working_days': column(c.working_days for c in configs),
+            'beds': column(c.beds for c in configs),
+        },
+    )
+
+
+def compare_scenarios(scenarios):
+    """Every metric for any number of scenarios (each with its own config) in one call.
+
+    Returns a dict of 1-D arrays aligned with ``scenarios``.
+    """
+    customers, price, product_pct, params = scenario_params(scenarios)
+    return calculate_metrics_batch(customers, price, product_pct, **params)
+
+
+def kpi_deltas(metrics, baseline=0, names=KPI_COLUMNS):
+    """Difference of each KPI from the scenario at index ``baseline``."""
+    return {name: metrics[name] - metrics[name][baseline] for name in names}
+
+
+class ScenarioStore:
+    """Named scenarios persisted in a SQLite file (or ``':memory:'``).
+
+    One connection is shared behind a lock, so a store can serve every
+    session of a Streamlit process.
+    """
+
+    def __init__(self, path=':memory:'):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        with self._conn:
+            self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def save(self, name, customers, price, product_pct=5.0, config=DEFAULT_CONFIG, site='', tags=()):
+        """Store one scenario and return its id."""
+        scenario = Scenario(name, customers, price, product_pct, config, site, tuple(tags))
+        return self.save_many([scenario])[0]
+
+    def save_many(self, scenarios):
+        """Store scenarios in one transaction, computing their KPIs in one batch."""
+        scenarios = list(scenarios)
+        if not scenarios:
+            return []
+        kpis = compare_scenarios(scenarios)
+        now = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        config_json = {}
+        ids = []
+        with self._lock, self._conn:
+            for i, scenario in enumerate(scenarios):
+                if scenario.config not in config_json:
+                    config_json[scenario.config] = json.dumps(scenario.config.to_dict())
+                cursor = self._conn.execute(
+                    f"INSERT INTO scenarios (name, site, created_at, customers, price, product_pct, config, "
+                    f"{', '.join(KPI_COLUMNS)}) VALUES ({', '.join('?' * (7 + len(KPI_COLUMNS)))})",
+                    (scenario.name, scenario.site, scenario.created_at or now, scenario.customers,
+                     scenario.price, scenario.product_pct, config_json[scenario.config],
+                     *(float(kpis[name][i]) for name in KPI_COLUMNS)),
+                )
+                ids.append(cursor.lastrowid)
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO scenario_tags (tag, scenario_id) VALUES (?, ?)",
+                    [(tag, cursor.lastrowid) for tag in scenario.tags],
+                )
+        return ids
+
+    def delete(self, scenario_id):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM scenarios WHERE id = ?", (scenario_id,))
+
+    def get_many(self, ids):
+        """Full scenarios (with their cost configs) in the order of ``ids``."""
+        ids = list(ids)
+        if not ids:
+            return []
+        placeholders = ', '.join('?' * len(ids))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id, name, site, created_at, customers, price, product_pct, config "
+                f"FROM scenarios WHERE id IN ({placeholders})", ids,
+            ).fetchall()
+            tags = self._conn.execute(
+                f"SELECT scenario_id, tag FROM scenario_tags WHERE scenario_id IN ({placeholders}) ORDER BY tag", ids,
+            ).fetchall()
+
+        tags_by_id = {}
+        for scenario_id, tag in tags:
+            tags_by_id.setdefault(scenario_id, []).append(tag)
+        configs = {}
+        by_id = {}
+        for row in rows:
+            if row['config'] not in configs:
+                configs[row['config']] = CostConfig.from_dict(json.loads(row['config']))
+            by_id[row['id']] = Scenario(
+                name=row['name'], customers=row['customers'], price=row['price'],
+                product_pct=row['product_pct'], config=configs[row['config']], site=row['site'],
+                tags=tuple(tags_by_id.get(row['id'], ())), created_at=row['created_at'], id=row['id'],
+            )
+        missing = [scenario_id for scenario_id in ids if scenario_id not in by_id]
+        if missing:
+            raise KeyError(f"Unknown scenario ids: {missing}")
+        return [by_id[scenario_id] for scenario_id in ids]
+
+    def get(self, scenario_id):
+        return self.get_many([scenario_id])[0]
+
+    def _where(self, site, tag, since, until):
+        clauses, params = [], []
+        if site is not None:
+            clauses.append("site = ?")
+            params.append(site)
+        if tag is not None:
+            clauses.append("id IN (SELECT scenario_id FROM scenario_tags WHERE tag = ?)")
+            params.append(tag)
+        if since is not None:
+            clauses.append("created_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("created_at < ?")
+            params.append(until)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def count(self, site=None, tag=None, since=None, until=None):
+        where, params = self._where(site, tag, since, until)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM scenarios{where}", params).fetchone()[0]
+
+    def list(self, site=None, tag=None, since=None, until=None, order_by='created_at', descending=True,
+             limit=DEFAULT_PAGE_SIZE, offset=0):
+        """One page of scenario summaries (inputs and stored KPIs) as dicts.
+
+        ``since``/``until`` are ISO dates or timestamps; ``until`` is exclusive.
+        """
+        if order_by not in SORT_COLUMNS:
+            raise ValueError(f"Cannot sort by {order_by!r}; choose from {SORT_COLUMNS}")
+        where, params = self._where(site, tag, since, until)
+        direction = "DESC" if descending else "ASC"
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id, name, site, created_at, customers, price, product_pct, {', '.join(KPI_COLUMNS)} "
+                f"FROM scenarios{where} ORDER BY {order_by} {direction}, id {direction} LIMIT ? OFFSET ?",
+                [*params, limit, offset],
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def sites(self):
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT DISTINCT site FROM scenarios ORDER BY site")]
+
+    def tags(self):
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT DISTINCT tag FROM scenario_tags ORDER BY tag")]
@@ -0,0 +1,49 @@
+"""Price x utilization grids behind the comparative charts and profit surface."""
+import numpy as np
+
+from .engine import calculate_metrics_batch
+
+# Grid points per axis. Profit is bilinear in price and customers, so the
+# heatmap's own bilinear smoothing ('best') draws it exactly from a coarse
+# grid, and the figure re-sent on every click stays small
+SURFACE_RESOLUTION = {'mobile': 32, 'desktop': 48}
+MAX_SURFACE_CELLS = 250_000
+
+PRICE_RANGE = (2000, 7000)
+UTILIZATION_RANGE = (0.05, 0.60)
+
+
+def profit_surface(config, product_pct, resolution=SURFACE_RESOLUTION['desktop'],
+                   price_range=PRICE_RANGE, utilization_range=UTILIZATION_RANGE):
+    """Evaluate every metric over a price x utilization grid in one batch.
+
+    Returns ``(prices, utilization_pct, metrics)``; each metric array has shape
+    ``(len(utilization_pct), len(prices))`` so it can be passed straight to a
+    heatmap as ``z``. ``resolution`` is capped so the grid never exceeds
+    ``MAX_SURFACE_CELLS``.
+    """
+    resolution = max(2, min(int(resolution), int(np.sqrt(MAX_SURFACE_CELLS))))
+    prices = np.linspace(*price_range, resolution)
+    utilization = np.linspace(*utilization_range, resolution)
+    customers = utilization * config.max_capacity
+    metrics = calculate_metrics_batch(
+        customers[:, None], prices[None, :], product_pct, **config.model_params()
+    )
+    return prices, utilization * 100, metrics
+
+
+def utilization_curve(config, price, product_pct, utilization_rates):
+    """Metrics at each utilization rate for one price (profit vs utilization chart).
+
+    Customer counts are truncated to whole customers, as on the preset tabs.
+    """
+    customers = (np.asarray(utilization_rates) * config.max_capacity).astype(int)
+    return calculate_metrics_batch(customers, price, product_pct, **config.model_params())
+
+
+def price_sensitivity(config, utilization_rates, prices, product_pct):
+    """Metrics for every (utilization line, price) pair, shaped ``(lines, prices)``."""
+    customers = (np.asarray(utilization_rates) * config.max_capacity).astype(int)
+    return calculate_metrics_batch(
+        customers[:, None], np.asarray(prices)[None, :], product_pct, **config.model_params()
+    )
@@ -0,0 +1,370 @@
+"""Static, pre-rendered report of the default scenario for read-only viewers.
+
+    python static_report.py                  # build ./report unless it is up to date
+    python static_report.py --out /srv/spa --force
+
+The bundle holds ``index.html`` (overview KPIs, the preset utilization tabs,
+the comparative charts, the breakdown table, the recommendations and the
+business parameters, with every figure inline), ``report.json`` (the same
+numbers for other tools), ``plotly.min.js`` and ``manifest.json``. It needs
+no server beyond static file hosting, e.g. ``python -m http.server -d report``.
+
+``manifest.json`` records a fingerprint of the cost config, the scenario and
+``REPORT_VERSION``; ``build_report`` skips the work when the bundle on disk
+already matches. The dashboard calls it with ``DEFAULT_CONFIG`` at startup,
+so the bundle follows the canonical costs without anyone publishing it. Files are written to temporary names and renamed into place,
+manifest last, so viewers never load a half-written bundle.
+"""
+import argparse
+import hashlib
+import html
+import json
+import math
+import os
+import sys
+from pathlib import Path
+
+from plotly.offline import get_plotlyjs
+
+from charts import (
+    cost_pie_figure,
+    price_sensitivity_figure,
+    profit_surface_figure,
+    profit_utilization_figure,
+    profit_waterfall_figure,
+)
+from spa_model import (
+    BREAKDOWN_COLUMNS,
+    DEFAULT_CONFIG,
+    SURFACE_RESOLUTION,
+    LinearDemand,
+    cached_metrics,
+    cached_price_optimum,
+    financial_breakdown,
+    kpi_cards,
+    recommendations,
+)
+
+REPORT_VERSION = 2  # bump when the layout or content changes, to rebuild existing bundles
+BUNDLE_FILES = ('index.html', 'report.json', 'plotly.min.js', 'manifest.json')
+DEFAULT_SCENARIO = {'customers': 468, 'price': 5000, 'product_pct': 5.0}
+PRESET_UTILIZATION = (0.10, 0.20, 0.30, 0.40, 0.50)
+# The price optimizer's defaults; the report always includes their recommended price band,
+# while the dashboard shows one only once its optimizer has been run
+PRICE_ELASTICITY = -1.5
+PRICE_ELASTICITY_SD = 0.3
+TARGET_MARGIN = 20
+SURFACE_METRIC = "Net Profit (₹)"
+# Inside the dashboard process the default Plotly template is Streamlit's,
+# whose placeholder colours only its frontend fills in
+FIGURE_TEMPLATE = "plotly"
+
+
+def report_fingerprint(config=DEFAULT_CONFIG, scenario=DEFAULT_SCENARIO):
+    """Hash of everything the report's content depends on."""
+    payload = {'version': REPORT_VERSION, 'config': config.to_dict(), 'scenario': scenario}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+def preset_tabs(config, customers, price):
+    """``(label, customers)`` of the Custom tab and each preset utilization tab."""
+    return [("📊 Custom", customers)] + [
+        (f"{int(rate * 100)}%", int(rate * config.max_capacity)) for rate in PRESET_UTILIZATION
+    ]
+
+
+def report_data(config=DEFAULT_CONFIG, customers=468, price=5000, product_pct=5.0):
+    """Every number and figure of the report; figures are Plotly JSON dicts."""
+    utilization = customers / config.max_capacity * 100
+    metrics = cached_metrics(config, customers, price, product_pct)
+    optimum = cached_price_optimum(
+        LinearDemand(price, customers, PRICE_ELASTICITY, PRICE_ELASTICITY_SD), config, product_pct, TARGET_MARGIN
+    )
+
+    tabs = []
+    for label, tab_customers in preset_tabs(config, customers, price):
+        tab_metrics = cached_metrics(config, tab_customers, price, product_pct)
+        tabs.append({
+            'label': label,
+            'customers': tab_customers,
+            'kpis': [{'heading': heading, 'cards': cards}
+                     for heading, cards in kpi_cards(tab_customers, price, product_pct, config)],
+            'figures': {
+                'pie': json.loads(cost_pie_figure(tab_metrics, template=FIGURE_TEMPLATE).to_json()),
+                'waterfall': json.loads(profit_waterfall_figure(tab_metrics, template=FIGURE_TEMPLATE).to_json()),
+            },
+        })
+
+    return {
+        'scenario': {'customers': customers, 'price': price, 'product_pct': product_pct, 'utilization': utilization},
+        'config': config.to_dict(),
+        'metrics': dict(metrics),
+        'tabs': tabs,
+        'comparative': {
+            'profit_utilization': json.loads(profit_utilization_figure(
+                config, price, product_pct, utilization, metrics['net_profit'], template=FIGURE_TEMPLATE).to_json()),
+            'price_sensitivity': json.loads(price_sensitivity_figure(config, product_pct, template=FIGURE_TEMPLATE).to_json()),
+            'profit_surface': json.loads(profit_surface_figure(
+                config, price, utilization, product_pct, SURFACE_METRIC, SURFACE_RESOLUTION['desktop'], template=FIGURE_TEMPLATE).to_json()),
+        },
+        'breakdown': financial_breakdown(customers, price, product_pct, config),
+        'recommendations': recommendations(customers, price, product_pct, config, optimum.price_band),
+    }
+
+
+# HTML rendering
+
+PAGE_STYLE = """
+body { font-family: -apple-system, "Segoe UI", Roboto, sans-serif; margin: 0 auto; max-width: 1200px; padding: 1rem; color: #262730; }
+h1 { font-size: 1.8rem; } h2 { margin-top: 2rem; border-top: 1px solid #ddd; padding-top: 1rem; }
+.selection { background: #e8f0fe; border-radius: 6px; padding: .6rem 1rem; }
+.cards { display: grid; grid-template-columns: repeat(4, 1fr); gap: .8rem; margin: .5rem 0 1rem; }
+.card { background: #f0f2f6; border-radius: 8px; padding: .7rem; }
+.card .label { font-size: .85rem; color: #555; } .card .value { font-size: 1.4rem; font-weight: 600; }
+.card .delta { font-size: .85rem; } .up { color: #09ab3b; } .down { color: #ff2b2b; }
+.tabs { display: flex; gap: .4rem; flex-wrap: wrap; margin: 1rem 0; }
+.tabs button { border: 1px solid #ccc; background: #fff; border-radius: 6px; padding: .4rem .9rem; cursor: pointer; }
+.tabs button.active { background: #ff4b4b; border-color: #ff4b4b; color: #fff; }
+.tab { display: none; } .tab.active { display: block; }
+.charts { display: grid; grid-template-columns: 1fr 1fr; gap: 1rem; }
+table { border-collapse: collapse; width: 100%; font-size: .9rem; }
+td, th { border-bottom: 1px solid #eee; padding: .3rem .6rem; text-align: right; } td:first-child, th:first-child { text-align: left; white-space: pre; }
+.topics { display: grid; grid-template-columns: repeat(3, 1fr); gap: 1rem; }
+.status { border-radius: 6px; padding: .5rem .8rem; }
+.error { background: #ffe0e0; } .warning { background: #fff6d6; } .info { background: #e1effe; } .success { background: #dcf5e3; }
+@media (max-width: 760px) { .cards { grid-template-columns: 1fr 1fr; } .charts, .topics { grid-template-columns: 1fr; } }
+"""
+
+# Figures are drawn when their tab is first shown: Plotly can't size a chart inside a hidden element
+PAGE_SCRIPT = """
+function drawFigures(root) {
+  root.querySelectorAll('.figure:not([data-drawn])').forEach(function (el) {
+    var fig = JSON.parse(document.getElementById(el.dataset.source).textContent);
+    Plotly.newPlot(el, fig.data, fig.layout, {responsive: true, displaylogo: false});
+    el.dataset.drawn = '1';
+  });
+}
+function showTab(index) {
+  document.querySelectorAll('.tabs button').forEach(function (b, i) { b.classList.toggle('active', i === index); });
+  document.querySelectorAll('.tab').forEach(function (t, i) { t.classList.toggle('active', i === index); });
+  drawFigures(document.querySelectorAll('.tab')[index]);
+}
+document.querySelectorAll('.tabs button').forEach(function (b, i) { b.addEventListener('click', function () { showTab(i); }); });
+showTab(0);
+drawFigures(document.getElementById('comparative'));
+"""
+
+
+def _escape(text):
+    return html.escape(str(text))
+
+
+class _Figures:
+    """Collects figure JSON as inline data blocks, referenced by placeholder elements."""
+
+    def __init__(self):
+        self.blocks = []
+
+    def place(self, figure):
+        source = f"figure-data-{len(self.blocks)}"
+        data = json.dumps({'data': figure['data'], 'layout': figure['layout']}, separators=(',', ':'))
+        data = data.replace('</', '<\\/')  # keep "</script>" inside strings from closing the block
+        self.blocks.append(f'<script type="application/json" id="{source}">{data}</script>')
+        return f'<div class="figure" data-source="{source}"></div>'
+
+
+def _cards_html(sections):
+    parts = []
+    for section in sections:
+        if section['heading']:
+            parts.append(f"<h3>{_escape(section['heading'])}</h3>")
+        parts.append('<div class="cards">')
+        for card in section['cards']:
+            rising = not card['delta'].startswith('-')
+            good = rising if card['delta_color'] == 'normal' else not rising
+            parts.append(
+                f'<div class="card"><div class="label">{_escape(card["label"])}</div>'
+                f'<div class="value">{_escape(card["value"])}</div>'
+                f'<div class="delta {"up" if good else "down"}">{"↑" if rising else "↓"} {_escape(card["delta"])}</div></div>'
+            )
+        parts.append('</div>')
+    return '\n'.join(parts)
+
+
+def _cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, str):
+        return _escape(value)
+    return f"{value:,.1f}" if value != int(value) else f"{value:,.0f}"
+
+
+def _breakdown_html(breakdown):
+    head = ''.join(f"<th>{_escape(column)}</th>" for column in BREAKDOWN_COLUMNS)
+    rows = ''.join(
+        '<tr>' + ''.join(f"<td>{_cell(value)}</td>" for value in row) + '</tr>'
+        for row in zip(*(breakdown[column] for column in BREAKDOWN_COLUMNS))
+    )
+    return f"<table><thead><tr>{head}</tr></thead><tbody>{rows}</tbody></table>"
+
+
+def _recommendations_html(topics):
+    parts = ['<div class="topics">']
+    for topic in topics:
+        points = ''.join(f"<li><strong>{_escape(label)}</strong>: {_escape(text)}</li>" for label, text in topic['points'])
+        parts.append(
+            f"<div><h3>{_escape(topic['title'])}</h3>"
+            f'<div class="status {topic["level"]}">{_escape(topic["message"])}</div><ul>{points}</ul></div>'
+        )
+    parts.append('</div>')
+    return '\n'.join(parts)
+
+
+def _parameters_html(config, metrics):
+    fixed = ''.join(f"<li><strong>{_escape(name)}</strong>: ₹{amount:,}</li>" for name, amount in config.fixed_costs)
+    variable = ''.join(f"<li><strong>{_escape(name)}</strong>: ₹{amount}</li>" for name, amount in config.variable_per_customer)
+    break_even_util = metrics['break_even_customers'] / config.max_capacity * 100
+    return f"""<div class="topics">
+<div><h3>🏢 Facility Specifications</h3><ul>
+<li><strong>Beds</strong>: {config.beds} treatment beds</li>
+<li><strong>Working days/month</strong>: {config.working_days}</li>
+<li><strong>Maximum capacity</strong>: {config.max_capacity:,} treatments/month</li>
+<li><strong>Interior CAPEX</strong>: ₹{config.interior_capex/10000000:.1f} Crore</li></ul></div>
+<div><h3>💰 Fixed Costs (Monthly)</h3><ul>{fixed}<li><strong>📊 Total Fixed</strong>: ₹{config.total_fixed:,}</li></ul></div>
+<div><h3>🛍️ Variable Costs (Per Customer)</h3><ul>{variable}<li><strong>📊 Total Variable</strong>: ₹{config.total_variable}</li>
+<li><strong>Product Cost</strong>: 2-6% of revenue (adjustable)</li></ul></div>
+</div>
+<h3>🎯 Key Business Ratios</h3>
+<div class="cards">
+<div class="card status info"><strong>Break-even Point</strong><br>{metrics['break_even_customers']:.0f} customers ({break_even_util:.1f}% utilization)</div>
+<div class="card status info"><strong>CAPEX Payback</strong><br>{_escape(f"{metrics['capex_payback_years']:.1f} years" if metrics['capex_payback_years'] != float('inf') else "No payback")}</div>
+<div class="card status info"><strong>Cost Structure</strong><br>Fixed: ₹{config.total_fixed:,}/month<br>Variable: ₹{config.total_variable}/customer</div>
+<div class="card status info"><strong>Capacity Planning</strong><br>{config.max_capacity:,} max treatments<br>{config.max_capacity/config.working_days:.0f} per day</div>
+</div>"""
+
+
+def render_html(data, config, fingerprint):
+    """The report page for ``report_data(config, ...)``; expects ``plotly.min.js`` next to it."""
+    scenario, figures = data['scenario'], _Figures()
+
+    tab_buttons = ''.join(f"<button>{_escape(tab['label'])}</button>" for tab in data['tabs'])
+    tab_panels = []
+    for tab in data['tabs']:
+        tab_panels.append(
+            f'<div class="tab"><h3>{_escape(tab["label"])}: {tab["customers"]} customers @ ₹{scenario["price"]}</h3>'
+            f"{_cards_html(tab['kpis'])}"
+            f'<div class="charts">{figures.place(tab["figures"]["pie"])}{figures.place(tab["figures"]["waterfall"])}</div></div>'
+        )
+    comparative = data['comparative']
+
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<meta name="report-fingerprint" content="{fingerprint}">
+<title>12-Bed Spa Profitability Report</title>
+<style>{PAGE_STYLE}</style>
+<script src="plotly.min.js"></script>
+</head>
+<body>
+<h1>🏢 12-Bed Spa Profitability Dashboard - Mumbai</h1>
+<p class="selection">🎯 <strong>Scenario</strong>: ₹{scenario['price']:,} per treatment | {scenario['customers']} customers
+({scenario['utilization']:.1f}% utilization) | {scenario['product_pct']}% product cost.
+Read-only report; open the live dashboard to change the scenario.</p>
+
+<h2>📊 Overview and Utilization Presets</h2>
+<div class="tabs">{tab_buttons}</div>
+{''.join(tab_panels)}
+
+<h2>📈 Comparative Analysis</h2>
+<div id="comparative">
+<div class="charts">{figures.place(comparative['profit_utilization'])}{figures.place(comparative['price_sensitivity'])}</div>
+<h3>🗺️ Profit Surface (Price × Utilization)</h3>
+{figures.place(comparative['profit_surface'])}
+</div>
+
+<h2>📋 Detailed Financial Breakdown</h2>
+{_breakdown_html(data['breakdown'])}
+
+<h2>💡 Business Recommendations &amp; Insights</h2>
+{_recommendations_html(data['recommendations'])}
+
+<h2>📋 Business Parameters Overview</h2>
+{_parameters_html(config, data['metrics'])}
+
+<p><small>💆 12-Bed Spa Profitability Dashboard | Static report {fingerprint[:12]}</small></p>
+{''.join(figures.blocks)}
+<script>{PAGE_SCRIPT}</script>
+</body>
+</html>
+"""
+
+
+def _json_safe(value):
+    """``value`` with non-finite floats (a payback that never comes) as ``None``."""
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if isinstance(value, dict):
+        return {key: _json_safe(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_safe(item) for item in value]
+    return value
+
+
+def _write(path, content):
+    temporary = path.with_name(f".{path.name}.tmp")
+    if isinstance(content, str):
+        temporary.write_text(content, encoding='utf-8')
+    else:
+        temporary.write_bytes(content)
+    os.replace(temporary, path)
+
+
+def read_manifest(out_dir):
+    try:
+        return json.loads((Path(out_dir) / 'manifest.json').read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def build_report(out_dir='report', config=DEFAULT_CONFIG, scenario=DEFAULT_SCENARIO, force=False):
+    """Write the bundle to ``out_dir`` unless it already matches; returns whether it was built."""
+    out_dir = Path(out_dir)
+    fingerprint = report_fingerprint(config, scenario)
+    manifest = read_manifest(out_dir)
+    if not force and manifest and manifest.get('fingerprint') == fingerprint and (out_dir / 'index.html').exists():
+        return False
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    data = report_data(config, **scenario)
+    plotly_js = out_dir / 'plotly.min.js'
+    script = get_plotlyjs().encode()
+    if not plotly_js.exists() or plotly_js.stat().st_size != len(script):
+        _write(plotly_js, script)
+    _write(out_dir / 'report.json', json.dumps(_json_safe(data), ensure_ascii=False, allow_nan=False))
+    _write(out_dir / 'index.html', render_html(data, config, fingerprint))
+    _write(out_dir / 'manifest.json', json.dumps({
+        'fingerprint': fingerprint,
+        'version': REPORT_VERSION,
+        'scenario': scenario,
+        'files': BUNDLE_FILES,
+    }, indent=2))
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--out', default='report', help="bundle directory (default: report)")
+    parser.add_argument('--force', action='store_true', help="rebuild even when the bundle is up to date")
+    args = parser.parse_args(argv)
+
+    if build_report(args.out, force=args.force):
+        print(f"Wrote the static report to {args.out}/")
+    else:
+        print(f"{args.out}/ is up to date for this cost config")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())